@@ -43,5 +43,8 @@ async def run_migrations_online():
 
 if context.is_offline_mode():
     run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    # Programmatic run on a caller's connection (e.g. tests migrating a scratch schema)
+    do_run_migrations(config.attributes["connection"])
 else:
     asyncio.run(run_migrations_online())
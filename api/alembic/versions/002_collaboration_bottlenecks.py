@@ -0,0 +1,36 @@
+"""collaboration bottlenecks
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'collaboration_bottlenecks',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('employee_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('employees.id'), nullable=False),
+        sa.Column('week_start', sa.Date, nullable=False),
+        sa.Column('betweenness', sa.Float, server_default='0'),
+        sa.Column('unique_collaborators', sa.Integer, server_default='0'),
+        sa.Column('cross_team_ratio', sa.Float, server_default='0'),
+        sa.Column('created_at', sa.DateTime, server_default=sa.func.now()),
+        sa.UniqueConstraint('employee_id', 'week_start', name='uq_bottleneck_employee_week'),
+    )
+    op.create_index('ix_bottleneck_week', 'collaboration_bottlenecks', ['week_start'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bottleneck_week')
+    op.drop_table('collaboration_bottlenecks')
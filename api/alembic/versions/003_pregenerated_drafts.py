@@ -0,0 +1,34 @@
+"""pregenerated drafts
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pregenerated_drafts',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('employee_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('employees.id'), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('week_start', sa.Date, nullable=False),
+        sa.Column('fingerprint', sa.String(64), server_default=''),
+        sa.Column('payload', postgresql.JSON, server_default='{}'),
+        sa.Column('created_at', sa.DateTime, server_default=sa.func.now()),
+        sa.UniqueConstraint('employee_id', 'kind', name='uq_draft_employee_kind'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('pregenerated_drafts')
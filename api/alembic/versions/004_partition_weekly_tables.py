@@ -0,0 +1,94 @@
+"""monthly range partitions for weekly_signals and employee_scores
+
+Postgres only: each table is rebuilt as `PARTITION BY RANGE (week_start)`
+with one partition per month, covering the existing data through the next
+three months (the app's partition maintenance keeps creating them ahead).
+The primary key becomes (id, week_start) because Postgres requires the
+partition key in every unique constraint. Other databases keep plain tables.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table → (unique constraint, extra indexes)
+TABLES = {
+    'weekly_signals': ('uq_signal_employee_week', ['ix_signal_week']),
+    'employee_scores': ('uq_score_employee_week', []),
+}
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, n: int) -> date:
+    years, index = divmod(month.month - 1 + n, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def _rename_legacy(table: str, unique: str, indexes: list[str]) -> None:
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    op.execute(f"ALTER TABLE {table}_legacy RENAME CONSTRAINT {table}_pkey TO {table}_legacy_pkey")
+    op.execute(f"ALTER TABLE {table}_legacy RENAME CONSTRAINT {unique} TO {unique}_legacy")
+    op.execute(f"ALTER TABLE {table}_legacy RENAME CONSTRAINT {table}_employee_id_fkey TO {table}_legacy_employee_id_fkey")
+    for index in indexes:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_legacy")
+
+
+def _add_constraints(table: str, unique: str, indexes: list[str], pk: str) -> None:
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({pk})")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {unique} UNIQUE (employee_id, week_start)")
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_employee_id_fkey "
+        f"FOREIGN KEY (employee_id) REFERENCES employees (id)"
+    )
+    for index in indexes:
+        op.execute(f"CREATE INDEX {index} ON {table} (week_start)")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    current = date.today().replace(day=1)
+    for table, (unique, indexes) in TABLES.items():
+        _rename_legacy(table, unique, indexes)
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {table}_legacy INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (week_start)"
+        )
+        _add_constraints(table, unique, indexes, 'id, week_start')
+
+        oldest = bind.execute(sa.text(f"SELECT min(week_start) FROM {table}_legacy")).scalar()
+        month = min(oldest.replace(day=1), current) if oldest else current
+        while month <= _add_months(current, MONTHS_AHEAD):
+            upper = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            month = upper
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_legacy")
+        op.execute(f"DROP TABLE {table}_legacy")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, (unique, indexes) in TABLES.items():
+        _rename_legacy(table, unique, indexes)
+        op.execute(f"CREATE TABLE {table} (LIKE {table}_legacy INCLUDING DEFAULTS)")
+        _add_constraints(table, unique, indexes, 'id')
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_legacy")
+        op.execute(f"DROP TABLE {table}_legacy CASCADE")
@@ -0,0 +1,39 @@
+"""purge jobs
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'purge_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('employee_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('cutoff', sa.Date, nullable=True),
+        sa.Column('status', sa.String(20), server_default='pending'),
+        sa.Column('step', sa.Integer, server_default='0'),
+        sa.Column('progress', postgresql.JSON, server_default='{}'),
+        sa.Column('error', sa.Text, server_default=''),
+        sa.Column('created_at', sa.DateTime, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime, server_default=sa.func.now()),
+        sa.Column('finished_at', sa.DateTime, nullable=True),
+    )
+    op.create_index('ix_purge_job_status', 'purge_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_purge_job_status', table_name='purge_jobs')
+    op.drop_table('purge_jobs')
@@ -0,0 +1,37 @@
+"""(employee_id, week_start DESC) covering indexes for latest-row lookups
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # On the partitioned tables (004) Postgres creates a matching index on every partition
+    op.create_index(
+        'ix_signal_employee_latest', 'weekly_signals',
+        ['employee_id', sa.text('week_start DESC')],
+        postgresql_include=['workload_items'],
+    )
+    op.create_index(
+        'ix_score_employee_latest', 'employee_scores',
+        ['employee_id', sa.text('week_start DESC')],
+        postgresql_include=[
+            'burnout_risk', 'high_pressure', 'high_potential', 'performance_degradation',
+            'burnout_label', 'pressure_label', 'potential_label', 'degradation_label',
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_score_employee_latest', table_name='employee_scores')
+    op.drop_index('ix_signal_employee_latest', table_name='weekly_signals')
@@ -0,0 +1,250 @@
+"""pack score explanations into one deferred binary column
+
+Replaces the four JSON explanation columns of employee_scores with
+`explanations`, the compact encoding of app.scoring.explanations. Existing
+rows are converted in batches.
+
+The encoder and decoder below are a frozen copy of format version 1 of
+app.scoring.explanations (written with `struct`, byte for byte what its
+numpy records produce): later changes to the app's format must not change
+what this revision writes or reads back.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+"""
+import logging
+import math
+import re
+import struct
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger(f"alembic.migration.{revision}")
+
+JSON_COLUMNS = {
+    'burnout_explanation': ('burnout_risk', 'burnout_label'),
+    'pressure_explanation': ('high_pressure', 'pressure_label'),
+    'potential_explanation': ('high_potential', 'potential_label'),
+    'degradation_explanation': ('performance_degradation', 'degradation_label'),
+}
+BATCH = 1000
+
+scores = sa.table(
+    'employee_scores',
+    sa.column('id', postgresql.UUID(as_uuid=True)),
+    sa.column('week_start', sa.Date),
+    sa.column('explanations', sa.LargeBinary),
+    *(sa.column(name, sa.JSON) for name in JSON_COLUMNS),
+    *(sa.column(c, sa.Float) for c, _ in JSON_COLUMNS.values()),
+    *(sa.column(label, sa.String) for _, label in JSON_COLUMNS.values()),
+)
+
+# One UPDATE per batch: executemany over these bound statements
+_by_row = (scores.c.id == sa.bindparam('row_id'), scores.c.week_start == sa.bindparam('row_week'))
+
+
+# ── Frozen explanation codec (format version 1) ─────────────────────
+
+FORMAT_VERSION = 1
+DIMENSIONS = ("burnout_risk", "high_pressure", "high_potential", "performance_degradation")
+SIGNALS = (
+    "tasks_completed", "missed_deadlines", "workload_items", "cycle_time_days",
+    "meeting_hours", "meeting_count", "fragmentation_score", "focus_blocks",
+    "after_hours_events", "unique_collaborators", "cross_team_ratio", "support_actions",
+    "learning_hours", "stretch_assignments", "skill_progress", "tasks_completed_trend",
+)
+DIRECTIONS = ("stable", "increasing", "decreasing")
+ARROWS = ("→", "↗", "↘")
+LOW_CONFIDENCE = "Low confidence – limited data available."
+MISSING_SIGNALS = "Some signals missing or zero."
+NO_LIMITATIONS = "No significant limitations."
+INSUFFICIENT = "Insufficient data"
+_DATA_QUALITY_RE = re.compile(r"Data quality: (\d+)%\.")
+_DELTA_RE = re.compile(r"^(→|↗|↘) (\w+) \(Δ([+-]?[\w.]+)/week\)$")
+_INT_VALUE, _DELTA_EMPTY, _DELTA_INSUFFICIENT, _DELTA_SLOPE, _DELTA_MASK = 1, 0, 2, 4, 6
+
+# Packed records, field for field the numpy dtypes of version 1:
+# header – dimension, contributors, limitation bits, data quality, confidence
+# contributor – signal, flags, direction, arrow, value, normalized, weight, contribution, slope
+HEADER = struct.Struct("<BBBBf")
+CONTRIBUTOR = struct.Struct("<BBBBdffff")
+_F4_MAX = 3.4028234663852886e38
+
+
+def _f4(x) -> float:
+    """A float32 field, clamped to its range."""
+    x = float(x)
+    return x if math.isnan(x) else max(-_F4_MAX, min(_F4_MAX, x))
+
+
+def _pack_delta(delta: str, row_id) -> tuple:
+    if not delta:
+        return _DELTA_EMPTY, 0, 0.0
+    if delta == INSUFFICIENT:
+        return _DELTA_INSUFFICIENT, 0, 0.0
+    match = _DELTA_RE.match(delta)
+    try:
+        return _DELTA_SLOPE, ARROWS.index(match[1]), round(float(match[3]), 2)
+    except (TypeError, ValueError):
+        logger.warning("employee_scores %s: dropping unrecognised trend summary %r", row_id, delta)
+        return _DELTA_EMPTY, 0, 0.0
+
+
+def pack_explanations(results: list, row_id=None) -> bytes:
+    results = [r for r in results if r.get("score_name") in DIMENSIONS]
+    headers, rows = [], []
+    for result in results:
+        limitations = result.get("limitations", "")
+        bits = (1 if LOW_CONFIDENCE in limitations else 0) | (4 if MISSING_SIGNALS in limitations else 0)
+        quality = _DATA_QUALITY_RE.search(limitations)
+        if quality:
+            bits |= 2
+        contributors = []
+        for c in result.get("top_contributors", []):
+            if c.get("signal") not in SIGNALS:
+                logger.warning("employee_scores %s: skipping unknown signal %r", row_id, c.get("signal"))
+                continue
+            flag, arrow, slope = _pack_delta(c.get("delta", ""), row_id)
+            value = c.get("value", 0)
+            is_int = isinstance(value, int) and not isinstance(value, bool)
+            direction = c.get("direction", "stable")
+            contributors.append(CONTRIBUTOR.pack(
+                SIGNALS.index(c["signal"]), flag | (_INT_VALUE if is_int else 0),
+                DIRECTIONS.index(direction) if direction in DIRECTIONS else 0, arrow,
+                float(value), _f4(c.get("normalized", 0.0)), _f4(c.get("weight", 0.0)),
+                _f4(c.get("contribution", 0.0)), _f4(slope),
+            ))
+        contributors = contributors[:255]
+        headers.append(HEADER.pack(
+            DIMENSIONS.index(result["score_name"]), len(contributors), bits,
+            min(int(quality[1]), 255) if quality else 0, _f4(result.get("confidence", 0.0)),
+        ))
+        rows.extend(contributors)
+    return bytes([FORMAT_VERSION, len(results)]) + b"".join(headers) + b"".join(rows)
+
+
+def unpack_explanations(blob: bytes, dimension_scores: dict) -> list:
+    if not blob:
+        return []
+    if blob[0] != FORMAT_VERSION:
+        raise ValueError(f"Unknown explanation format version {blob[0]}")
+    n = blob[1]
+    headers = [HEADER.unpack_from(blob, 2 + i * HEADER.size) for i in range(n)]
+    offset = 2 + n * HEADER.size
+    results = []
+    for dim, count, bits, quality, confidence in headers:
+        block = [CONTRIBUTOR.unpack_from(blob, offset + i * CONTRIBUTOR.size) for i in range(count)]
+        offset += count * CONTRIBUTOR.size
+        dimension = DIMENSIONS[dim]
+        if dimension not in dimension_scores:
+            continue
+        top = []
+        for signal, flags, direction, arrow, value, normalized, weight, contribution, slope in block:
+            kind = flags & _DELTA_MASK
+            if kind == _DELTA_SLOPE:
+                delta = f"{ARROWS[arrow]} {DIRECTIONS[direction]} (Δ{slope:+.2f}/week)"
+            else:
+                delta = INSUFFICIENT if kind == _DELTA_INSUFFICIENT else ""
+            top.append({
+                "signal": SIGNALS[signal],
+                "value": int(value) if flags & _INT_VALUE else value,
+                "normalized": round(normalized, 3),
+                "weight": round(weight, 4),
+                "contribution": round(contribution, 4),
+                "direction": DIRECTIONS[direction],
+                "delta": delta,
+            })
+        parts = [LOW_CONFIDENCE] if bits & 1 else []
+        if bits & 2:
+            parts.append(f"Data quality: {quality}%.")
+        if bits & 4:
+            parts.append(MISSING_SIGNALS)
+        moving = [f"{c['signal']} is {c['direction']}" for c in top if c["direction"] != "stable"]
+        score, label = dimension_scores[dimension]
+        results.append({
+            "score_name": dimension,
+            "score": score,
+            "label": label,
+            "top_contributors": top,
+            "trend_explanation": "; ".join(moving) if moving else "All key signals stable.",
+            "confidence": round(confidence, 2),
+            "limitations": " ".join(parts) if parts else NO_LIMITATIONS,
+        })
+    return results
+
+
+# ── Migration ───────────────────────────────────────────────────────
+
+def _batches(bind, columns):
+    last = None
+    while True:
+        query = sa.select(*columns).order_by(scores.c.id).limit(BATCH)
+        if last is not None:
+            query = query.where(scores.c.id > last)
+        rows = bind.execute(query).all()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1].id
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.add_column('employee_scores', sa.Column('explanations', sa.LargeBinary, nullable=True))
+
+    columns = [scores.c.id, scores.c.week_start, *(scores.c[name] for name in JSON_COLUMNS)]
+    for rows in _batches(bind, columns):
+        bind.execute(scores.update().where(*_by_row), [
+            {
+                'row_id': row.id,
+                'row_week': row.week_start,
+                'explanations': pack_explanations(
+                    [getattr(row, name) for name in JSON_COLUMNS if getattr(row, name)], row.id,
+                ),
+            }
+            for row in rows
+        ])
+
+    with op.batch_alter_table('employee_scores') as batch:
+        for name in JSON_COLUMNS:
+            batch.drop_column(name)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    with op.batch_alter_table('employee_scores') as batch:
+        for name in JSON_COLUMNS:
+            batch.add_column(sa.Column(name, postgresql.JSON, server_default='{}'))
+
+    columns = [
+        scores.c.id, scores.c.week_start, scores.c.explanations,
+        *(scores.c[c] for c, _ in JSON_COLUMNS.values()),
+        *(scores.c[label] for _, label in JSON_COLUMNS.values()),
+    ]
+    for rows in _batches(bind, columns):
+        params = []
+        for row in rows:
+            unpacked = {
+                r['score_name']: r
+                for r in unpack_explanations(row.explanations or b'', {
+                    dim: (getattr(row, dim), getattr(row, label)) for dim, label in JSON_COLUMNS.values()
+                })
+            }
+            params.append({
+                'row_id': row.id,
+                'row_week': row.week_start,
+                **{name: unpacked.get(dim, {}) for name, (dim, _) in JSON_COLUMNS.items()},
+            })
+        bind.execute(scores.update().where(*_by_row), params)
+
+    with op.batch_alter_table('employee_scores') as batch:
+        batch.drop_column('explanations')
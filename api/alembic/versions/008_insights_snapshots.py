@@ -0,0 +1,33 @@
+"""insights snapshots
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'insights_snapshots',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('employee_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('employees.id'), nullable=False),
+        sa.Column('week_start', sa.Date, nullable=False),
+        sa.Column('version', sa.String(64), nullable=False),
+        sa.Column('body', sa.LargeBinary, nullable=False),
+        sa.Column('created_at', sa.DateTime, server_default=sa.func.now()),
+        sa.UniqueConstraint('employee_id', name='uq_snapshot_employee'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('insights_snapshots')
@@ -0,0 +1,25 @@
+"""purge job claims
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('purge_jobs', sa.Column('owner', sa.String(100), nullable=False, server_default=''))
+    op.add_column('purge_jobs', sa.Column('heartbeat_at', sa.DateTime, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('purge_jobs', 'heartbeat_at')
+    op.drop_column('purge_jobs', 'owner')
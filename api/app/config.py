@@ -25,16 +25,41 @@ class Settings(BaseSettings):
     # ── Database ────────────────────────────────────────────────────
     database_url: str = "postgresql+asyncpg://talentpulse:talentpulse_secret@db:5432/talentpulse"
     database_url_sync: str = "postgresql://talentpulse:talentpulse_secret@db:5432/talentpulse"
+    database_replica_urls: str = ""  # comma-separated read replicas for dashboard reads ("" = primary only)
+    replica_max_lag_seconds: float = 10.0  # replicas further behind the primary are skipped
+    replica_check_interval_seconds: float = 5.0  # how long a replica's measured lag is trusted
+    db_pool_size: int = 10  # persistent connections per engine (per worker process)
+    db_max_overflow: int = 10  # extra connections opened under load, closed when returned
+    db_pool_timeout: float = 30.0  # seconds a request waits for a free connection
+    db_pool_recycle: int = 1800  # replace connections older than this (-1 = never)
+    db_pool_pre_ping: str = "idle"  # always | idle (only after db_pool_pre_ping_idle_seconds) | never
+    db_pool_pre_ping_idle_seconds: float = 30.0
+    db_statement_cache_size: int = 100  # asyncpg prepared statements per connection (0 = off, e.g. PgBouncer)
 
     # ── API ─────────────────────────────────────────────────────────
+    app_env: str = "development"  # production: no create_all at startup, slow warm-ups in the background
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     secret_key: str = "change-me-in-production"
+    response_cache_enabled: bool = True  # ETag'd cache for /org/overview, /teams, /employees
+    response_cache_path: str = "data/response_cache.sqlite3"  # shared by workers; "" = per process
+    response_cache_max_entries: int = 500
+    response_cache_ttl_seconds: int = 3600  # safety net – writes invalidate explicitly
 
     # ── Ollama (local LLM) ─────────────────────────────────────────
     ollama_base_url: str = "http://localhost:11434"
     ollama_model: str = "llama3.1:8b"
     ollama_timeout: int = 60
+    ollama_warmup: bool = True  # load the model at startup and keep it loaded
+    ollama_keep_alive_seconds: int = 1800  # Ollama unloads the model after this idle time (-1 = never)
+    llm_concurrency: int = 1  # generations Ollama runs at once
+    llm_queue_deadline_seconds: float = 20.0  # interactive: template fallback past this wait
+    llm_batch_deadline_seconds: float = 0.0  # batch: 0 = wait as long as it takes
+    llm_cache_path: str = "data/llm_cache.sqlite3"  # "" = in-memory only
+    llm_cache_max_entries: int = 1000
+    llm_cache_ttl_hours: int = 168
+    pregenerate_enabled: bool = True  # nightly batch generation of agendas / review drafts
+    pregenerate_hour: int = 2  # local hour (`timezone`) the batch job runs
 
     # ── Mode ────────────────────────────────────────────────────────
     demo_mode: bool = True
@@ -44,9 +69,15 @@ class Settings(BaseSettings):
     graph_client_id: str = ""
     graph_client_secret: str = ""
     enable_graph_ingestion: bool = False
+    metadata_spool_dir: str = "data/spool"  # raw metadata spool for re-aggregation ("" = off)
 
     # ── Privacy ─────────────────────────────────────────────────────
     data_retention_days: int = 90
+    retention_enabled: bool = True  # nightly partition maintenance + retention enforcement
+    retention_hour: int = 3  # local hour (`timezone`) the retention job runs
+    partition_months_ahead: int = 3  # monthly partitions created ahead of time (Postgres)
+    purge_batch_size: int = 1000  # rows deleted per batch by the purge worker
+    purge_batch_pause_ms: int = 50  # pause between purge batches
     working_hours_start: int = 9
     working_hours_end: int = 18
     timezone: str = "America/New_York"
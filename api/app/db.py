@@ -1,29 +1,339 @@
-"""Database engine, session, and base model."""
+"""Database engine, session, and base model.
+
+Writes and anything that must see them go through `get_db` (the primary).
+Read-only dashboard endpoints use `get_read_db`, which routes each request
+to a read replica from `database_replica_urls` when one is configured,
+reachable and no more than `replica_max_lag_seconds` behind the primary –
+otherwise to the primary, so a lagging or down replica costs freshness
+checks, never errors.
+
+Every engine uses a `MeteredQueuePool` sized from `Settings` (`db_pool_*`),
+which counts checkouts, waiters and the time spent waiting for a connection
+(`pool_stats`, shown by `GET /health`). Pre-ping is `idle` by default: a
+connection is pinged on checkout only if it sat unused for
+`db_pool_pre_ping_idle_seconds`, instead of a round trip on every checkout.
+"""
 
 from __future__ import annotations
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import logging
+import math
+import time
+
+from fastapi import Request
+from sqlalchemy import event, exc, make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import get_settings
+from app.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def _engine():
-    return create_async_engine(get_settings().database_url, echo=False, pool_pre_ping=True)
+# ── Connection pool ─────────────────────────────────────────────────
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout waits."""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.checkouts = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.pings = 0
+        self.stale = 0
+
+    def connect(self):
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        started = time.monotonic()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+            waited = time.monotonic() - started
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        self.checkouts += 1
+        return conn
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "checkouts": self.checkouts,
+            "avg_wait_ms": round(self.wait_total / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.wait_max * 1000, 2),
+            "timeouts": self.timeouts,
+            "pings": self.pings,
+            "stale_replaced": self.stale,
+        }
+
+
+def _ping_idle_connections(engine: AsyncEngine, idle_seconds: float) -> None:
+    """Ping connections on checkout only when they have been idle a while."""
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _checked_in(dbapi_connection, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _checked_out(dbapi_connection, record, proxy):
+        checked_in_at = record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        pool = engine.sync_engine.pool
+        pool.pings += 1
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            pool.stale += 1
+            raise exc.DisconnectionError(f"Idle connection failed its ping: {e}") from e  # pool retries
+        finally:
+            cursor.close()
+
+
+def engine_options(url) -> dict:
+    """`create_async_engine` keyword arguments for `url` from the pool settings."""
+    cfg = get_settings()
+    url = make_url(url)
+    kwargs: dict = {"echo": False}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        kwargs["pool_pre_ping"] = cfg.db_pool_pre_ping != "never"  # single shared connection
+    else:
+        kwargs.update(
+            poolclass=MeteredQueuePool,
+            pool_size=cfg.db_pool_size,
+            max_overflow=cfg.db_max_overflow,
+            pool_timeout=cfg.db_pool_timeout,
+            pool_recycle=cfg.db_pool_recycle,
+            pool_pre_ping=cfg.db_pool_pre_ping == "always",
+        )
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "asyncpg":
+        kwargs["connect_args"] = {
+            "prepared_statement_cache_size": cfg.db_statement_cache_size,  # SQLAlchemy's cache
+            "statement_cache_size": cfg.db_statement_cache_size,  # asyncpg's own
+        }
+    return kwargs
+
+
+def _engine(url: str | None = None) -> AsyncEngine:
+    cfg = get_settings()
+    new = create_async_engine(url or cfg.database_url, **engine_options(url or cfg.database_url))
+    if isinstance(new.sync_engine.pool, MeteredQueuePool) and cfg.db_pool_pre_ping == "idle":
+        _ping_idle_connections(new, cfg.db_pool_pre_ping_idle_seconds)
+    return new
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Utilization of an engine's pool (`{}` for unmetered pools)."""
+    pool = engine.sync_engine.pool
+    return pool.stats() if isinstance(pool, MeteredQueuePool) else {}
 
 
 engine = _engine()
 async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+# ── Read replicas ───────────────────────────────────────────────────
+
+# The primary's WAL position, taken just before a replica is checked.
+PRIMARY_LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+
+# 0 when the replica has replayed up to that position (an idle primary is not
+# lag), else seconds since the last replayed transaction (infinite if none).
+# Comparing with the primary – not with what the replica itself received –
+# also catches a broken replication link: the replica stops receiving WAL,
+# the primary moves on, and the lag keeps growing.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_replay_lsn() >= CAST(:primary_lsn AS pg_lsn) THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity'::float8) END"
+)
+
+# How far the replica has replayed (a server not in recovery is the primary itself).
+REPLICA_REPLAY_LSN_SQL = text("SELECT COALESCE(pg_last_wal_replay_lsn(), pg_current_wal_lsn())::text")
+
+UNREACHED_LSN = 2**63 - 1  # a position no replica reaches: read from the primary
+
+
+def lsn_value(lsn: str) -> int:
+    """`pg_lsn` text ("16/B374D848") as a comparable integer."""
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+class Replica:
+    """One read replica and its last measured lag."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine: AsyncEngine = _engine(url)
+        self.session_factory = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.lag: float = math.inf  # unknown until checked
+        self.replay_lsn: int | None = None  # WAL replayed at the last check (None off PostgreSQL)
+        self.checked_at: float = -math.inf
+        self.error: str = ""
+
+    async def measure_lag(self, primary_lsn: str | None = None) -> float:
+        """Query the replica's lag behind `primary_lsn` (inf if it cannot be reached).
+
+        On PostgreSQL an unknown primary position counts as unknown lag.
+        """
+        try:
+            async with self.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    if primary_lsn is None:
+                        raise RuntimeError("primary WAL position unknown")
+                    self.lag = float(await conn.scalar(REPLICA_LAG_SQL, {"primary_lsn": primary_lsn}))
+                    self.replay_lsn = lsn_value(await conn.scalar(REPLICA_REPLAY_LSN_SQL))
+                else:
+                    await conn.execute(text("SELECT 1"))
+                    self.lag = 0.0
+            self.error = ""
+        except Exception as e:
+            logger.warning("Read replica %s unavailable: %s", self.engine.url.host or self.url, e)
+            self.lag, self.error = math.inf, str(e)
+        self.checked_at = time.monotonic()
+        return self.lag
+
+
+class ReplicaRouter:
+    """Picks a session factory for read-only work: a fresh replica or the primary.
+
+    Replicas are tried round-robin; a replica's lag is re-measured at most
+    every `replica_check_interval_seconds`, so the check adds one cheap
+    query per replica per interval, not one per request.
+    """
+
+    def __init__(self, primary: async_sessionmaker, urls: list[str]):
+        self.primary = primary
+        self.replicas = [Replica(url) for url in urls]
+        self._next = 0
+        self.reads = {"replica": 0, "primary": 0}
+
+    @classmethod
+    def from_settings(cls, primary: async_sessionmaker) -> ReplicaRouter:
+        urls = [u.strip() for u in get_settings().database_replica_urls.split(",") if u.strip()]
+        return cls(primary, urls)
+
+    async def primary_lsn(self) -> str | None:
+        """The primary's current WAL position (None off PostgreSQL or on error)."""
+        try:
+            async with self.primary() as session:
+                if session.bind.dialect.name != "postgresql":
+                    return None
+                return await session.scalar(PRIMARY_LSN_SQL)
+        except Exception as e:
+            logger.warning("Could not read the primary's WAL position: %s", e)
+            return None
+
+    async def write_position(self) -> int:
+        """The primary's WAL position for `response_cache.bump()`.
+
+        0 – no constraint – without replicas or off PostgreSQL. If the
+        position cannot be read, `UNREACHED_LSN`, so the next generation is
+        built on the primary.
+        """
+        if not self.replicas:
+            return 0
+        lsn = await self.primary_lsn()
+        if lsn is not None:
+            return lsn_value(lsn)
+        return UNREACHED_LSN if self.primary.kw["bind"].dialect.name == "postgresql" else 0
+
+    async def _fresh(self, replica: Replica) -> bool:
+        cfg = get_settings()
+        if time.monotonic() - replica.checked_at >= cfg.replica_check_interval_seconds:
+            await replica.measure_lag(await self.primary_lsn())
+        return replica.lag <= cfg.replica_max_lag_seconds
+
+    async def read_session_factory(self, min_lsn: int = 0) -> async_sessionmaker:
+        """A fresh replica – one that replayed `min_lsn` at its last check – or the primary."""
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(self._next + i) % len(self.replicas)]
+            if await self._fresh(replica) and (replica.replay_lsn is None or replica.replay_lsn >= min_lsn):
+                self._next = (self._next + i + 1) % len(self.replicas)
+                self.reads["replica"] += 1
+                return replica.session_factory
+        self.reads["primary"] += 1
+        return self.primary
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {
+                    "host": r.engine.url.host or r.engine.url.database,
+                    "lag_seconds": None if math.isinf(r.lag) else round(r.lag, 2),
+                    "error": r.error or None,
+                    "pool": pool_stats(r.engine),
+                }
+                for r in self.replicas
+            ],
+            "reads": dict(self.reads),
+        }
+
+    async def aclose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter.from_settings(async_session_factory)
+
+
 async def get_db() -> AsyncSession:  # type: ignore[misc]
     async with async_session_factory() as session:
         yield session
 
 
+async def get_read_db() -> AsyncSession:  # type: ignore[misc]
+    """Session for read-only endpoints – a replica when one is fresh enough."""
+    factory = await replica_router.read_session_factory()
+    async with factory() as session:
+        yield session
+
+
+async def get_cached_read_db(request: Request) -> AsyncSession:  # type: ignore[misc]
+    """Session for the endpoints behind `response_cache`.
+
+    A cached body is trusted for its whole generation, so it must be built
+    from data at least as new as the write that bumped it. The session is a
+    replica that had replayed the WAL position recorded by that bump at its
+    last lag check, else the primary; right after a bump that is the primary
+    until the next check. The generation it was chosen for goes to
+    ``request.state`` for `ResponseCache.respond`.
+    """
+    min_lsn = 0
+    if response_cache.enabled:
+        generation, min_lsn = await response_cache.state()
+        request.state.response_cache_generation = generation
+    factory = await replica_router.read_session_factory(min_lsn)
+    async with factory() as session:
+        yield session
+
+
+async def bump_response_cache() -> int:
+    """`response_cache.bump()` after a committed write, with the primary's WAL position."""
+    return await response_cache.bump(await replica_router.write_position())
+
+
 async def init_db():
     """Create all tables (dev convenience – prefer Alembic in production)."""
     async with engine.begin() as conn:
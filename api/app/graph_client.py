@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
+
 import httpx
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 
 class GraphClient:
     """Fetches ONLY metadata from Microsoft 365. NEVER reads message bodies,
@@ -17,62 +22,160 @@ class GraphClient:
     MAIL_SELECT = "receivedDateTime,sentDateTime,importance,isRead"
     CALENDAR_SELECT = "start,end,organizer,attendees,responseStatus,showAs"
 
-    def __init__(self):
+    PAGE_SIZE = 200
+    MAX_RETRIES = 5
+    MAX_RETRY_AFTER = 30  # seconds – cap on a server-requested back-off
+    BATCH_LIMIT = 20  # Graph JSON batching limit
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
         s = get_settings()
         self.tenant_id = s.graph_tenant_id
         self.client_id = s.graph_client_id
         self.client_secret = s.graph_client_secret
         self._token: str | None = None
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self.throttled = 0  # 429s absorbed so far
+
+    def _http(self) -> httpx.AsyncClient:
+        """Shared keep-alive client (created lazily, inside the running loop)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=self._transport, timeout=30)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def _get_token(self) -> str:
         if self._token:
             return self._token
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                self.TOKEN_URL.format(tenant=self.tenant_id),
-                data={
-                    "grant_type": "client_credentials",
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                    "scope": "https://graph.microsoft.com/.default",
-                },
-            )
-            resp.raise_for_status()
-            self._token = resp.json()["access_token"]
-            return self._token
+        resp = await self._http().post(
+            self.TOKEN_URL.format(tenant=self.tenant_id),
+            data={
+                "grant_type": "client_credentials",
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "scope": "https://graph.microsoft.com/.default",
+            },
+        )
+        resp.raise_for_status()
+        self._token = resp.json()["access_token"]
+        return self._token
 
-    async def _get(self, path: str, params: dict | None = None) -> dict:
+    async def _request(self, method: str, url: str, **kwargs) -> dict:
+        """Authenticated request honouring 429/503 Retry-After back-off."""
         token = await self._get_token()
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.GRAPH_URL}{path}",
-                headers={"Authorization": f"Bearer {token}"},
-                params=params or {},
+        for attempt in range(self.MAX_RETRIES + 1):
+            resp = await self._http().request(
+                method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs
             )
+            if resp.status_code in (429, 503) and attempt < self.MAX_RETRIES:
+                self.throttled += 1
+                delay = min(float(resp.headers.get("Retry-After", 2 ** attempt)), self.MAX_RETRY_AFTER)
+                logger.info("Graph throttled (%s) – retrying in %.1fs", resp.status_code, delay)
+                await asyncio.sleep(delay)
+                continue
             resp.raise_for_status()
             return resp.json()
+        raise RuntimeError("unreachable")
+
+    async def _get(self, path: str, params: dict | None = None) -> dict:
+        return await self._request("GET", f"{self.GRAPH_URL}{path}", params=params or {})
+
+    async def _get_all(self, path: str, params: dict | None = None) -> list[dict]:
+        """GET a collection, following `@odata.nextLink` until exhausted."""
+        data = await self._get(path, params)
+        values = list(data.get("value", []))
+        while next_link := data.get("@odata.nextLink"):
+            data = await self._request("GET", next_link)
+            values.extend(data.get("value", []))
+        return values
 
     async def get_calendar_events(self, user_id: str, start: str, end: str) -> list[dict]:
         """Get calendar event METADATA only."""
-        data = await self._get(
+        return await self._get_all(
             f"/users/{user_id}/calendarView",
             params={
                 "startDateTime": start,
                 "endDateTime": end,
                 "$select": self.CALENDAR_SELECT,
-                "$top": "200",
+                "$top": str(self.PAGE_SIZE),
             },
         )
-        return data.get("value", [])
+
+    async def get_calendar_delta(
+        self,
+        user_id: str,
+        start: str,
+        end: str,
+        delta_link: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """Incremental calendar METADATA sync.
+
+        First call (no `delta_link`) returns the full window; pass the returned
+        delta link back on later runs to receive only changed events.
+        """
+        if delta_link:
+            data = await self._request("GET", delta_link)
+        else:
+            data = await self._get(
+                f"/users/{user_id}/calendarView/delta",
+                params={"startDateTime": start, "endDateTime": end, "$select": self.CALENDAR_SELECT},
+            )
+        values = list(data.get("value", []))
+        while next_link := data.get("@odata.nextLink"):
+            data = await self._request("GET", next_link)
+            values.extend(data.get("value", []))
+        return values, data.get("@odata.deltaLink")
 
     async def get_mail_metadata(self, user_id: str, start: str, end: str) -> list[dict]:
-        """Get mail METADATA only – no subject, body, preview, attachments."""
-        data = await self._get(
-            f"/users/{user_id}/messages",
+        """Get inbound mail METADATA only – no subject, body, preview, attachments."""
+        return await self._get_all(
+            f"/users/{user_id}/mailFolders/inbox/messages",
             params={
                 "$filter": f"receivedDateTime ge {start} and receivedDateTime le {end}",
                 "$select": self.MAIL_SELECT,
-                "$top": "200",
+                "$top": str(self.PAGE_SIZE),
+            },
+        )
+
+    async def get_sent_mail_metadata(self, user_id: str, start: str, end: str) -> list[dict]:
+        """Get sent mail METADATA only – timestamps, never recipients or content."""
+        return await self._get_all(
+            f"/users/{user_id}/mailFolders/sentitems/messages",
+            params={
+                "$filter": f"sentDateTime ge {start} and sentDateTime le {end}",
+                "$select": self.MAIL_SELECT,
+                "$top": str(self.PAGE_SIZE),
             },
         )
-        return data.get("value", [])
+
+    async def batch(self, requests: list[dict]) -> dict[str, dict]:
+        """Send GET sub-requests through `$batch` (≤20 per round trip).
+
+        Each request is ``{"id": ..., "url": "/users/..."}``; returns
+        ``{id: {"status": int, "body": dict}}``. Throttled sub-requests are
+        retried in a follow-up batch.
+        """
+        pending = {r["id"]: {"id": r["id"], "method": "GET", "url": r["url"]} for r in requests}
+        results: dict[str, dict] = {}
+        for attempt in range(self.MAX_RETRIES + 1):
+            if not pending:
+                break
+            ids = list(pending)
+            retry_after = 0.0
+            for i in range(0, len(ids), self.BATCH_LIMIT):
+                chunk = [pending[k] for k in ids[i:i + self.BATCH_LIMIT]]
+                data = await self._request("POST", f"{self.GRAPH_URL}/$batch", json={"requests": chunk})
+                for sub in data.get("responses", []):
+                    if sub.get("status") == 429 and attempt < self.MAX_RETRIES:
+                        self.throttled += 1
+                        retry_after = max(retry_after, float((sub.get("headers") or {}).get("Retry-After", 1)))
+                        continue
+                    results[sub["id"]] = {"status": sub.get("status"), "body": sub.get("body") or {}}
+                    pending.pop(sub["id"], None)
+            if pending:
+                await asyncio.sleep(min(retry_after, self.MAX_RETRY_AFTER))
+        return results
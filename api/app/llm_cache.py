@@ -0,0 +1,241 @@
+"""Persistent cache for Ollama responses.
+
+Generation takes seconds on CPU, while an employee's signals and scores only
+change when a new week is synced, so repeat views of the same 1:1 agenda or
+review draft are served from here.
+
+Entries are keyed by (model, system prompt, prompt hash) and tagged with a
+scope (``employee:<id>``) and version (the employee's latest ``week_start``).
+A lookup under a newer version drops everything older in that scope. An
+in-memory LRU sits in front of a local SQLite file, so the cache survives
+restarts. Both are bounded by `llm_cache_max_entries` and entries expire
+after `llm_cache_ttl_hours`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Callable, TypeVar
+
+from app.config import get_settings
+from app.ollama_client import LLMQueue, ollama
+
+T = TypeVar("T")
+
+
+class LLMResponseCache:
+    """Two-level (memory LRU + SQLite) response cache with TTL."""
+
+    def __init__(self, path: str = "", max_entries: int = 1000, ttl_seconds: float = 7 * 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[str, str, str, float]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._versions: dict[str, str] = {}  # scope → version last looked up
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, system: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, system, prompt):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _conn(self) -> sqlite3.Connection | None:
+        if not self.path:
+            return None
+        if self._db is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, scope TEXT, version TEXT, value TEXT,"
+                " created_at REAL, accessed_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_scope ON llm_cache (scope)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed ON llm_cache (accessed_at)")
+        return self._db
+
+    def _remember(self, key: str, entry: tuple[str, str, str, float]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _sync_version(self, scope: str, version: str) -> None:
+        """First lookup under a new version drops the scope's older entries."""
+        if not scope or self._versions.get(scope) == version:
+            return
+        self._versions[scope] = version
+        stale = [k for k, entry in self._memory.items() if entry[1] == scope and entry[2] != version]
+        for k in stale:
+            del self._memory[k]
+        db = self._conn()
+        if db is not None:
+            db.execute("DELETE FROM llm_cache WHERE scope = ? AND version != ?", (scope, version))
+            db.commit()
+
+    def get(self, key: str, scope: str = "", version: str = "") -> str | None:
+        """Cached response, or None on a miss / expiry / version change."""
+        self._sync_version(scope, version)
+        now = time.time()
+        entry = self._memory.get(key)
+        db = self._conn()
+        if entry is None and db is not None:
+            row = db.execute(
+                "SELECT value, scope, version, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                entry = tuple(row)
+
+        if entry is not None and now - entry[3] > self.ttl_seconds:
+            self.delete(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, entry)
+        if db is not None:
+            db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            db.commit()
+        return entry[0]
+
+    def put(self, key: str, value: str, scope: str = "", version: str = "") -> None:
+        now = time.time()
+        self._remember(key, (value, scope, version, now))
+        db = self._conn()
+        if db is None:
+            return
+        db.execute(
+            "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+            (key, scope, version, value, now, now),
+        )
+        # LRU bound on disk: drop the least recently read rows past the cap
+        db.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            " SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        db.commit()
+
+    def delete(self, key: str) -> None:
+        self._memory.pop(key, None)
+        db = self._conn()
+        if db is not None:
+            db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            db.commit()
+
+    def invalidate(self, scope: str) -> int:
+        """Drop every entry in a scope (e.g. on GDPR deletion)."""
+        self._versions.pop(scope, None)
+        stale = [k for k, entry in self._memory.items() if entry[1] == scope]
+        for k in stale:
+            del self._memory[k]
+        db = self._conn()
+        if db is None:
+            return len(stale)
+        cur = db.execute("DELETE FROM llm_cache WHERE scope = ?", (scope,))
+        db.commit()
+        return max(len(stale), cur.rowcount)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        self._versions.clear()
+        db = self._conn()
+        if db is not None:
+            db.execute("DELETE FROM llm_cache")
+            db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        return {"entries": len(self._memory), "hits": self.hits, "misses": self.misses}
+
+
+def _from_settings() -> LLMResponseCache:
+    s = get_settings()
+    return LLMResponseCache(s.llm_cache_path, s.llm_cache_max_entries, s.llm_cache_ttl_hours * 3600)
+
+
+async def generate_cached(
+    prompt: str,
+    system: str,
+    parse: Callable[[str], T | None],
+    scope: str = "",
+    version: str = "",
+    priority: str = LLMQueue.INTERACTIVE,
+    json_mode: bool = False,
+    num_predict: int | None = None,
+) -> T | None:
+    """`parse(response)` from the cache or a fresh Ollama call.
+
+    Only responses that `parse` accepts are cached, so a malformed generation
+    is retried next time instead of pinning the template fallback.
+    """
+    key = llm_cache.key(ollama.model, system, prompt)
+    cached = llm_cache.get(key, scope, version)
+    if cached is not None:
+        parsed = parse(cached)
+        if parsed is not None:
+            return parsed
+        llm_cache.delete(key)
+
+    result = await ollama.generate(prompt, system, priority, json_mode=json_mode, num_predict=num_predict)
+    if not result:
+        return None
+    parsed = parse(result)
+    if parsed is not None:
+        llm_cache.put(key, result, scope, version)
+    return parsed
+
+
+async def stream_cached(
+    prompt: str,
+    system: str,
+    parse: Callable[[str], T | None],
+    scope: str = "",
+    version: str = "",
+    json_mode: bool = False,
+    num_predict: int | None = None,
+) -> AsyncIterator[tuple[str, str | T | None]]:
+    """Streaming counterpart of `generate_cached`.
+
+    Yields ``("token", chunk)`` while Ollama generates, then exactly one
+    ``("result", parsed | None)``. A cache hit skips straight to the result.
+    """
+    key = llm_cache.key(ollama.model, system, prompt)
+    cached = llm_cache.get(key, scope, version)
+    if cached is not None:
+        parsed = parse(cached)
+        if parsed is not None:
+            yield "result", parsed
+            return
+        llm_cache.delete(key)
+
+    chunks: list[str] = []
+    async for chunk in ollama.generate_stream(prompt, system, json_mode=json_mode, num_predict=num_predict):
+        chunks.append(chunk)
+        yield "token", chunk
+    text = "".join(chunks)
+    parsed = parse(text) if text else None
+    if parsed is not None:
+        llm_cache.put(key, text, scope, version)
+    yield "result", parsed
+
+
+# Singleton
+llm_cache = _from_settings()
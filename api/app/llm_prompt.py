@@ -0,0 +1,87 @@
+"""Compact, token-budgeted prompts for the LLM services.
+
+On CPU, prompt evaluation and every generated token are paid for in seconds,
+so prompts carry context as terse ``label: key=value`` lines instead of
+prose, and the reply shape is pinned by Ollama's JSON ``format`` mode plus a
+per-response ``num_predict`` cap. Context sections are given in order of
+importance; when the estimate exceeds the token budget the least important
+sections are dropped first.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import NamedTuple
+
+CHARS_PER_TOKEN = 4  # rough average for English text and numbers on llama tokenizers
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".") if abs(value) < 10 else f"{value:.0f}"
+    return str(value)
+
+
+def compact_line(label: str, values: dict) -> str:
+    """``label: a=1 b=0.25`` – keys keep their snake_case names."""
+    return f"{label}: " + " ".join(f"{k}={_fmt(v)}" for k, v in values.items())
+
+
+def trend_directions(trends: dict, keys: list[str] | None = None) -> dict:
+    """``{signal: "up" | "down"}`` for signals whose trend is not stable."""
+    arrows = {"increasing": "up", "decreasing": "down"}
+    return {
+        key: arrows[t["direction"]]
+        for key, t in trends.items()
+        if (keys is None or key in keys) and t.get("direction") in arrows
+    }
+
+
+class PromptSpec(NamedTuple):
+    """A ready-to-send prompt and the generation cap that goes with it."""
+    system: str
+    prompt: str
+    num_predict: int
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.system) + estimate_tokens(self.prompt)
+
+
+def build_prompt(
+    system: str,
+    task: str,
+    sections: list[tuple[str, dict]],
+    reply_shape: dict[str, str],
+    budget: int,
+    num_predict: int,
+) -> PromptSpec:
+    """Assemble a JSON-mode prompt within `budget` estimated tokens.
+
+    `sections` are ``(label, values)`` pairs, most important first; empty
+    ones are skipped. `reply_shape` maps each JSON key to a short hint of what
+    it should hold.
+    """
+    reply = "Reply with JSON only: " + json.dumps(reply_shape, separators=(",", ":"), ensure_ascii=False)
+    lines = [compact_line(label, values) for label, values in sections if values]
+
+    def render() -> str:
+        return "\n".join([task, *lines, reply])
+
+    while lines and estimate_tokens(system) + estimate_tokens(render()) > budget:
+        lines.pop()
+    return PromptSpec(system, render(), num_predict)
+
+
+def parse_json_object(text: str) -> dict | None:
+    """The reply as a JSON object, or None if it is not one."""
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return data if isinstance(data, dict) else None
@@ -2,20 +2,80 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib
+import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from app.startup import startup_report
 
-from app.db import init_db
-from app.routes import health, sync, org, teams, employees, settings
+with startup_report.measure(startup_report.imports, "fastapi"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+with startup_report.measure(startup_report.imports, "core"):
+    from app.config import get_settings
+    from app.db import async_session_factory, init_db, replica_router
+    from app.llm_cache import llm_cache
+    from app.ollama_client import ollama
+    from app.response_cache import response_cache
+    from app.scheduler import scheduler_leader
+    from app.services.purge import purge_worker
+    from app.services.retention import ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+ROUTERS = ("health", "sync", "org", "teams", "employees", "settings")
+
+
+async def _ensure_partitions() -> None:
+    async with async_session_factory() as db:
+        await ensure_partitions(db)
+
+
+async def _background(name: str, step) -> None:
+    """Run a non-critical startup step after the app accepts traffic."""
+    try:
+        with startup_report.measure(startup_report.background, name):
+            await step()
+    except Exception:
+        logger.exception("Background startup step %s failed", name)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup / shutdown lifecycle."""
-    await init_db()
+    """Startup / shutdown lifecycle.
+
+    In production (`APP_ENV=production`) Alembic owns the schema, so
+    `create_all` is skipped, and the partition check and model warm-up run
+    in the background instead of delaying the first request.
+    """
+    cfg = get_settings()
+    steps = [("ensure_partitions", _ensure_partitions)]  # this month's partitions before the first insert
+    if cfg.ollama_warmup:
+        steps.append(("ollama_warm_up", ollama.warm_up))  # first request must not pay the model load
+    tasks = []
+    if cfg.app_env == "production":
+        tasks = [asyncio.create_task(_background(name, step)) for name, step in steps]
+    else:
+        for name, step in [("init_db", init_db), *steps]:
+            with startup_report.measure(startup_report.startup, name):
+                await step()
+    if cfg.ollama_warmup:
+        ollama.start_keeper()
+    with startup_report.measure(startup_report.startup, "workers"):
+        purge_worker.start()  # finish erasures an earlier process left half done
+        scheduler_leader.start()  # the nightly jobs run in one worker only
+    startup_report.log()
     yield
+    for task in tasks:
+        task.cancel()
+    await scheduler_leader.aclose()
+    await purge_worker.aclose()
+    await ollama.aclose()
+    await replica_router.aclose()
+    llm_cache.close()
+    response_cache.close()
 
 
 app = FastAPI(
@@ -38,9 +98,6 @@ app.add_middleware(
 )
 
 # ── Routes ──────────────────────────────────────────────────────────
-app.include_router(health.router)
-app.include_router(sync.router)
-app.include_router(org.router)
-app.include_router(teams.router)
-app.include_router(employees.router)
-app.include_router(settings.router)
+for _name in ROUTERS:
+    with startup_report.measure(startup_report.imports, f"routes.{_name}"):
+        app.include_router(importlib.import_module(f"app.routes.{_name}").router)
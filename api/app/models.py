@@ -6,7 +6,7 @@ import uuid
 from datetime import datetime, date
 
 from sqlalchemy import (
-    String, Integer, Float, Boolean, Date, DateTime, Text, JSON,
+    String, Integer, Float, Boolean, Date, DateTime, Text, JSON, LargeBinary,
     ForeignKey, Index, UniqueConstraint, func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -106,6 +106,15 @@ class WeeklySignal(Base):
     employee: Mapped["Employee"] = relationship(back_populates="signals")
 
 
+# Latest-week lookups: (employee_id, week_start DESC), covering what the
+# dashboards read so Postgres answers them with an index-only scan.
+SIGNAL_SUMMARY = ("workload_items",)
+Index(
+    "ix_signal_employee_latest", WeeklySignal.employee_id, WeeklySignal.week_start.desc(),
+    postgresql_include=list(SIGNAL_SUMMARY),
+)
+
+
 # ── Scores ──────────────────────────────────────────────────────────
 
 class EmployeeScore(Base):
@@ -131,11 +140,11 @@ class EmployeeScore(Base):
     potential_label: Mapped[str] = mapped_column(String(20), default="Low")
     degradation_label: Mapped[str] = mapped_column(String(20), default="Low")
 
-    # Explainability (JSON)
-    burnout_explanation: Mapped[dict] = mapped_column(JSON, default=dict)
-    pressure_explanation: Mapped[dict] = mapped_column(JSON, default=dict)
-    potential_explanation: Mapped[dict] = mapped_column(JSON, default=dict)
-    degradation_explanation: Mapped[dict] = mapped_column(JSON, default=dict)
+    # Explainability: all four explanations packed by app.scoring.explanations.
+    # Deferred – list queries never load it; undefer() where the detail view needs it.
+    explanations: Mapped[bytes] = mapped_column(
+        LargeBinary, default=b"", deferred=True, deferred_raiseload=True,
+    )
 
     # Confidence 0-1
     confidence: Mapped[float] = mapped_column(Float, default=0.5)
@@ -150,6 +159,38 @@ class EmployeeScore(Base):
     employee: Mapped["Employee"] = relationship(back_populates="scores")
 
 
+SCORE_SUMMARY = (
+    "burnout_risk", "high_pressure", "high_potential", "performance_degradation",
+    "burnout_label", "pressure_label", "potential_label", "degradation_label",
+)
+Index(
+    "ix_score_employee_latest", EmployeeScore.employee_id, EmployeeScore.week_start.desc(),
+    postgresql_include=list(SCORE_SUMMARY),
+)
+SCORE_SUMMARY_COLUMNS = tuple(getattr(EmployeeScore, name) for name in SCORE_SUMMARY)
+
+
+# ── Collaboration ───────────────────────────────────────────────────
+
+class CollaborationBottleneck(Base):
+    """Employees who broker a disproportionate share of collaboration paths in a week."""
+    __tablename__ = "collaboration_bottlenecks"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "week_start", name="uq_bottleneck_employee_week"),
+        Index("ix_bottleneck_week", "week_start"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=_uuid)
+    employee_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("employees.id"), nullable=False)
+    week_start: Mapped[date] = mapped_column(Date, nullable=False)
+    betweenness: Mapped[float] = mapped_column(Float, default=0.0)  # 0-1, approximate
+    unique_collaborators: Mapped[int] = mapped_column(Integer, default=0)
+    cross_team_ratio: Mapped[float] = mapped_column(Float, default=0.0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    employee: Mapped["Employee"] = relationship(lazy="selectin")
+
+
 # ── Skills Matrix ───────────────────────────────────────────────────
 
 class EmployeeSkill(Base):
@@ -165,6 +206,63 @@ class EmployeeSkill(Base):
     employee: Mapped["Employee"] = relationship(back_populates="skills")
 
 
+# ── Pre-generated drafts ────────────────────────────────────────────
+
+class PregeneratedDraft(Base):
+    """LLM agenda / review draft generated by the overnight batch job."""
+    __tablename__ = "pregenerated_drafts"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "kind", name="uq_draft_employee_kind"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=_uuid)
+    employee_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("employees.id"), nullable=False)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)  # questions / review
+    week_start: Mapped[date] = mapped_column(Date, nullable=False)  # latest signal week it was built from
+    fingerprint: Mapped[str] = mapped_column(String(64), default="")  # latest scores it was built from
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+
+class InsightsSnapshot(Base):
+    """Rendered `GET /employees/{id}/insights` response, stored by sync."""
+    __tablename__ = "insights_snapshots"
+    __table_args__ = (
+        UniqueConstraint("employee_id", name="uq_snapshot_employee"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=_uuid)
+    employee_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("employees.id"), nullable=False)
+    week_start: Mapped[date] = mapped_column(Date, nullable=False)  # latest signal week it was rendered from
+    version: Mapped[str] = mapped_column(String(64), nullable=False)  # digest of `body` (the ETag)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # response JSON, UTF-8
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_now, onupdate=_now)
+
+
+# ── Background jobs ─────────────────────────────────────────────────
+
+class PurgeJob(Base):
+    """A batched delete run by the purge worker (GDPR erasure or retention)."""
+    __tablename__ = "purge_jobs"
+    __table_args__ = (
+        Index("ix_purge_job_status", "status"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=_uuid)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)  # erasure / retention
+    employee_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)  # erasure only
+    cutoff: Mapped[date | None] = mapped_column(Date, nullable=True)  # retention only
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending/running/done/failed
+    step: Mapped[int] = mapped_column(Integer, default=0)  # tables fully purged so far
+    progress: Mapped[dict] = mapped_column(JSON, default=dict)  # {table: rows deleted}
+    error: Mapped[str] = mapped_column(Text, default="")
+    owner: Mapped[str] = mapped_column(String(100), default="")  # worker running it ("" = unclaimed)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)  # owner's last batch
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=_now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=_now, onupdate=_now)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
 # ── Settings ────────────────────────────────────────────────────────
 
 class AppSettings(Base):
@@ -1,62 +1,475 @@
-"""Ollama local LLM client with automatic template fallback."""
+"""Ollama local LLM client with automatic template fallback.
+
+One pooled keep-alive `httpx.AsyncClient` is shared by every call.
+Availability is probed once, then re-probed in the background whenever the
+cached answer is older than its TTL, so callers never wait on a probe after
+startup. Generation failures feed a circuit breaker: after
+`FAILURE_THRESHOLD` consecutive failures it opens and every call falls back
+to templates immediately, until `RESET_SECONDS` later a single half-open
+trial request decides whether to close it again. Identical concurrent
+`generate` calls are coalesced onto one in-flight request (single-flight).
+
+Generations pass through `LLMQueue`, which runs at most `llm_concurrency` at
+a time and serves interactive requests before batch work. A request whose
+expected wait exceeds its class deadline is turned away at once (the caller
+falls back to templates) instead of piling up behind a busy CPU.
+
+Loading the model takes 10–30 s on CPU, so the app lifespan warms it with an
+empty prompt before serving, every request carries `keep_alive`, and a
+background keeper re-warms the model shortly before Ollama would evict it.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+import itertools
+import json
 import logging
+import math
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator
+
 import httpx
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open → half-open → closed."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        """Open and still cooling down – callers should fail over at once."""
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_seconds
+
+    def allow(self) -> bool:
+        """Whether a request may go out now (claims the half-open trial)."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if self.is_open:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give back a claimed half-open trial without a verdict (caller went away)."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class LLMQueue:
+    """Bounded priority queue with admission control in front of Ollama.
+
+    At most `concurrency` generations hold a slot; the rest wait in priority
+    order (interactive before batch, FIFO within a class). A request is
+    rejected up front when its expected wait – the work ahead of it times the
+    smoothed service time – exceeds its class deadline, and also if it is
+    still waiting once the deadline passes. A deadline of 0 waits forever.
+    """
+
+    INTERACTIVE, BATCH = "interactive", "batch"
+    _RANK = {INTERACTIVE: 0, BATCH: 1}
+    SMOOTHING = 0.2  # weight of the newest sample in the moving averages
+
+    def __init__(self, concurrency: int = 1, deadline: float = 20.0, batch_deadline: float = 0.0):
+        self.concurrency = max(1, concurrency)
+        self.deadlines = {self.INTERACTIVE: deadline, self.BATCH: batch_deadline}
+        self.active = 0
+        self._waiting: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.avg_service = 0.0  # seconds a slot is held
+        self.avg_wait = 0.0     # seconds spent queued before admission
+        self.admitted = 0
+        self.rejected = 0
+
+    def depth(self, priority: str | None = None) -> int:
+        rank = None if priority is None else self._RANK[priority]
+        return sum(1 for r, _, fut in self._waiting if not fut.done() and rank in (None, r))
+
+    def expected_wait(self, priority: str = INTERACTIVE) -> float:
+        rank = self._RANK[priority]
+        ahead = sum(1 for r, _, fut in self._waiting if r <= rank and not fut.done())
+        backlog = self.active + ahead - self.concurrency + 1
+        if backlog <= 0:
+            return 0.0
+        return math.ceil(backlog / self.concurrency) * self.avg_service
+
+    def _smooth(self, average: float, sample: float) -> float:
+        return sample if average == 0.0 else average + self.SMOOTHING * (sample - average)
+
+    async def acquire(self, priority: str = INTERACTIVE) -> bool:
+        """Wait for a slot. False means rejected – use the template path."""
+        deadline = self.deadlines[priority]
+        if deadline and self.expected_wait(priority) > deadline:
+            self.rejected += 1
+            return False
+
+        queued_at = time.monotonic()
+        if self.active < self.concurrency and not self.depth():
+            self.active += 1
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiting, (self._RANK[priority], next(self._seq), fut))
+            try:
+                await asyncio.wait({fut}, timeout=deadline or None)
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self.release()  # slot was handed over just as we were cancelled
+                fut.cancel()
+                raise
+            if not fut.done():
+                fut.cancel()
+                self.rejected += 1
+                return False
+
+        self.admitted += 1
+        self.avg_wait = self._smooth(self.avg_wait, time.monotonic() - queued_at)
+        return True
+
+    def release(self, service_seconds: float | None = None) -> None:
+        """Free a slot, handing it straight to the next live waiter."""
+        if service_seconds is not None:
+            self.avg_service = self._smooth(self.avg_service, service_seconds)
+        while self._waiting:
+            _, _, fut = heapq.heappop(self._waiting)
+            if not fut.done():
+                fut.set_result(None)  # slot passes over; `active` is unchanged
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE) -> AsyncIterator[bool]:
+        """``async with queue.slot(p) as admitted`` – holds the slot if admitted."""
+        if not await self.acquire(priority):
+            yield False
+            return
+        started = time.monotonic()
+        try:
+            yield True
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "depth": self.depth(),
+            "depth_interactive": self.depth(self.INTERACTIVE),
+            "depth_batch": self.depth(self.BATCH),
+            "avg_wait_s": round(self.avg_wait, 3),
+            "avg_service_s": round(self.avg_service, 3),
+            "expected_wait_s": round(self.expected_wait(), 3),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
 class OllamaClient:
     """Calls local Ollama for generation. Falls back to templates if unreachable."""
 
-    def __init__(self):
+    PROBE_TIMEOUT = 2.0     # seconds – /api/tags should answer instantly
+    CONNECT_TIMEOUT = 2.0   # a dead host fails in this, not `ollama_timeout`
+    AVAILABLE_TTL = 30.0    # re-probe a healthy server this often
+    UNAVAILABLE_TTL = 10.0  # …and an unreachable one a little sooner
+    FAILURE_THRESHOLD = 3
+    RESET_SECONDS = 30.0
+    MAX_CONNECTIONS = 8
+    REWARM_FRACTION = 0.8   # re-warm once this much of `keep_alive` has idled away
+    NUM_PREDICT = 1024      # default generation cap when the caller sets none
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
         s = get_settings()
         self.base_url = s.ollama_base_url
         self.model = s.ollama_model
         self.timeout = s.ollama_timeout
+        self.keep_alive = s.ollama_keep_alive_seconds
         self._available: bool | None = None
+        self._checked_at = 0.0
+        self._probe_task: asyncio.Task | None = None
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self.breaker = CircuitBreaker(self.FAILURE_THRESHOLD, self.RESET_SECONDS)
+        self.queue = LLMQueue(s.llm_concurrency, s.llm_queue_deadline_seconds, s.llm_batch_deadline_seconds)
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._waiters: dict[asyncio.Future, int] = {}  # callers awaiting each in-flight generation
+        self.generations = 0  # requests actually sent to Ollama
+        self.coalesced = 0    # callers that joined an in-flight generation
+        self._keeper_task: asyncio.Task | None = None
+        self._last_used = 0.0  # monotonic time the model was last touched
+        self.warmups = 0
+        self.last_warmup_seconds = 0.0
 
-    async def is_available(self) -> bool:
-        """Check if Ollama is reachable."""
-        if self._available is not None:
-            return self._available
+    def _http(self) -> httpx.AsyncClient:
+        """Shared keep-alive client (created lazily, inside the running loop)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=httpx.Timeout(self.timeout, connect=self.CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        for task in (self._probe_task, self._keeper_task):
+            if task is not None:
+                task.cancel()
+        self._probe_task = self._keeper_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _probe(self) -> bool:
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                resp = await client.get(f"{self.base_url}/api/tags")
-                self._available = resp.status_code == 200
+            resp = await self._http().get(f"{self.base_url}/api/tags", timeout=self.PROBE_TIMEOUT)
+            available = resp.status_code == 200
         except Exception:
+            available = False
+        if not available and self._available is not False:
             logger.warning("Ollama not reachable at %s – using template fallback", self.base_url)
-            self._available = False
-        return self._available
+        elif available and self._available is False:
+            logger.info("Ollama reachable again at %s", self.base_url)
+        self._available = available
+        self._checked_at = time.monotonic()
+        return available
+
+    def _stale(self) -> bool:
+        ttl = self.AVAILABLE_TTL if self._available else self.UNAVAILABLE_TTL
+        return time.monotonic() - self._checked_at >= ttl
+
+    async def is_available(self) -> bool:
+        """Check if Ollama is reachable and the circuit is not open.
+
+        Only the very first call waits on a probe; afterwards the cached
+        answer is returned at once and refreshed in the background.
+        """
+        if self._available is None:
+            await self._probe()
+        elif self._stale() and (self._probe_task is None or self._probe_task.done()):
+            self._probe_task = asyncio.create_task(self._probe())
+        return bool(self._available) and not self.breaker.is_open
 
-    async def generate(self, prompt: str, system: str = "") -> str | None:
-        """Generate text from Ollama. Returns None if not available."""
+    def _payload(
+        self, prompt: str, system: str, stream: bool, json_mode: bool = False, num_predict: int | None = None,
+    ) -> dict:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "system": system,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": {"temperature": 0.7, "num_predict": num_predict or self.NUM_PREDICT},
+        }
+        if json_mode:
+            payload["format"] = "json"  # Ollama constrains the output to valid JSON
+        return payload
+
+    # ── Warm-up / keep-alive ────────────────────────────────────────
+
+    async def warm_up(self) -> bool:
+        """Load the model into memory (an empty prompt generates nothing)."""
         if not await self.is_available():
-            return None
+            return False
+        started = time.monotonic()
+        try:
+            resp = await self._http().post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "prompt": "", "stream": False, "keep_alive": self.keep_alive},
+            )
+            resp.raise_for_status()
+        except Exception as e:
+            logger.warning("Ollama warm-up of %s failed: %s", self.model, e)
+            return False
+        self.warmups += 1
+        self.last_warmup_seconds = time.monotonic() - started
+        self._last_used = time.monotonic()
+        logger.info("Ollama model %s warm (%.1fs)", self.model, self.last_warmup_seconds)
+        return True
+
+    def start_keeper(self) -> None:
+        """Keep the model loaded in the background (no-op unless `keep_alive` > 0)."""
+        if self.keep_alive > 0 and (self._keeper_task is None or self._keeper_task.done()):
+            self._keeper_task = asyncio.create_task(self._keep_warm())
+
+    async def _keep_warm(self) -> None:
+        while True:
+            due = self._last_used + self.keep_alive * self.REWARM_FRACTION
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)  # real requests push `due` forward
+            elif not await self.warm_up():
+                await asyncio.sleep(self.UNAVAILABLE_TTL)
+
+    async def generate(
+        self,
+        prompt: str,
+        system: str = "",
+        priority: str = LLMQueue.INTERACTIVE,
+        json_mode: bool = False,
+        num_predict: int | None = None,
+    ) -> str | None:
+        """Generate text from Ollama. Returns None if not available or rejected.
+
+        `json_mode` sets Ollama's JSON ``format``; `num_predict` caps the
+        number of generated tokens (default `NUM_PREDICT`).
+
+        Single-flight: concurrent calls with the same model, system prompt and
+        prompt share one in-flight generation (queued at the first caller's
+        priority). The generation runs as its own task, so a caller that
+        disconnects does not cancel it for the others – but once the last
+        caller has gone it is cancelled, freeing its queue slot.
+        """
+        key = (self.model, system, prompt, json_mode, num_predict)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._generate(prompt, system, priority, json_mode, num_predict))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                resp = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "system": system,
-                        "stream": False,
-                        "options": {"temperature": 0.7, "num_predict": 1024},
-                    },
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()  # nobody is left to use the answer
+
+    async def _generate(
+        self, prompt: str, system: str, priority: str, json_mode: bool, num_predict: int | None,
+    ) -> str | None:
+        if not await self.is_available():
+            return None
+        async with self.queue.slot(priority) as admitted:
+            if not admitted or not self.breaker.allow():
+                return None
+            self.generations += 1
+            try:
+                resp = await self._http().post(
+                    f"{self.base_url}/api/generate", json=self._payload(prompt, system, False, json_mode, num_predict),
                 )
                 resp.raise_for_status()
-                return resp.json().get("response", "")
+                text = resp.json().get("response", "")
+            except asyncio.CancelledError:
+                self.breaker.release_trial()  # every caller left – no verdict
+                raise
+            except Exception as e:
+                logger.error("Ollama generation failed: %s", e)
+                self.breaker.record_failure()
+                return None
+            self.breaker.record_success()
+            self._last_used = time.monotonic()
+            return text
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system: str = "",
+        priority: str = LLMQueue.INTERACTIVE,
+        json_mode: bool = False,
+        num_predict: int | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield response chunks as Ollama produces them.
+
+        Yields nothing when Ollama is unavailable or the queue rejects the
+        request; a failure mid-stream ends the iteration early (and counts
+        against the breaker); closing the stream early counts neither way.
+        Callers decide from the collected text whether
+        the output is usable. The queue slot is held until the stream ends.
+        """
+        if not await self.is_available():
+            return
+        async with self.queue.slot(priority) as admitted:
+            if not admitted or not self.breaker.allow():
+                return
+            async with aclosing(self._stream(self._payload(prompt, system, True, json_mode, num_predict))) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+
+    async def _stream(self, payload: dict) -> AsyncIterator[str]:
+        try:
+            async with self._http().stream(
+                "POST", f"{self.base_url}/api/generate", json=payload,
+            ) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise RuntimeError(data["error"])
+                    if data.get("response"):
+                        yield data["response"]
+                    if data.get("done"):
+                        break
         except Exception as e:
-            logger.error("Ollama generation failed: %s", e)
-            return None
+            logger.error("Ollama streaming failed: %s", e)
+            self.breaker.record_failure()
+            return
+        except BaseException:
+            # Closed early (client disconnect: GeneratorExit / CancelledError) –
+            # no verdict, but a held half-open trial must not stay claimed
+            self.breaker.release_trial()
+            raise
+        self.breaker.record_success()
+        self._last_used = time.monotonic()
+
+    def stats(self) -> dict:
+        """Availability, breaker, single-flight, warm-up and queue counters for `/health`."""
+        return {
+            "available": bool(self._available),
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "circuit_trips": self.breaker.trips,
+            "generations": self.generations,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "warmups": self.warmups,
+            "last_warmup_s": round(self.last_warmup_seconds, 2),
+            "queue": self.queue.stats(),
+        }
 
     def reset(self):
-        """Reset availability cache (useful for testing)."""
+        """Reset availability cache and breaker (useful for testing)."""
         self._available = None
+        self._checked_at = 0.0
+        self.breaker = CircuitBreaker(self.FAILURE_THRESHOLD, self.RESET_SECONDS)
 
 
 # Singleton
@@ -0,0 +1,291 @@
+"""Response cache for the dashboard list endpoints.
+
+`/org/overview`, `/teams` and `/employees` only change when data is written
+(a sync, a settings change, an erasure), but every open dashboard polls
+them. Their serialized responses are cached here, keyed by path and query
+string, with a strong ETag (body digest) so a poll whose data did not
+change is answered with `304 Not Modified`.
+
+Invalidation is by generation: every entry is stored under the generation
+current when its build started, and `bump()` – called by the writers –
+makes every older entry unreachable at once. Entries and the generation
+counter live in a local SQLite file, so all uvicorn workers on a host share
+one cache; put the file on tmpfs (`/dev/shm/...`) to keep it in shared
+memory. An in-process LRU in front of it answers repeat hits without
+reading the body from disk, and each worker trims the file to
+`max_entries` at most once a minute. An empty `response_cache_path` keeps
+the cache per process.
+
+Because an entry is trusted for its whole generation, a bump also records
+the primary's WAL position, and `get_cached_read_db` builds misses only on
+a replica that has replayed past it (the primary otherwise).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from app.config import get_settings
+
+CACHE_CONTROL = "private, no-cache"  # keep a copy, revalidate before use
+
+
+def etag_for(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """`If-None-Match` check (weak comparison, as RFC 9110 requires for it)."""
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def etag_response(request: Request, body: bytes, etag: str, headers: dict[str, str] | None = None) -> Response:
+    """200 with `body`, or 304 when the client already has `etag`."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, **(headers or {})}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@cache
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+class ResponseCache:
+    """Generation-invalidated response cache (memory LRU + shared SQLite).
+
+    The SQLite calls run on one thread of the cache's own, never on the event
+    loop: another worker holding the file's write lock would otherwise stall
+    every request of this one for up to the busy timeout. With no file the
+    methods complete inline.
+    """
+
+    TRIM_INTERVAL_SECONDS = 60.0  # how often a worker trims the file to `max_entries`
+
+    def __init__(self, path: str = "", max_entries: int = 500, ttl_seconds: float = 3600, enabled: bool = True):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._memory: OrderedDict[str, tuple[int, str, bytes, float]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache")
+        self._generation = 0  # used when there is no file
+        self._wal_lsn = 0
+        self._trimmed_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking SQLite call on the cache thread (inline without a file)."""
+        if not self.path:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _conn(self) -> sqlite3.Connection | None:
+        if not self.path:
+            return None
+        if self._db is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                " key TEXT PRIMARY KEY, generation INTEGER, etag TEXT, body BLOB, created_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS response_cache_created ON response_cache (created_at)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS response_cache_meta (name TEXT PRIMARY KEY, value INTEGER)")
+            self._db.execute("INSERT OR IGNORE INTO response_cache_meta VALUES ('generation', 0), ('wal_lsn', 0)")
+            self._db.commit()
+        return self._db
+
+    def _read_generation(self) -> int:
+        db = self._conn()
+        if db is None:
+            return self._generation
+        return db.execute("SELECT value FROM response_cache_meta WHERE name = 'generation'").fetchone()[0]
+
+    async def generation(self) -> int:
+        return await self._run(self._read_generation)
+
+    def _read_state(self) -> tuple[int, int]:
+        db = self._conn()
+        if db is None:
+            return self._generation, self._wal_lsn
+        rows = dict(db.execute("SELECT name, value FROM response_cache_meta").fetchall())
+        return rows["generation"], rows["wal_lsn"]
+
+    async def state(self) -> tuple[int, int]:
+        """``(generation, wal_lsn)``: the generation and the WAL position its bump recorded."""
+        return await self._run(self._read_state)
+
+    def _bump(self, wal_lsn: int) -> int:
+        db = self._conn()
+        if db is None:
+            self._generation += 1
+            self._wal_lsn = wal_lsn
+            return self._generation
+        db.execute("UPDATE response_cache_meta SET value = value + 1 WHERE name = 'generation'")
+        db.execute("UPDATE response_cache_meta SET value = ? WHERE name = 'wal_lsn'", (wal_lsn,))
+        generation = self._read_generation()
+        db.execute("DELETE FROM response_cache WHERE generation < ?", (generation,))
+        db.commit()
+        return generation
+
+    async def bump(self, wal_lsn: int = 0) -> int:
+        """Invalidate every cached response (all workers); returns the new generation.
+
+        `wal_lsn` is the primary's WAL position after the write (0 when it
+        does not matter): the new generation's entries may only be built
+        from a replica that has replayed past it.
+        """
+        self._memory.clear()
+        return await self._run(self._bump, wal_lsn)
+
+    @staticmethod
+    def key(request: Request) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    def _load(self, key: str) -> tuple[int, str, bytes, float] | None:
+        db = self._conn()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT generation, etag, body, created_at FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        return (row[0], row[1], bytes(row[2]), row[3]) if row is not None else None
+
+    async def get(self, key: str, generation: int) -> tuple[str, bytes] | None:
+        """``(etag, body)`` cached under `generation`, else None."""
+        entry = self._memory.get(key)
+        if entry is None or entry[0] != generation:
+            entry = await self._run(self._load, key)
+        if entry is None or entry[0] != generation or time.time() - entry[3] > self.ttl_seconds:
+            return None
+        self._remember(key, entry)
+        return entry[1], entry[2]
+
+    def _store(self, key: str, entry: tuple[int, str, bytes, float], trim: bool) -> None:
+        db = self._conn()
+        if db is None:
+            return
+        # Never overwrite a newer generation's entry with a slower, older build
+        db.execute(
+            "INSERT INTO response_cache VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET generation = excluded.generation, etag = excluded.etag,"
+            " body = excluded.body, created_at = excluded.created_at "
+            "WHERE excluded.generation >= response_cache.generation",
+            (key, *entry),
+        )
+        if trim:
+            db.execute("DELETE FROM response_cache WHERE created_at < ?", (entry[3] - self.ttl_seconds,))
+            db.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                " SELECT key FROM response_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        db.commit()
+
+    async def put(self, key: str, generation: int, body: bytes) -> str:
+        etag = etag_for(body)
+        entry = (generation, etag, body, time.time())
+        self._remember(key, entry)
+        trim = time.monotonic() - self._trimmed_at >= self.TRIM_INTERVAL_SECONDS
+        if trim:
+            self._trimmed_at = time.monotonic()
+        await self._run(self._store, key, entry, trim)
+        return etag
+
+    def _remember(self, key: str, entry: tuple[int, str, bytes, float]) -> None:
+        self._memory.pop(key, None)
+        self._memory[key] = entry  # (re)inserted last: most recently used
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def respond(self, request: Request, build: Callable[[], Awaitable[Any]], model: Any) -> Response:
+        """Cached response for `request`, building it with `build()` on a miss.
+
+        `model` is the route's response model; the build result is serialized
+        through it exactly as FastAPI would. `get_cached_read_db` leaves the
+        generation its session was chosen for in ``request.state``; the entry
+        is stored under that one, not a later generation the session may be
+        behind.
+        """
+        if not self.enabled:
+            return etag_response(request, *self._render(await build(), model))
+        key = self.key(request)
+        generation = getattr(request.state, "response_cache_generation", None)
+        if generation is None:
+            generation = await self.generation()  # read before building: a bump mid-build discards this entry
+        cached = await self.get(key, generation)
+        if cached is not None:
+            self.hits += 1
+            etag, body = cached
+            source = "hit"
+        else:
+            self.misses += 1
+            body, _ = self._render(await build(), model)
+            etag = await self.put(key, generation, body)
+            source = "miss"
+        response = etag_response(request, body, etag, {"X-Cache": source})
+        if response.status_code == 304:
+            self.not_modified += 1
+        return response
+
+    @staticmethod
+    def _render(result: Any, model: Any) -> tuple[bytes, str]:
+        adapter = _adapter(model)
+        body = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+        return body, etag_for(body)
+
+    def _delete_all(self) -> None:
+        db = self._conn()
+        if db is not None:
+            db.execute("DELETE FROM response_cache")
+            db.commit()
+
+    async def clear(self) -> None:
+        self._memory.clear()
+        await self._run(self._delete_all)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    async def stats(self) -> dict:
+        return {
+            "generation": await self.generation(),
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+def _from_settings() -> ResponseCache:
+    s = get_settings()
+    return ResponseCache(
+        s.response_cache_path, s.response_cache_max_entries, s.response_cache_ttl_seconds, s.response_cache_enabled,
+    )
+
+
+# Singleton
+response_cache = _from_settings()
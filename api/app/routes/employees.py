@@ -2,29 +2,48 @@
 
 from __future__ import annotations
 
+import json
 import uuid
+from typing import AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, delete
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
-from app.models import Employee, EmployeeScore, WeeklySignal, EmployeeSkill
-from app.schemas import EmployeeSummary, EmployeeInsights, QuestionsResponse, ReviewDraftResponse
-from app.services.insights import get_employee_insights
-from app.services.questions import generate_questions
-from app.services.reviews import generate_review
+from app.db import bump_response_cache, get_cached_read_db, get_db, get_read_db, replica_router
+from app.llm_cache import llm_cache
+from app.response_cache import etag_response, response_cache
+from app.models import SCORE_SUMMARY_COLUMNS, Employee, EmployeeScore
+from app.schemas import (
+    EmployeeSummary, EmployeeInsights, InsightsBatchRequest, QuestionsResponse, ReviewDraftResponse,
+)
+from app.services.insights import get_employee_insights, get_employee_insights_many
+from app.services.purge import create_erasure_job, purge_worker
+from app.services.questions import generate_questions, load_questions_context, stream_questions
+from app.services.reviews import generate_review, load_review_context, stream_review
+from app.services.snapshots import drop_snapshot, load_snapshot, load_snapshots, render
+from app.sse import SSE_HEADERS, SSE_OPEN, sse_event
 
 router = APIRouter(tags=["employees"])
 
+BATCH_CHUNK = 100  # employees loaded per round of set-based queries in /employees/insights:batch
+
 
 @router.get("/employees", response_model=list[EmployeeSummary])
 async def list_employees(
+    request: Request,
     risk_filter: str | None = Query(None, description="Filter: High, Medium, Low"),
     team: str | None = Query(None, description="Filter by team name"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_cached_read_db),
 ):
     """List all employees with search and risk filters."""
+    return await response_cache.respond(
+        request, lambda: _employee_summaries(db, risk_filter, team), list[EmployeeSummary],
+    )
+
+
+async def _employee_summaries(db: AsyncSession, risk_filter: str | None, team: str | None) -> list[EmployeeSummary]:
     query = select(Employee).where(Employee.is_active)
 
     result = await db.execute(query)
@@ -36,14 +55,14 @@ async def list_employees(
         if team and emp.team and emp.team.name != team:
             continue
 
-        # Get latest score
+        # Get latest score (summary columns only – an index-only scan)
         score_result = await db.execute(
-            select(EmployeeScore)
+            select(*SCORE_SUMMARY_COLUMNS)
             .where(EmployeeScore.employee_id == emp.id)
             .order_by(EmployeeScore.week_start.desc())
             .limit(1)
         )
-        score = score_result.scalar()
+        score = score_result.first()
 
         s = EmployeeSummary(
             id=emp.id,
@@ -77,13 +96,62 @@ async def list_employees(
 @router.get("/employees/{employee_id}/insights", response_model=EmployeeInsights)
 async def employee_insights(
     employee_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get full explainable insights for an employee."""
-    try:
-        return await get_employee_insights(db, employee_id)
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+    """Get full explainable insights for an employee.
+
+    Served from the snapshot sync stored (`X-Insights-Source: snapshot`),
+    built live otherwise. The ETag is the body digest, so `If-None-Match`
+    gets a 304 until the next sync changes the insights.
+    """
+    snapshot = await load_snapshot(db, employee_id)
+    if snapshot is not None:
+        body, version, source = snapshot.body, snapshot.version, "snapshot"
+    else:
+        try:
+            body, version = render(await get_employee_insights(db, employee_id))
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        source = "live"
+
+    return etag_response(request, body, f'"{version}"', {"X-Insights-Source": source})
+
+
+async def _insights_ndjson(employee_ids: list[uuid.UUID]) -> AsyncIterator[bytes]:
+    """One insights JSON object per line, in request order.
+
+    Runs with its own read session: the stream outlives the request's
+    dependencies. Stored snapshots are sent as-is; the rest of each chunk is
+    built by `get_employee_insights_many`.
+    """
+    factory = await replica_router.read_session_factory()
+    async with factory() as db:
+        for start in range(0, len(employee_ids), BATCH_CHUNK):
+            chunk = employee_ids[start:start + BATCH_CHUNK]
+            snapshots = await load_snapshots(db, chunk)
+            missing = [emp_id for emp_id in chunk if emp_id not in snapshots]
+            built = await get_employee_insights_many(db, missing) if missing else {}
+            for emp_id in chunk:
+                if emp_id in snapshots:
+                    yield snapshots[emp_id].body + b"\n"
+                elif emp_id in built:
+                    yield render(built[emp_id])[0] + b"\n"
+                else:
+                    error = {"employee_id": str(emp_id), "error": f"Employee {emp_id} not found"}
+                    yield json.dumps(error).encode() + b"\n"
+
+
+@router.post("/employees/insights:batch")
+async def employee_insights_batch(body: InsightsBatchRequest):
+    """Insights for many employees as NDJSON (`application/x-ndjson`).
+
+    Each line is the `GET /employees/{id}/insights` body of one requested
+    employee (duplicates dropped, request order kept), or an
+    ``{"employee_id", "error"}`` object for an unknown id.
+    """
+    employee_ids = list(dict.fromkeys(body.employee_ids))
+    return StreamingResponse(_insights_ndjson(employee_ids), media_type="application/x-ndjson")
 
 
 @router.get("/employees/{employee_id}/questions", response_model=QuestionsResponse)
@@ -119,22 +187,75 @@ async def employee_review_draft(
 @router.delete("/employees/{employee_id}/data")
 async def delete_employee_data(
     employee_id: uuid.UUID,
+    background: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
-    """Delete all data for an employee (data minimization / GDPR)."""
+    """Delete all data for an employee (data minimization / GDPR).
+
+    The employee is deactivated and their cached generations dropped right
+    away; the rows themselves are erased by the purge worker in throttled
+    batches after the response (see `GET /sync/purge-jobs/{job_id}`).
+    """
     emp = await db.get(Employee, employee_id)
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
 
-    # Delete all related data
-    await db.execute(delete(WeeklySignal).where(WeeklySignal.employee_id == employee_id))
-    await db.execute(delete(EmployeeScore).where(EmployeeScore.employee_id == employee_id))
-    await db.execute(delete(EmployeeSkill).where(EmployeeSkill.employee_id == employee_id))
     emp.is_active = False
+    await drop_snapshot(db, employee_id)
+    job = await create_erasure_job(db, employee_id)
     await db.commit()
+    llm_cache.invalidate(f"employee:{employee_id}")
+    await bump_response_cache()  # drop the employee from cached lists and aggregates
+    background.add_task(purge_worker.run_in_background, job.id)
 
     return {
         "status": "deleted",
         "employee_id": str(employee_id),
-        "message": "All signal data, scores, and skills deleted. Employee deactivated.",
+        "purge_job_id": str(job.id),
+        "message": "Employee deactivated. Signal data, scores, and skills are being erased in the background.",
     }
+
+
+# ── Server-Sent Events ──────────────────────────────────────────────
+
+async def _sse_stream(events: AsyncIterator[tuple[str, object]]) -> AsyncIterator[str]:
+    """`token` events while the model writes, then one `result` event."""
+    yield SSE_OPEN  # first byte goes out before the model answers
+    async for kind, payload in events:
+        if kind == "token":
+            yield sse_event("token", {"text": payload})
+        else:
+            yield sse_event("result", payload.model_dump(mode="json"))
+
+
+@router.get("/employees/{employee_id}/questions/stream")
+async def employee_questions_stream(
+    employee_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream the 1:1 agenda as Server-Sent Events (`token` …, then `result`)."""
+    try:
+        ctx = await load_questions_context(db, employee_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return StreamingResponse(
+        _sse_stream(stream_questions(ctx)), media_type="text/event-stream", headers=SSE_HEADERS,
+    )
+
+
+@router.api_route("/employees/{employee_id}/review-draft/stream", methods=["GET", "POST"])
+async def employee_review_draft_stream(
+    employee_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream the review draft as Server-Sent Events (`token` …, then `result`).
+
+    GET is accepted as well so browsers can consume it with `EventSource`.
+    """
+    try:
+        ctx = await load_review_context(db, employee_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return StreamingResponse(
+        _sse_stream(stream_review(ctx)), media_type="text/event-stream", headers=SSE_HEADERS,
+    )
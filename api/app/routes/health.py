@@ -1,7 +1,12 @@
 """Health check endpoint."""
 
 from fastapi import APIRouter
+from app.db import engine, pool_stats, replica_router
+from app.llm_cache import llm_cache
 from app.ollama_client import ollama
+from app.response_cache import response_cache
+from app.scheduler import scheduler_leader
+from app.startup import startup_report
 
 router = APIRouter(tags=["health"])
 
@@ -14,5 +19,10 @@ async def health():
         "service": "TalentPulse API",
         "version": "1.0.0",
         "ollama_available": ollama_ok,
+        "llm": {**ollama.stats(), "cache": llm_cache.stats()},
+        "response_cache": await response_cache.stats(),
+        "database": {"pool": pool_stats(engine), **replica_router.stats()},
+        "scheduler": scheduler_leader.stats(),
+        "startup": startup_report.report(),
         "privacy": "No content data is ever collected. Metadata only.",
     }
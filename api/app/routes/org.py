@@ -1,9 +1,10 @@
 """Org overview endpoint."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import get_cached_read_db
+from app.response_cache import response_cache
 from app.schemas import OrgOverview
 from app.services.insights import get_org_overview
 
@@ -11,5 +12,5 @@ router = APIRouter(tags=["org"])
 
 
 @router.get("/org/overview", response_model=OrgOverview)
-async def org_overview(db: AsyncSession = Depends(get_db)):
-    return await get_org_overview(db)
+async def org_overview(request: Request, db: AsyncSession = Depends(get_cached_read_db)):
+    return await response_cache.respond(request, lambda: get_org_overview(db), OrgOverview)
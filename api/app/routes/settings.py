@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import bump_response_cache, get_db
 from app.models import AppSettings
 from app.schemas import SettingsIn, SettingsOut
 
@@ -35,5 +35,6 @@ async def update_settings(body: SettingsIn, db: AsyncSession = Depends(get_db)):
         setattr(s, field, value)
 
     await db.commit()
+    await bump_response_cache()
     await db.refresh(s)
     return SettingsOut.model_validate(s)
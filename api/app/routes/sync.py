@@ -5,28 +5,33 @@ from __future__ import annotations
 import uuid
 from datetime import date
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
-from app.models import Employee, Team, WeeklySignal, EmployeeScore, EmployeeSkill
+from app.config import get_settings
+from app.db import bump_response_cache, get_db
+from app.models import Employee, Team, WeeklySignal, EmployeeScore, EmployeeSkill, PurgeJob
 from app.schemas import SyncResponse
 from app.signals.generate_demo import (
     DEMO_EMPLOYEES, generate_weekly_signals, generate_skills, get_demo_week_start,
 )
+from app.signals.ingest import ingest_graph_week
 from app.scoring.scorer import compute_all_scores
 from app.scoring.bias import build_fairness_note
+from app.scoring.explanations import pack_explanations
+from app.services.pregenerate import pregenerate_drafts
+from app.services.purge import job_status, purge_worker
+from app.services.retention import maintain_weekly_tables
+from app.services.snapshots import refresh_snapshots
 
 router = APIRouter(tags=["sync"])
 
 
-@router.post("/sync/run", response_model=SyncResponse)
-async def run_sync(db: AsyncSession = Depends(get_db)):
-    """Run full sync pipeline: generate/ingest signals + compute scores."""
+async def _sync_demo_data(db: AsyncSession) -> tuple[int, int]:
+    """Steps 1-3 in demo mode: upsert demo org, weekly signals and skills."""
     employees_processed = 0
     weeks_generated = 0
-    scores_computed = 0
 
     # ── Step 1: Ensure demo teams and employees exist ───────────
     team_cache: dict[str, uuid.UUID] = {}
@@ -116,6 +121,23 @@ async def run_sync(db: AsyncSession = Depends(get_db)):
         employees_processed += 1
 
     await db.commit()
+    return employees_processed, weeks_generated
+
+
+@router.post("/sync/run", response_model=SyncResponse)
+async def run_sync(db: AsyncSession = Depends(get_db)):
+    """Run full sync pipeline: generate/ingest signals + compute scores."""
+    employees_processed = 0
+    weeks_generated = 0
+    scores_computed = 0
+
+    cfg = get_settings()
+    if cfg.demo_mode:
+        employees_processed, weeks_generated = await _sync_demo_data(db)
+    elif cfg.enable_graph_ingestion:
+        ingested = await ingest_graph_week(db)
+        employees_processed = ingested["employees_processed"]
+        weeks_generated = ingested["weeks_generated"]
 
     # ── Step 4: Compute scores for all employees ────────────────
     result = await db.execute(select(Employee).where(Employee.is_active))
@@ -182,10 +204,7 @@ async def run_sync(db: AsyncSession = Depends(get_db)):
             pressure_label=score_map.get("high_pressure", {}).get("label", "Low"),
             potential_label=score_map.get("high_potential", {}).get("label", "Low"),
             degradation_label=score_map.get("performance_degradation", {}).get("label", "Low"),
-            burnout_explanation=score_map.get("burnout_risk", {}),
-            pressure_explanation=score_map.get("high_pressure", {}),
-            potential_explanation=score_map.get("high_potential", {}),
-            degradation_explanation=score_map.get("performance_degradation", {}),
+            explanations=pack_explanations(score_results),
             confidence=score_map.get("burnout_risk", {}).get("confidence", 0.5),
             limitations=score_map.get("burnout_risk", {}).get("limitations", ""),
             cohort_size=5,
@@ -195,6 +214,10 @@ async def run_sync(db: AsyncSession = Depends(get_db)):
 
     await db.commit()
 
+    # ── Step 5: Store each employee's rendered insights ─────────
+    await refresh_snapshots(db)
+    await bump_response_cache()  # dashboards see the new week on their next poll
+
     return SyncResponse(
         status="completed",
         employees_processed=employees_processed,
@@ -202,3 +225,34 @@ async def run_sync(db: AsyncSession = Depends(get_db)):
         scores_computed=scores_computed,
         message=f"Synced {employees_processed} employees, {weeks_generated} signal weeks, {scores_computed} scores.",
     )
+
+
+@router.post("/sync/pregenerate")
+async def run_pregenerate(db: AsyncSession = Depends(get_db)):
+    """Run the nightly draft pre-generation now (employees with changed scores)."""
+    return await pregenerate_drafts(db)
+
+
+@router.post("/sync/retention")
+async def run_retention(db: AsyncSession = Depends(get_db)):
+    """Run weekly table maintenance now: create upcoming partitions, drop expired data."""
+    return await maintain_weekly_tables(db)
+
+
+@router.get("/sync/purge-jobs")
+async def list_purge_jobs(
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+):
+    """Recent purge jobs (GDPR erasure and retention), newest first."""
+    result = await db.execute(select(PurgeJob).order_by(PurgeJob.created_at.desc()).limit(limit))
+    return {"worker": purge_worker.stats(), "jobs": [job_status(job) for job in result.scalars()]}
+
+
+@router.get("/sync/purge-jobs/{job_id}")
+async def get_purge_job(job_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    """Status and per-table progress of one purge job."""
+    job = await db.get(PurgeJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Purge job not found")
+    return job_status(job)
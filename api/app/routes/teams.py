@@ -1,15 +1,59 @@
 """Teams endpoints."""
 
-from fastapi import APIRouter, Depends
+from __future__ import annotations
+
+import time
+import uuid
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import get_cached_read_db, get_db
+from app.models import Team
+from app.response_cache import response_cache
 from app.schemas import TeamSummary
 from app.services.insights import get_team_summaries
+from app.services.reviews import ReviewContext, load_team_review_contexts, stream_team_reviews
+from app.sse import SSE_HEADERS, SSE_OPEN, sse_event
 
 router = APIRouter(tags=["teams"])
 
 
 @router.get("/teams", response_model=list[TeamSummary])
-async def list_teams(db: AsyncSession = Depends(get_db)):
-    return await get_team_summaries(db)
+async def list_teams(request: Request, db: AsyncSession = Depends(get_cached_read_db)):
+    return await response_cache.respond(request, lambda: get_team_summaries(db), list[TeamSummary])
+
+
+async def _team_review_events(team_id: uuid.UUID, contexts: list[ReviewContext]) -> AsyncIterator[str]:
+    """One `review` event per member as it completes, then `done`."""
+    started = time.monotonic()
+    yield SSE_OPEN
+    async for ctx, draft in stream_team_reviews(contexts):
+        yield sse_event("review", {"employee_id": str(ctx.employee_id), **draft.model_dump(mode="json")})
+    yield sse_event("done", {
+        "team_id": str(team_id),
+        "drafts": len(contexts),
+        "elapsed_s": round(time.monotonic() - started, 2),
+    })
+
+
+@router.api_route("/teams/{team_id}/review-drafts/stream", methods=["GET", "POST"])
+async def team_review_drafts_stream(
+    team_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """Review drafts for every active team member as Server-Sent Events.
+
+    Members' signals are loaded and scored in one pass; drafts are generated
+    through the LLM queue concurrently and each `review` event is sent as
+    soon as its draft is ready (completion order, not roster order).
+    """
+    if (await db.execute(select(Team.id).where(Team.id == team_id))).scalar() is None:
+        raise HTTPException(status_code=404, detail=f"Team {team_id} not found")
+    contexts = await load_team_review_contexts(db, team_id)
+    return StreamingResponse(
+        _team_review_events(team_id, contexts), media_type="text/event-stream", headers=SSE_HEADERS,
+    )
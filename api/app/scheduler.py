@@ -0,0 +1,161 @@
+"""Nightly background jobs (APScheduler, started in the app lifespan).
+
+* draft pre-generation – `pregenerate_hour`, when `pregenerate_enabled`
+* weekly table maintenance (partitions + retention) – `retention_hour`,
+  when `retention_enabled`
+
+Every uvicorn worker runs the lifespan, but the jobs must run once per
+deployment, not once per worker. `SchedulerLeader` elects one process: on
+PostgreSQL the holder of a session-level advisory lock runs the scheduler,
+and the other workers retry every `RETRY_SECONDS`, so one of them takes
+over when the leader exits (its connection closes and the lock with it).
+Other databases are single-process setups and always lead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import get_settings
+from app.db import engine
+
+logger = logging.getLogger(__name__)
+
+LEADER_LOCK_ID = 0x54505363  # advisory lock key ("TPSc") of the scheduler leader
+
+
+def start_scheduler():
+    """Start the enabled nightly jobs (None when none are enabled)."""
+    cfg = get_settings()
+    if not (cfg.pregenerate_enabled or cfg.retention_enabled):
+        return None
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from app.services.pregenerate import run_pregeneration
+    from app.services.retention import run_maintenance
+
+    scheduler = AsyncIOScheduler(timezone=cfg.timezone)
+    if cfg.pregenerate_enabled:
+        scheduler.add_job(
+            run_pregeneration, "cron", hour=cfg.pregenerate_hour,
+            id="pregenerate_drafts", max_instances=1, coalesce=True,
+        )
+    if cfg.retention_enabled:
+        scheduler.add_job(
+            run_maintenance, "cron", hour=cfg.retention_hour,
+            id="weekly_table_maintenance", max_instances=1, coalesce=True,
+        )
+    scheduler.start()
+    return scheduler
+
+
+class SchedulerLeader:
+    """Runs the nightly scheduler in exactly one process of the deployment.
+
+    The leader keeps the advisory lock on a connection of its own (one
+    connection checked out of the pool for as long as it leads) and checks
+    it every `RETRY_SECONDS`; if that connection is lost, so is the lock,
+    and the leader stops its scheduler before another worker takes over.
+    """
+
+    RETRY_SECONDS = 60.0
+
+    def __init__(self, db_engine: AsyncEngine, start=start_scheduler):
+        self.engine = db_engine
+        self._start = start
+        self.scheduler = None
+        self.leading = False
+        self._conn: AsyncConnection | None = None
+        self._task: asyncio.Task | None = None
+
+    async def _acquire(self) -> bool:
+        """Take the leader lock (always granted off PostgreSQL)."""
+        if self.engine.dialect.name != "postgresql":
+            return True
+        conn = await self.engine.connect()
+        try:
+            locked = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": LEADER_LOCK_ID})
+            await conn.commit()  # the lock is session-level; don't sit idle in a transaction
+        except Exception:
+            await conn.close()
+            raise
+        if not locked:
+            await conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    async def _holds_lock(self) -> bool:
+        """Whether the leader's lock connection is still alive."""
+        if self._conn is None:
+            return True
+        try:
+            await self._conn.execute(text("SELECT 1"))
+            await self._conn.commit()
+            return True
+        except Exception:
+            return False
+
+    async def _release(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LEADER_LOCK_ID})
+                await conn.commit()
+            except Exception:
+                pass  # a dead connection has released the lock already
+            finally:
+                await conn.close()
+
+    def _stop_scheduler(self) -> None:
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+        self.leading = False
+
+    async def step(self) -> bool:
+        """One election round: try to lead, or check that we still do."""
+        if self.leading:
+            if not await self._holds_lock():
+                logger.warning("Lost the scheduler leader lock – stopping the nightly jobs")
+                self._stop_scheduler()
+                await self._release()
+        elif await self._acquire():
+            self.leading = True
+            self.scheduler = self._start()
+            logger.info("This process leads the nightly scheduler")
+        return self.leading
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.step()
+            except Exception:
+                logger.exception("Scheduler leader election failed")
+            await asyncio.sleep(self.RETRY_SECONDS)
+
+    def start(self) -> None:
+        """Join the election in the background (no-op when no job is enabled)."""
+        cfg = get_settings()
+        if not (cfg.pregenerate_enabled or cfg.retention_enabled):
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._stop_scheduler()
+        await self._release()
+
+    def stats(self) -> dict:
+        jobs = self.scheduler.get_jobs() if self.scheduler is not None else []
+        return {"leader": self.leading, "jobs": [job.id for job in jobs]}
+
+
+# Singleton
+scheduler_leader = SchedulerLeader(engine)
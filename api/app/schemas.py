@@ -90,6 +90,10 @@ class EmployeeInsights(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class InsightsBatchRequest(BaseModel):
+    employee_ids: list[uuid.UUID] = Field(min_length=1, max_length=1000)
+
+
 class QuestionsResponse(BaseModel):
     employee_name: str
     questions: list[str]
@@ -10,7 +10,10 @@ Surfaces fairness warnings when cohort comparisons are unreliable.
 from __future__ import annotations
 
 from typing import Sequence
-import numpy as np
+
+from app.startup import lazy_import
+
+np = lazy_import("numpy")
 
 
 # ── Normalization ───────────────────────────────────────────────────
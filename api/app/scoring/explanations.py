@@ -0,0 +1,181 @@
+"""Compact binary storage for score explanations.
+
+`score_dimension` explains each score as a dict with a list of contributor
+dicts – stored as JSON that is four copies of the same key strings per score
+row. Here the four explanations of a row are packed into one small blob of
+fixed-width numpy records keyed by dimension and signal id:
+
+* one header record per dimension: confidence and the limitation flags
+* one record per top contributor: signal id, value, normalized value,
+  weight, contribution, trend direction and the trend summary's slope
+
+Everything textual (`trend_explanation`, `limitations`, each contributor's
+`delta`) is rebuilt from those fields with the same wording the scorer
+uses, so `unpack_explanations` returns exactly what `score_dimension`
+produced. Ids index the append-only tuples below – never reorder them.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import cache
+
+from app.startup import lazy_import
+
+np = lazy_import("numpy")
+
+FORMAT_VERSION = 1
+
+DIMENSIONS = ("burnout_risk", "high_pressure", "high_potential", "performance_degradation")
+SIGNALS = (
+    "tasks_completed", "missed_deadlines", "workload_items", "cycle_time_days",
+    "meeting_hours", "meeting_count", "fragmentation_score", "focus_blocks",
+    "after_hours_events", "unique_collaborators", "cross_team_ratio", "support_actions",
+    "learning_hours", "stretch_assignments", "skill_progress", "tasks_completed_trend",
+)
+DIRECTIONS = ("stable", "increasing", "decreasing")
+ARROWS = ("→", "↗", "↘")
+
+# Limitation sentences, as written by the scorer (bit → sentence)
+LOW_CONFIDENCE = "Low confidence – limited data available."
+MISSING_SIGNALS = "Some signals missing or zero."
+NO_LIMITATIONS = "No significant limitations."
+_DATA_QUALITY_RE = re.compile(r"Data quality: (\d+)%\.")
+_DELTA_RE = re.compile(r"^(→|↗|↘) (\w+) \(Δ([+-]\d+\.\d{2})/week\)$")
+INSUFFICIENT = "Insufficient data"
+
+# Contributor flags
+_INT_VALUE = 1
+_DELTA_EMPTY, _DELTA_INSUFFICIENT, _DELTA_SLOPE = 0, 2, 4
+_DELTA_MASK = 6
+
+HEADER_FIELDS = [
+    ("dimension", "u1"), ("contributors", "u1"), ("limitations", "u1"), ("data_quality", "u1"),
+    ("confidence", "<f4"),
+]
+CONTRIBUTOR_FIELDS = [
+    ("signal", "u1"), ("flags", "u1"), ("direction", "u1"), ("arrow", "u1"),
+    ("value", "<f8"), ("normalized", "<f4"), ("weight", "<f4"), ("contribution", "<f4"), ("slope", "<f4"),
+]
+
+
+@cache
+def _dtypes() -> tuple:
+    """``(header, contributor)`` record dtypes (built on first use, numpy loads lazily)."""
+    return np.dtype(HEADER_FIELDS), np.dtype(CONTRIBUTOR_FIELDS)
+
+
+def _pack_limitations(text: str) -> tuple[int, int]:
+    bits, quality = 0, 0
+    if LOW_CONFIDENCE in text:
+        bits |= 1
+    match = _DATA_QUALITY_RE.search(text)
+    if match:
+        bits |= 2
+        quality = int(match[1])
+    if MISSING_SIGNALS in text:
+        bits |= 4
+    return bits, quality
+
+
+def _unpack_limitations(bits: int, quality: int) -> str:
+    parts = []
+    if bits & 1:
+        parts.append(LOW_CONFIDENCE)
+    if bits & 2:
+        parts.append(f"Data quality: {quality}%.")
+    if bits & 4:
+        parts.append(MISSING_SIGNALS)
+    return " ".join(parts) if parts else NO_LIMITATIONS
+
+
+def _pack_delta(delta: str) -> tuple[int, int, float]:
+    """``(flag, arrow id, Δ/week)`` for a contributor's trend summary."""
+    if not delta:
+        return _DELTA_EMPTY, 0, 0.0
+    if delta == INSUFFICIENT:
+        return _DELTA_INSUFFICIENT, 0, 0.0
+    match = _DELTA_RE.match(delta)
+    if match is None:
+        raise ValueError(f"Unrecognised trend summary: {delta!r}")
+    return _DELTA_SLOPE, ARROWS.index(match[1]), float(match[3])
+
+
+def pack_explanations(score_results: list[dict]) -> bytes:
+    """Pack `compute_all_scores` output (any subset of dimensions) into a blob."""
+    header_dtype, contributor_dtype = _dtypes()
+    results = [r for r in score_results if r.get("score_name") in DIMENSIONS]
+    headers = np.zeros(len(results), dtype=header_dtype)
+    rows = []
+    for h, result in zip(headers, results):
+        contributors = result.get("top_contributors", [])
+        bits, quality = _pack_limitations(result.get("limitations", ""))
+        h["dimension"] = DIMENSIONS.index(result["score_name"])
+        h["contributors"] = len(contributors)
+        h["limitations"], h["data_quality"] = bits, quality
+        h["confidence"] = result.get("confidence", 0.0)
+        for c in contributors:
+            flag, arrow, slope = _pack_delta(c.get("delta", ""))
+            is_int = isinstance(c["value"], (int, np.integer)) and not isinstance(c["value"], bool)
+            rows.append((
+                SIGNALS.index(c["signal"]), flag | (_INT_VALUE if is_int else 0),
+                DIRECTIONS.index(c.get("direction", "stable")), arrow,
+                c["value"], c["normalized"], c["weight"], c["contribution"], slope,
+            ))
+    contributors = np.array(rows, dtype=contributor_dtype)
+    return bytes([FORMAT_VERSION, len(results)]) + headers.tobytes() + contributors.tobytes()
+
+
+def unpack_explanations(blob: bytes, scores: dict[str, tuple[float, str]]) -> list[dict]:
+    """Rebuild the `score_dimension` dicts from a blob.
+
+    `scores` maps dimension → ``(score, label)`` (those live in their own
+    columns). Dimensions missing from `scores` are skipped.
+    """
+    if not blob:
+        return []
+    if blob[0] != FORMAT_VERSION:
+        raise ValueError(f"Unknown explanation format version {blob[0]}")
+    header_dtype, contributor_dtype = _dtypes()
+    n = blob[1]
+    headers = np.frombuffer(blob, dtype=header_dtype, count=n, offset=2)
+    contributors = np.frombuffer(blob, dtype=contributor_dtype, offset=2 + n * header_dtype.itemsize)
+
+    results = []
+    start = 0
+    for h in headers:
+        dimension = DIMENSIONS[h["dimension"]]
+        block = contributors[start:start + h["contributors"]]
+        start += h["contributors"]
+        if dimension not in scores:
+            continue
+        top = []
+        for c in block:
+            direction = DIRECTIONS[c["direction"]]
+            kind = c["flags"] & _DELTA_MASK
+            if kind == _DELTA_SLOPE:
+                delta = f"{ARROWS[c['arrow']]} {direction} (Δ{float(c['slope']):+.2f}/week)"
+            else:
+                delta = INSUFFICIENT if kind == _DELTA_INSUFFICIENT else ""
+            value = float(c["value"])
+            top.append({
+                "signal": SIGNALS[c["signal"]],
+                "value": int(value) if c["flags"] & _INT_VALUE else value,
+                "normalized": round(float(c["normalized"]), 3),
+                "weight": round(float(c["weight"]), 4),
+                "contribution": round(float(c["contribution"]), 4),
+                "direction": direction,
+                "delta": delta,
+            })
+        moving = [f"{c['signal']} is {c['direction']}" for c in top if c["direction"] != "stable"]
+        score, label = scores[dimension]
+        results.append({
+            "score_name": dimension,
+            "score": score,
+            "label": label,
+            "top_contributors": top,
+            "trend_explanation": "; ".join(moving) if moving else "All key signals stable.",
+            "confidence": round(float(h["confidence"]), 2),
+            "limitations": _unpack_limitations(h["limitations"], h["data_quality"]),
+        })
+    return results
@@ -7,11 +7,10 @@ Each score: 0-100 with label, top contributors, trend explanation, confidence, l
 from __future__ import annotations
 
 import os
+from functools import cache
 from pathlib import Path
 from typing import Any
 
-import yaml
-
 from app.signals.compute import compute_trend, extract_signal_series
 
 
@@ -22,17 +21,28 @@ _WEIGHTS_PATH = Path(__file__).parent / "weights.yaml"
 
 def load_weights(path: Path | None = None) -> dict:
     """Load scoring weights from YAML."""
+    import yaml  # only needed once, on first scoring
+
     p = path or _WEIGHTS_PATH
     with open(p) as f:
         return yaml.safe_load(f)
 
 
-WEIGHTS = load_weights()
+@cache
+def get_weights() -> dict:
+    """The configured weights, loaded on first use."""
+    return load_weights()
+
+
+def __getattr__(name: str) -> Any:
+    if name == "WEIGHTS":  # kept as a module attribute, resolved lazily
+        return get_weights()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _normalize(value: float, signal_key: str) -> float:
     """Normalize a signal value to 0-1 using config ranges."""
-    norms = WEIGHTS.get("normalization", {})
+    norms = get_weights().get("normalization", {})
     cfg = norms.get(signal_key, {"min": 0, "max": 1})
     lo, hi = cfg["min"], cfg["max"]
     if hi == lo:
@@ -59,7 +69,7 @@ def score_dimension(
     Returns dict with score, label, top_contributors, trend_explanation,
     confidence, limitations.
     """
-    cfg = WEIGHTS.get(dimension, {})
+    cfg = get_weights().get(dimension, {})
     weights = cfg.get("weights", {})
     thresholds = cfg.get("thresholds", {"low": 35, "high": 65})
 
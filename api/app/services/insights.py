@@ -3,130 +3,224 @@
 from __future__ import annotations
 
 import uuid
+from datetime import date
 from typing import Any
 
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, undefer
 
-from app.models import Employee, WeeklySignal, EmployeeScore, EmployeeSkill, Team
+from app.models import (
+    SCORE_SUMMARY_COLUMNS, CollaborationBottleneck, Employee, WeeklySignal, EmployeeScore, EmployeeSkill, Team,
+)
 from app.schemas import (
     EmployeeSummary, EmployeeInsights, ExplainabilityCard,
     SignalRow, OrgOverview, TeamSummary,
 )
 from app.scoring.scorer import compute_all_scores, detect_hidden_talent, predict_burnout
 from app.scoring.bias import build_fairness_note
+from app.scoring.explanations import unpack_explanations
+from app.services.rules import Frame, col, count, evaluate, rule
 
 
-def _generate_recommendations(scores: list[dict], signals: list[dict]) -> list[str]:
-    """Generate actionable recommendations based on scores and signals."""
-    recs = []
-    if not scores or not signals:
-        return ["Insufficient data for recommendations. Continue collecting signals."]
+RECOMMENDATION_DEFAULTS = {
+    "burnout_risk": 0, "performance_degradation": 0, "high_potential": 0,
+    "meeting_hours": 0, "after_hours_events": 0, "focus_blocks": 0, "missed_deadlines": 0,
+    "learning_hours": 0, "cross_team_ratio": 0, "workload_items": 0, "unique_collaborators": 0,
+}
 
-    score_map = {s["score_name"]: s for s in scores}
-    current = signals[0]
+_high_burnout = col("burnout_risk") >= 60
+_degrading = col("performance_degradation") >= 55
+_high_potential = col("high_potential") >= 60
 
+RECOMMENDATION_RULES = (
     # Burnout / pressure recommendations
-    br = score_map.get("burnout_risk", {})
-    hp_score = score_map.get("high_pressure", {})
-
-    if br.get("score", 0) >= 60:
-        recs.append("🔴 HIGH BURNOUT RISK: Prioritize a wellness check-in. Review workload immediately.")
-        if current.get("meeting_hours", 0) > 15:
-            recs.append("📅 Meeting overload detected. Review meeting necessity – cancel or shorten recurring meetings.")
-        if current.get("after_hours_events", 0) > 4:
-            recs.append("🌙 High after-hours activity. Establish boundaries and protect personal time.")
-        if current.get("focus_blocks", 0) < 3:
-            recs.append("🎯 Insufficient deep work time. Block 2-hour focus slots on calendar.")
-    elif br.get("score", 0) >= 40:
-        recs.append("⚠️ MODERATE BURNOUT RISK: Schedule a casual check-in within the next sprint.")
-
+    rule(_high_burnout, ("recs", "🔴 HIGH BURNOUT RISK: Prioritize a wellness check-in. Review workload immediately.")),
+    rule(
+        _high_burnout & (col("meeting_hours") > 15),
+        ("recs", "📅 Meeting overload detected. Review meeting necessity – cancel or shorten recurring meetings."),
+    ),
+    rule(
+        _high_burnout & (col("after_hours_events") > 4),
+        ("recs", "🌙 High after-hours activity. Establish boundaries and protect personal time."),
+    ),
+    rule(
+        _high_burnout & (col("focus_blocks") < 3),
+        ("recs", "🎯 Insufficient deep work time. Block 2-hour focus slots on calendar."),
+    ),
+    rule(
+        (col("burnout_risk") >= 40) & (col("burnout_risk") < 60),
+        ("recs", "⚠️ MODERATE BURNOUT RISK: Schedule a casual check-in within the next sprint."),
+    ),
     # Performance degradation
-    pd = score_map.get("performance_degradation", {})
-    if pd.get("score", 0) >= 55:
-        recs.append("📉 Performance trend declining. Identify blockers in next 1:1 – avoid blame framing.")
-        if current.get("missed_deadlines", 0) >= 2:
-            recs.append("🎯 Rising missed deadlines. Consider workload redistribution or dependency analysis.")
-
+    rule(
+        _degrading,
+        ("recs", "📉 Performance trend declining. Identify blockers in next 1:1 – avoid blame framing."),
+    ),
+    rule(
+        _degrading & (col("missed_deadlines") >= 2),
+        ("recs", "🎯 Rising missed deadlines. Consider workload redistribution or dependency analysis."),
+    ),
     # High potential
-    pot = score_map.get("high_potential", {})
-    if pot.get("score", 0) >= 60:
-        recs.append("⭐ High growth potential detected. Consider stretch assignments or mentorship opportunities.")
-        if current.get("learning_hours", 0) >= 3:
-            recs.append("📚 Strong learning engagement. Support with conference budget or skill-building time.")
-        if current.get("cross_team_ratio", 0) >= 0.4:
-            recs.append("🤝 Strong cross-team connector. Consider for cross-functional initiatives.")
-
+    rule(
+        _high_potential,
+        ("recs", "⭐ High growth potential detected. Consider stretch assignments or mentorship opportunities."),
+    ),
+    rule(
+        _high_potential & (col("learning_hours") >= 3),
+        ("recs", "📚 Strong learning engagement. Support with conference budget or skill-building time."),
+    ),
+    rule(
+        _high_potential & (col("cross_team_ratio") >= 0.4),
+        ("recs", "🤝 Strong cross-team connector. Consider for cross-functional initiatives."),
+    ),
     # Workload redistribution
-    if current.get("workload_items", 0) > 15:
-        recs.append("📦 Consider redistributing tasks. Current workload significantly above team average.")
-
+    rule(
+        col("workload_items") > 15,
+        ("recs", "📦 Consider redistributing tasks. Current workload significantly above team average."),
+    ),
     # Collaboration
-    if current.get("unique_collaborators", 0) < 4:
-        recs.append("👥 Low collaboration breadth. Foster connections through pair programming or cross-team activities.")
-
-    if not recs:
-        recs.append("✅ Signals look healthy. Continue supporting current trajectory.")
+    rule(
+        col("unique_collaborators") < 4,
+        ("recs", "👥 Low collaboration breadth. Foster connections through pair programming or cross-team activities."),
+    ),
+    rule(count("recs") == 0, ("recs", "✅ Signals look healthy. Continue supporting current trajectory.")),
+)
 
-    return recs
 
+def recommendations_many(items: list[tuple[list[dict], list[dict]]]) -> list[list[str]]:
+    """Recommendations for many ``(scores, signals)`` pairs in one pass."""
+    with_data = [(scores, signals) for scores, signals in items if scores and signals]
+    frame = Frame(
+        [{**signals[0], **{s["score_name"]: s["score"] for s in scores}} for scores, signals in with_data],
+        RECOMMENDATION_DEFAULTS,
+    )
+    evaluated = iter(evaluate(RECOMMENDATION_RULES, frame))
+    return [
+        next(evaluated)["recs"] if scores and signals
+        else ["Insufficient data for recommendations. Continue collecting signals."]
+        for scores, signals in items
+    ]
 
-async def get_employee_insights(
-    db: AsyncSession,
-    employee_id: uuid.UUID,
-) -> EmployeeInsights:
-    """Build full insights for an employee."""
-    # Fetch employee
-    emp = await db.get(Employee, employee_id)
-    if not emp:
-        raise ValueError(f"Employee {employee_id} not found")
 
-    # Fetch signals (newest first)
+def _generate_recommendations(scores: list[dict], signals: list[dict]) -> list[str]:
+    """Generate actionable recommendations based on scores and signals."""
+    return recommendations_many([(scores, signals)])[0]
+
+
+def _signal_dict(s: WeeklySignal) -> dict:
+    return {
+        "week_start": s.week_start,
+        "tasks_completed": s.tasks_completed,
+        "missed_deadlines": s.missed_deadlines,
+        "workload_items": s.workload_items,
+        "cycle_time_days": s.cycle_time_days,
+        "meeting_hours": s.meeting_hours,
+        "meeting_count": s.meeting_count,
+        "avg_meeting_length_min": s.avg_meeting_length_min,
+        "fragmentation_score": s.fragmentation_score,
+        "focus_blocks": s.focus_blocks,
+        "response_time_bucket": s.response_time_bucket,
+        "after_hours_events": s.after_hours_events,
+        "unique_collaborators": s.unique_collaborators,
+        "cross_team_ratio": s.cross_team_ratio,
+        "support_actions": s.support_actions,
+        "learning_hours": s.learning_hours,
+        "stretch_assignments": s.stretch_assignments,
+        "skill_progress": s.skill_progress,
+        "data_quality": s.data_quality,
+    }
+
+
+def _stored_scores(score: EmployeeScore | None) -> list[dict]:
+    """A score row with its explanations rehydrated ([] without them)."""
+    if score is None or not score.explanations:
+        return []
+    return unpack_explanations(score.explanations, {
+        "burnout_risk": (score.burnout_risk, score.burnout_label),
+        "high_pressure": (score.high_pressure, score.pressure_label),
+        "high_potential": (score.high_potential, score.potential_label),
+        "performance_degradation": (score.performance_degradation, score.degradation_label),
+    })
+
+
+def _skill_dict(sk: EmployeeSkill) -> dict:
+    return {"skill_name": sk.skill_name, "proficiency": sk.proficiency, "is_growing": sk.is_growing}
+
+
+async def load_stored_scores(db: AsyncSession, employee_id: uuid.UUID, week_start) -> list[dict]:
+    """The week's scores with their explanations rehydrated ([] if not stored)."""
+    result = await db.execute(
+        select(EmployeeScore)
+        .options(undefer(EmployeeScore.explanations))
+        .where(EmployeeScore.employee_id == employee_id, EmployeeScore.week_start == week_start)
+    )
+    return _stored_scores(result.scalar())
+
+
+async def load_latest_signals(
+    db: AsyncSession, employee_ids: list[uuid.UUID], weeks: int = 8,
+) -> dict[uuid.UUID, list[WeeklySignal]]:
+    """Each employee's last `weeks` signal rows (newest first) in one window query."""
+    ranked = (
+        select(
+            WeeklySignal.id,
+            func.row_number().over(
+                partition_by=WeeklySignal.employee_id, order_by=WeeklySignal.week_start.desc(),
+            ).label("rank"),
+        )
+        .where(WeeklySignal.employee_id.in_(employee_ids))
+        .subquery()
+    )
     result = await db.execute(
         select(WeeklySignal)
-        .where(WeeklySignal.employee_id == employee_id)
-        .order_by(WeeklySignal.week_start.desc())
-        .limit(8)
+        .join(ranked, ranked.c.id == WeeklySignal.id)
+        .where(ranked.c.rank <= weeks)
+        .order_by(WeeklySignal.employee_id, WeeklySignal.week_start.desc())
     )
-    signal_models = result.scalars().all()
-    signals_dicts = [
-        {
-            "week_start": s.week_start,
-            "tasks_completed": s.tasks_completed,
-            "missed_deadlines": s.missed_deadlines,
-            "workload_items": s.workload_items,
-            "cycle_time_days": s.cycle_time_days,
-            "meeting_hours": s.meeting_hours,
-            "meeting_count": s.meeting_count,
-            "avg_meeting_length_min": s.avg_meeting_length_min,
-            "fragmentation_score": s.fragmentation_score,
-            "focus_blocks": s.focus_blocks,
-            "response_time_bucket": s.response_time_bucket,
-            "after_hours_events": s.after_hours_events,
-            "unique_collaborators": s.unique_collaborators,
-            "cross_team_ratio": s.cross_team_ratio,
-            "support_actions": s.support_actions,
-            "learning_hours": s.learning_hours,
-            "stretch_assignments": s.stretch_assignments,
-            "skill_progress": s.skill_progress,
-            "data_quality": s.data_quality,
-        }
-        for s in signal_models
-    ]
+    signals: dict[uuid.UUID, list[WeeklySignal]] = {emp_id: [] for emp_id in employee_ids}
+    for s in result.scalars():
+        signals[s.employee_id].append(s)
+    return signals
+
+
+async def load_stored_scores_many(
+    db: AsyncSession, latest_weeks: dict[uuid.UUID, date],
+) -> dict[uuid.UUID, list[dict]]:
+    """`load_stored_scores` for ``{employee_id: week_start}`` in one query (missing rows left out)."""
+    if not latest_weeks:
+        return {}
+    result = await db.execute(
+        select(EmployeeScore)
+        .options(undefer(EmployeeScore.explanations))
+        .where(
+            EmployeeScore.employee_id.in_(list(latest_weeks)),
+            EmployeeScore.week_start.in_(set(latest_weeks.values())),
+        )
+    )
+    stored = {}
+    for score in result.scalars():
+        if latest_weeks[score.employee_id] == score.week_start:
+            stored[score.employee_id] = _stored_scores(score)
+    return {emp_id: scores for emp_id, scores in stored.items() if scores}
 
-    signal_rows = [SignalRow(**sd) for sd in signals_dicts]
 
-    # Compute scores
+def _scores_or_live(stored: list[dict], signals_dicts: list[dict]) -> list[dict]:
+    """Scores stored with the latest signal week by sync, else computed now."""
+    if stored:
+        return stored
     data_quality = signals_dicts[0].get("data_quality", 1.0) if signals_dicts else 1.0
-    raw_scores = compute_all_scores(signals_dicts, data_quality)
+    return compute_all_scores(signals_dicts, data_quality)
 
-    # Fairness note
-    cohort_result = await db.execute(
-        select(func.count(Employee.id))
-        .where(Employee.role == emp.role, Employee.seniority == emp.seniority)
-    )
-    cohort_size = cohort_result.scalar() or 0
 
+def _assemble_insights(
+    emp: Employee,
+    signals_dicts: list[dict],
+    raw_scores: list[dict],
+    recommendations: list[str],
+    cohort_size: int,
+    skills: list[dict],
+) -> EmployeeInsights:
     fairness = build_fairness_note(emp.role, emp.seniority, emp.tenure_months, cohort_size)
 
     # Build explainability cards
@@ -144,24 +238,6 @@ async def get_employee_insights(
         for s in raw_scores
     ]
 
-    # Recommendations
-    recommendations = _generate_recommendations(raw_scores, signals_dicts)
-
-    # Hidden talent detection
-    hidden_talent = detect_hidden_talent(raw_scores, signals_dicts)
-
-    # Predictive burnout
-    predictive = predict_burnout(raw_scores, signals_dicts)
-
-    # Skills
-    skills_result = await db.execute(
-        select(EmployeeSkill).where(EmployeeSkill.employee_id == employee_id)
-    )
-    skills = [
-        {"skill_name": sk.skill_name, "proficiency": sk.proficiency, "is_growing": sk.is_growing}
-        for sk in skills_result.scalars().all()
-    ]
-
     # Build summary
     latest_score_map = {s["score_name"]: s for s in raw_scores}
     summary = EmployeeSummary(
@@ -185,15 +261,107 @@ async def get_employee_insights(
 
     return EmployeeInsights(
         employee=summary,
-        signals=signal_rows,
+        signals=[SignalRow(**sd) for sd in signals_dicts],
         scores=explainability_cards,
         recommendations=recommendations,
-        hidden_talent=hidden_talent,
-        predictive_burnout=predictive,
+        hidden_talent=detect_hidden_talent(raw_scores, signals_dicts),
+        predictive_burnout=predict_burnout(raw_scores, signals_dicts),
         skills=skills,
     )
 
 
+async def get_employee_insights(
+    db: AsyncSession,
+    employee_id: uuid.UUID,
+) -> EmployeeInsights:
+    """Build full insights for an employee."""
+    # Fetch employee
+    emp = await db.get(Employee, employee_id)
+    if not emp:
+        raise ValueError(f"Employee {employee_id} not found")
+
+    # Fetch signals (newest first)
+    result = await db.execute(
+        select(WeeklySignal)
+        .where(WeeklySignal.employee_id == employee_id)
+        .order_by(WeeklySignal.week_start.desc())
+        .limit(8)
+    )
+    signals_dicts = [_signal_dict(s) for s in result.scalars().all()]
+
+    stored = await load_stored_scores(db, employee_id, signals_dicts[0]["week_start"]) if signals_dicts else []
+    raw_scores = _scores_or_live(stored, signals_dicts)
+
+    # Fairness note
+    cohort_result = await db.execute(
+        select(func.count(Employee.id))
+        .where(Employee.role == emp.role, Employee.seniority == emp.seniority)
+    )
+    cohort_size = cohort_result.scalar() or 0
+
+    # Skills
+    skills_result = await db.execute(
+        select(EmployeeSkill).where(EmployeeSkill.employee_id == employee_id)
+    )
+    skills = [_skill_dict(sk) for sk in skills_result.scalars().all()]
+
+    return _assemble_insights(
+        emp, signals_dicts, raw_scores, _generate_recommendations(raw_scores, signals_dicts), cohort_size, skills,
+    )
+
+
+async def get_employee_insights_many(
+    db: AsyncSession,
+    employee_ids: list[uuid.UUID],
+) -> dict[uuid.UUID, EmployeeInsights]:
+    """`get_employee_insights` for many employees in a fixed number of queries.
+
+    Employees, their last 8 signal weeks (a window query), the stored scores
+    for each latest week, skills and the cohort sizes are each loaded in one
+    set-based query; recommendations are evaluated in one vectorized pass.
+    Unknown ids are left out of the result.
+    """
+    result = await db.execute(
+        select(Employee)
+        .options(raiseload(Employee.signals), raiseload(Employee.scores), raiseload(Employee.skills))
+        .where(Employee.id.in_(employee_ids))
+    )
+    employees = {emp.id: emp for emp in result.scalars().all()}
+    if not employees:
+        return {}
+    ids = list(employees)
+
+    signal_models = await load_latest_signals(db, ids)
+    signals = {emp_id: [_signal_dict(s) for s in rows] for emp_id, rows in signal_models.items()}
+    stored = await load_stored_scores_many(
+        db, {emp_id: rows[0].week_start for emp_id, rows in signal_models.items() if rows},
+    )
+
+    # Cohort sizes for every (role, seniority) in the batch
+    cohorts = {(emp.role, emp.seniority) for emp in employees.values()}
+    result = await db.execute(
+        select(Employee.role, Employee.seniority, func.count(Employee.id))
+        .where(Employee.role.in_({r for r, _ in cohorts}), Employee.seniority.in_({s for _, s in cohorts}))
+        .group_by(Employee.role, Employee.seniority)
+    )
+    cohort_sizes = {(role, seniority): n for role, seniority, n in result.all()}
+
+    result = await db.execute(select(EmployeeSkill).where(EmployeeSkill.employee_id.in_(ids)))
+    skills: dict[uuid.UUID, list[dict]] = {emp_id: [] for emp_id in ids}
+    for sk in result.scalars():
+        skills[sk.employee_id].append(_skill_dict(sk))
+
+    raw_scores = {emp_id: _scores_or_live(stored.get(emp_id, []), signals[emp_id]) for emp_id in ids}
+    recommendations = recommendations_many([(raw_scores[emp_id], signals[emp_id]) for emp_id in ids])
+    return {
+        emp_id: _assemble_insights(
+            employees[emp_id], signals[emp_id], raw_scores[emp_id], recs,
+            cohort_sizes.get((employees[emp_id].role, employees[emp_id].seniority), 0), skills[emp_id],
+        )
+        for emp_id, recs in zip(ids, recommendations)
+    }
+
+
 async def get_org_overview(db: AsyncSession) -> OrgOverview:
     """Build org-level overview with distributions and alerts."""
     # Count employees and teams
@@ -212,14 +380,14 @@ async def get_org_overview(db: AsyncSession) -> OrgOverview:
     team_workloads: dict[str, list[float]] = {}
 
     for emp in employees:
-        # Get latest score
+        # Get latest score (summary columns only – an index-only scan)
         score_result = await db.execute(
-            select(EmployeeScore)
+            select(*SCORE_SUMMARY_COLUMNS)
             .where(EmployeeScore.employee_id == emp.id)
             .order_by(EmployeeScore.week_start.desc())
             .limit(1)
         )
-        score = score_result.scalar()
+        score = score_result.first()
 
         if score:
             burnout_dist[score.burnout_label] = burnout_dist.get(score.burnout_label, 0) + 1
@@ -238,17 +406,17 @@ async def get_org_overview(db: AsyncSession) -> OrgOverview:
 
             # Collect team workloads
             signal_result = await db.execute(
-                select(WeeklySignal)
+                select(WeeklySignal.workload_items)
                 .where(WeeklySignal.employee_id == emp.id)
                 .order_by(WeeklySignal.week_start.desc())
                 .limit(1)
             )
-            signal = signal_result.scalar()
-            if signal and emp.team:
+            workload = signal_result.scalar()
+            if workload is not None and emp.team:
                 team_name = emp.team.name
                 if team_name not in team_workloads:
                     team_workloads[team_name] = []
-                team_workloads[team_name].append(float(signal.workload_items))
+                team_workloads[team_name].append(float(workload))
 
     # Find overloaded teams
     overloaded_teams = []
@@ -257,6 +425,8 @@ async def get_org_overview(db: AsyncSession) -> OrgOverview:
         if avg > 14:
             overloaded_teams.append({"team": team_name, "avg_workload": round(avg, 1)})
 
+    collaboration_bottlenecks = await _latest_bottlenecks(db)
+
     return OrgOverview(
         total_employees=emp_count,
         total_teams=team_count,
@@ -266,10 +436,40 @@ async def get_org_overview(db: AsyncSession) -> OrgOverview:
         degradation_distribution=degradation_dist,
         trending_alerts=sorted(trending_alerts, key=lambda x: x.get("score", 0), reverse=True),
         overloaded_teams=overloaded_teams,
-        collaboration_bottlenecks=[],
+        collaboration_bottlenecks=collaboration_bottlenecks,
     )
 
 
+async def _latest_bottlenecks(db: AsyncSession) -> list[dict]:
+    """Bottleneck nodes from the most recent collaboration graph."""
+    latest_week = (await db.execute(select(func.max(CollaborationBottleneck.week_start)))).scalar()
+    if latest_week is None:
+        return []
+
+    result = await db.execute(
+        select(CollaborationBottleneck)
+        .where(CollaborationBottleneck.week_start == latest_week)
+        .order_by(CollaborationBottleneck.betweenness.desc())
+    )
+    bottlenecks = []
+    for b in result.scalars().all():
+        emp = b.employee
+        if not emp or not emp.is_active:
+            continue
+        bottlenecks.append({
+            "employee": emp.name,
+            "team": emp.team.name if emp.team else "",
+            "betweenness": b.betweenness,
+            "unique_collaborators": b.unique_collaborators,
+            "cross_team_ratio": b.cross_team_ratio,
+            "message": (
+                f"{emp.name} bridges {b.unique_collaborators} collaborators – "
+                "many cross-group paths depend on them"
+            ),
+        })
+    return bottlenecks
+
+
 async def get_team_summaries(db: AsyncSession) -> list[TeamSummary]:
     """Build team-level summaries."""
     result = await db.execute(select(Team))
@@ -290,26 +490,26 @@ async def get_team_summaries(db: AsyncSession) -> list[TeamSummary]:
 
         for emp in active:
             score_result = await db.execute(
-                select(EmployeeScore)
+                select(*SCORE_SUMMARY_COLUMNS)
                 .where(EmployeeScore.employee_id == emp.id)
                 .order_by(EmployeeScore.week_start.desc())
                 .limit(1)
             )
-            score = score_result.scalar()
+            score = score_result.first()
             if score:
                 burnout_scores.append(score.burnout_risk)
                 potential_scores.append(score.high_potential)
                 degradation_scores.append(score.performance_degradation)
 
             signal_result = await db.execute(
-                select(WeeklySignal)
+                select(WeeklySignal.workload_items)
                 .where(WeeklySignal.employee_id == emp.id)
                 .order_by(WeeklySignal.week_start.desc())
                 .limit(1)
             )
-            sig = signal_result.scalar()
-            if sig:
-                workloads.append(float(sig.workload_items))
+            workload = signal_result.scalar()
+            if workload is not None:
+                workloads.append(float(workload))
 
         import numpy as np
         avg_b = round(float(np.mean(burnout_scores)), 1) if burnout_scores else 0
@@ -0,0 +1,179 @@
+"""Overnight pre-generation of 1:1 agendas and review drafts.
+
+Managers open review drafts in bursts at cycle time, which a CPU-bound
+Ollama cannot keep up with live. A nightly job walks the employees whose
+latest scores changed since their drafts were generated, runs both prompts
+through the batch (low-priority) queue class and stores the parsed output in
+`pregenerated_drafts`. The endpoints serve a stored draft when it was built
+from the employee's latest signal week and only generate live on a miss.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import uuid
+from datetime import date
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Employee, EmployeeScore, PregeneratedDraft
+from app.ollama_client import LLMQueue, ollama
+
+logger = logging.getLogger(__name__)
+
+QUESTIONS, REVIEW = "questions", "review"
+
+
+def score_fingerprint(score: EmployeeScore | Row) -> str:
+    """Stable digest of the score row a draft is generated from.
+
+    Takes an `EmployeeScore` or a row of its `FINGERPRINT_COLUMNS`.
+    """
+    parts = (
+        score.week_start.isoformat(),
+        f"{score.burnout_risk:.2f}",
+        f"{score.high_pressure:.2f}",
+        f"{score.high_potential:.2f}",
+        f"{score.performance_degradation:.2f}",
+    )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+async def load_pregenerated(db: AsyncSession, employee_id: uuid.UUID, kind: str, week: str) -> dict | None:
+    """Stored draft payload if it was generated for `week` (ISO), else None."""
+    if not week:
+        return None
+    result = await db.execute(
+        select(PregeneratedDraft).where(
+            PregeneratedDraft.employee_id == employee_id,
+            PregeneratedDraft.kind == kind,
+        )
+    )
+    draft = result.scalar()
+    if draft is None or draft.week_start.isoformat() != week:
+        return None
+    return draft.payload
+
+
+async def load_pregenerated_many(
+    db: AsyncSession, employee_ids: list[uuid.UUID], kind: str,
+) -> dict[uuid.UUID, tuple[str, dict]]:
+    """``{employee_id: (week ISO, payload)}`` for a group of employees."""
+    result = await db.execute(
+        select(PregeneratedDraft).where(
+            PregeneratedDraft.employee_id.in_(employee_ids),
+            PregeneratedDraft.kind == kind,
+        )
+    )
+    return {d.employee_id: (d.week_start.isoformat(), d.payload) for d in result.scalars()}
+
+
+FINGERPRINT_COLUMNS = (
+    EmployeeScore.employee_id,
+    EmployeeScore.week_start,
+    EmployeeScore.burnout_risk,
+    EmployeeScore.high_pressure,
+    EmployeeScore.high_potential,
+    EmployeeScore.performance_degradation,
+)
+
+
+async def _latest_scores(db: AsyncSession) -> dict[uuid.UUID, Row]:
+    """Newest score row per active employee – only the fingerprinted columns."""
+    ranked = (
+        select(
+            *FINGERPRINT_COLUMNS,
+            func.row_number().over(
+                partition_by=EmployeeScore.employee_id, order_by=EmployeeScore.week_start.desc(),
+            ).label("rank"),
+        )
+        .join(Employee, Employee.id == EmployeeScore.employee_id)
+        .where(Employee.is_active)
+        .subquery()
+    )
+    result = await db.execute(select(ranked).where(ranked.c.rank == 1))
+    return {row.employee_id: row for row in result}
+
+
+async def _store(
+    db: AsyncSession,
+    existing: dict[tuple[uuid.UUID, str], PregeneratedDraft],
+    employee_id: uuid.UUID,
+    kind: str,
+    week: str,
+    fingerprint: str,
+    payload: dict,
+) -> None:
+    draft = existing.get((employee_id, kind))
+    if draft is None:
+        draft = PregeneratedDraft(employee_id=employee_id, kind=kind)
+        db.add(draft)
+        existing[(employee_id, kind)] = draft
+    draft.week_start = date.fromisoformat(week)
+    draft.fingerprint = fingerprint
+    draft.payload = payload
+
+
+async def pregenerate_drafts(db: AsyncSession) -> dict:
+    """Regenerate stored drafts for employees whose scores changed.
+
+    Only Ollama output is stored – a template answer is cheap to produce live
+    and storing it would hide the model once it is back. Each employee is
+    committed as it completes, so an interrupted run keeps its progress.
+    """
+    from app.services.questions import _ollama_questions, load_questions_context
+    from app.services.reviews import _ollama_review, load_review_context
+
+    latest = await _latest_scores(db)
+    result = await db.execute(select(PregeneratedDraft))
+    existing = {(d.employee_id, d.kind): d for d in result.scalars()}
+
+    changed = []
+    for employee_id, score in latest.items():
+        fingerprint = score_fingerprint(score)
+        drafts = [existing.get((employee_id, kind)) for kind in (QUESTIONS, REVIEW)]
+        if any(d is None or d.fingerprint != fingerprint for d in drafts):
+            changed.append((employee_id, fingerprint))
+
+    summary = {
+        "employees_checked": len(latest),
+        "employees_changed": len(changed),
+        "drafts_generated": 0,
+        "failed": 0,
+        "ollama_available": await ollama.is_available(),
+    }
+    if not summary["ollama_available"]:
+        logger.info("Skipping draft pre-generation: Ollama not available")
+        return summary
+
+    batch = LLMQueue.BATCH
+    for employee_id, fingerprint in changed:
+        q = await load_questions_context(db, employee_id)
+        agenda = await _ollama_questions(
+            q.employee_name, q.scores, q.signals, q.cache_scope, q.week, priority=batch,
+        )
+        r = await load_review_context(db, employee_id)
+        review = await _ollama_review(
+            r.employee_name, r.period, r.signals, r.scores, r.trends, r.cache_scope, r.week, priority=batch,
+        )
+        for kind, week, output in ((QUESTIONS, q.week, agenda), (REVIEW, r.week, review)):
+            if output is None or not week:
+                summary["failed"] += 1
+                continue
+            await _store(db, existing, employee_id, kind, week, fingerprint, output.model_dump(mode="json"))
+            summary["drafts_generated"] += 1
+        await db.commit()
+
+    logger.info("Draft pre-generation finished: %s", summary)
+    return summary
+
+
+async def run_pregeneration() -> dict:
+    """Scheduled entry point – runs with its own session."""
+    from app.db import async_session_factory
+
+    async with async_session_factory() as db:
+        return await pregenerate_drafts(db)
+
@@ -0,0 +1,271 @@
+"""Batched, throttled purge worker for GDPR erasure and retention.
+
+Deleting an employee's history (or every expired week) in one statement
+holds row locks for the whole delete and writes it to the WAL in one burst,
+which shows up as latency spikes on the API. Instead a `PurgeJob` row
+describes the delete and the worker runs it table by table in batches of
+`purge_batch_size` primary keys, committing after each batch and sleeping
+`purge_batch_pause_ms` before the next so other queries get the database.
+
+Progress (tables finished, rows deleted per table) is committed with every
+batch. Every batch is "delete the next N matching rows", so a job that was
+interrupted simply continues where it stopped: at startup the worker picks
+up jobs left `pending` or `running`.
+
+Every uvicorn worker has its own `PurgeWorker`, so a job is claimed in the
+database before it runs: `owner` is set with a compare-and-set UPDATE, and
+each batch commits only together with a heartbeat that is conditional on
+still owning the job. A job whose owner has not sent a heartbeat for
+`STALE_SECONDS` (the process died) may be claimed by another worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models import (
+    CollaborationBottleneck, Employee, EmployeeScore, EmployeeSkill, InsightsSnapshot, PregeneratedDraft,
+    PurgeJob, WeeklySignal,
+)
+from app.signals.spool import erase_person
+
+logger = logging.getLogger(__name__)
+
+ERASURE, RETENTION = "erasure", "retention"
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+# Tables each kind of job purges, in order
+ERASURE_TABLES = (
+    InsightsSnapshot, PregeneratedDraft, CollaborationBottleneck, EmployeeSkill, EmployeeScore, WeeklySignal,
+)
+RETENTION_TABLES = (InsightsSnapshot, PregeneratedDraft, CollaborationBottleneck, EmployeeScore, WeeklySignal)
+
+
+def _criteria(job: PurgeJob, model):
+    if job.kind == ERASURE:
+        return model.employee_id == job.employee_id
+    return model.week_start <= job.cutoff - timedelta(days=7)  # whole week past the cutoff
+
+
+def _tables(job: PurgeJob) -> tuple:
+    return ERASURE_TABLES if job.kind == ERASURE else RETENTION_TABLES
+
+
+class ClaimLost(Exception):
+    """Another worker took the job over (this one looked dead)."""
+
+
+def job_status(job: PurgeJob) -> dict:
+    """JSON status of a job (the `/sync/purge-jobs` payload)."""
+    tables = _tables(job)
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "employee_id": str(job.employee_id) if job.employee_id else None,
+        "cutoff": job.cutoff.isoformat() if job.cutoff else None,
+        "tables_done": job.step,
+        "tables_total": len(tables),
+        "deleted_rows": sum(job.progress.values()),
+        "progress": job.progress,
+        "error": job.error or None,
+        "owner": job.owner or None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+async def create_erasure_job(db: AsyncSession, employee_id: uuid.UUID) -> PurgeJob:
+    """Queue the erasure of everything stored for an employee (caller commits)."""
+    job = PurgeJob(kind=ERASURE, employee_id=employee_id, progress={})
+    db.add(job)
+    await db.flush()
+    return job
+
+
+async def create_retention_job(db: AsyncSession, cutoff: date) -> PurgeJob:
+    """Queue the deletion of weeks that ended on or before `cutoff` (caller commits)."""
+    job = PurgeJob(kind=RETENTION, cutoff=cutoff, progress={})
+    db.add(job)
+    await db.flush()
+    return job
+
+
+class PurgeWorker:
+    """Runs purge jobs one batch at a time; one job at a time per process."""
+
+    STALE_SECONDS = 120.0  # an owner silent this long is presumed dead
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.batches = 0
+        self.rows_deleted = 0
+        self.jobs_finished = 0
+
+    async def _purge_table(self, db: AsyncSession, job: PurgeJob, model) -> None:
+        cfg = get_settings()
+        table = model.__tablename__
+        where = _criteria(job, model)
+        while True:
+            ids = (await db.execute(select(model.id).where(where).limit(cfg.purge_batch_size))).scalars().all()
+            if not ids:
+                return
+            await db.execute(delete(model).where(model.id.in_(ids)))
+            job.progress = {**job.progress, table: job.progress.get(table, 0) + len(ids)}
+            await self._heartbeat(db, job)
+            await db.commit()  # releases the batch's locks and records progress
+            self.batches += 1
+            self.rows_deleted += len(ids)
+            await asyncio.sleep(cfg.purge_batch_pause_ms / 1000)
+
+    async def _claim(self, db: AsyncSession, job_id: uuid.UUID) -> bool:
+        """Take the job unless another live worker holds it (commits)."""
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(PurgeJob)
+            .where(
+                PurgeJob.id == job_id,
+                PurgeJob.status.in_((PENDING, RUNNING)),
+                or_(
+                    PurgeJob.owner == "",
+                    PurgeJob.owner == self.worker_id,
+                    PurgeJob.heartbeat_at < now - timedelta(seconds=self.STALE_SECONDS),
+                ),
+            )
+            .values(owner=self.worker_id, heartbeat_at=now, status=RUNNING)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def _heartbeat(self, db: AsyncSession, job: PurgeJob) -> None:
+        """Refresh the claim in the batch's transaction; ClaimLost if it is gone."""
+        result = await db.execute(
+            update(PurgeJob)
+            .where(PurgeJob.id == job.id, PurgeJob.owner == self.worker_id)
+            .values(heartbeat_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise ClaimLost(job.id)
+
+    async def run_job(self, db: AsyncSession, job_id: uuid.UUID) -> PurgeJob | None:
+        """Run (or resume) one job to completion; returns it, or None if unknown.
+
+        A job another live worker holds is returned as it is, unfinished.
+        """
+        async with self._lock:
+            job = await db.get(PurgeJob, job_id)
+            if job is None or job.status in (DONE, FAILED):
+                return job
+            claimed = await self._claim(db, job_id)
+            await db.refresh(job)
+            if not claimed:
+                logger.info("Purge job %s is held by %s", job_id, job.owner)
+                return job
+            try:
+                tables = _tables(job)
+                for model in tables[job.step:]:
+                    await self._purge_table(db, job, model)
+                    job.step += 1
+                    await self._heartbeat(db, job)
+                    await db.commit()
+                if job.kind == ERASURE:
+                    await self._erase_spool(db, job)
+                await self._heartbeat(db, job)
+                job.status = DONE
+            except ClaimLost:
+                await db.rollback()
+                logger.warning("Purge job %s was taken over by another worker", job_id)
+                await db.refresh(job)
+                return job
+            except Exception as e:
+                await db.rollback()
+                logger.exception("Purge job %s failed", job_id)
+                job.status, job.error = FAILED, str(e)
+            job.finished_at = datetime.utcnow()
+            await db.commit()
+            self.jobs_finished += 1
+            return job
+
+    async def _erase_spool(self, db: AsyncSession, job: PurgeJob) -> None:
+        spool_dir = get_settings().metadata_spool_dir
+        emp = await db.get(Employee, job.employee_id)
+        if spool_dir and emp is not None:
+            await asyncio.to_thread(erase_person, spool_dir, emp.email)
+
+    async def _resume_once(self) -> tuple[int, int]:
+        """``(jobs finished, jobs held by other workers)`` of one pass."""
+        from app.db import async_session_factory
+
+        finished = held = 0
+        async with async_session_factory() as db:
+            result = await db.execute(
+                select(PurgeJob.id).where(PurgeJob.status.in_((PENDING, RUNNING))).order_by(PurgeJob.created_at)
+            )
+            for job_id in result.scalars().all():
+                job = await self.run_job(db, job_id)
+                if job is not None and job.status in (PENDING, RUNNING):
+                    held += 1
+                else:
+                    finished += 1
+        return finished, held
+
+    async def resume(self) -> int:
+        """Finish jobs an earlier process left pending or running (no live owner)."""
+        finished, _ = await self._resume_once()
+        if finished:
+            logger.info("Resumed %d purge job(s)", finished)
+        return finished
+
+    async def _resume_until_released(self) -> None:
+        """Resume, and re-check jobs held elsewhere until they finish or go stale.
+
+        A job held by the process this one replaced still has a fresh
+        heartbeat at startup; it becomes claimable `STALE_SECONDS` later.
+        """
+        while True:
+            finished, held = await self._resume_once()
+            if finished:
+                logger.info("Resumed %d purge job(s)", finished)
+            if not held:
+                return
+            await asyncio.sleep(self.STALE_SECONDS)
+
+    async def run_in_background(self, job_id: uuid.UUID) -> None:
+        """Entry point for request background tasks – runs with its own session."""
+        from app.db import async_session_factory
+
+        async with async_session_factory() as db:
+            await self.run_job(db, job_id)
+
+    def start(self) -> None:
+        """Resume unfinished jobs without blocking startup."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._resume_until_released())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "busy": self._lock.locked(),
+            "batches": self.batches,
+            "rows_deleted": self.rows_deleted,
+            "jobs_finished": self.jobs_finished,
+        }
+
+
+purge_worker = PurgeWorker()
@@ -6,12 +6,18 @@ Manager Coaching Copilot: generates agenda, questions, listening cues, follow-up
 from __future__ import annotations
 
 import uuid
+from typing import AsyncIterator, NamedTuple
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.models import Employee, WeeklySignal, EmployeeScore
 from app.schemas import QuestionsResponse
-from app.ollama_client import ollama
+from app.llm_cache import generate_cached, stream_cached
+from app.llm_prompt import PromptSpec, build_prompt, parse_json_object
+from app.ollama_client import LLMQueue
+from app.services.pregenerate import QUESTIONS, load_pregenerated
+from app.services.rules import ALWAYS, Frame, col, count, evaluate, rule
 
 
 def _normalize_str_list(items: list) -> list[str]:
@@ -34,147 +40,171 @@ def _normalize_str_list(items: list) -> list[str]:
 
 # ── Template fallback ───────────────────────────────────────────────
 
-def _template_questions(emp_name: str, scores: dict, signals: dict) -> QuestionsResponse:
-    """Rule-based 1:1 agenda generator – works without Ollama."""
-    questions = []
-    listening_cues = []
-    follow_ups = []
-    context_notes = []
-
-    br = scores.get("burnout_risk", 0)
-    pd = scores.get("performance_degradation", 0)
-    hp = scores.get("high_potential", 0)
-    pressure = scores.get("high_pressure", 0)
+AGENDA_DEFAULTS = {
+    "burnout_risk": 0, "high_pressure": 0, "high_potential": 0, "performance_degradation": 0,
+    "missed_deadlines": 0, "after_hours_events": 0, "unique_collaborators": 0, "learning_hours": 0,
+}
 
+AGENDA_RULES = (
     # Always start warm
-    questions.append(f"How are you feeling about your work this week, {emp_name}?")
-    listening_cues.append("Listen for energy level, enthusiasm, and any hesitation.")
-
+    rule(
+        ALWAYS,
+        ("questions", "How are you feeling about your work this week, {emp_name}?"),
+        ("listening_cues", "Listen for energy level, enthusiasm, and any hesitation."),
+    ),
     # Burnout / pressure path
-    if br >= 50 or pressure >= 55:
-        questions.append("I've noticed your workload has been intense. What's been the most challenging part?")
-        questions.append("Are there meetings or tasks we can deprioritize to give you more focus time?")
-        listening_cues.append("Watch for signs of exhaustion, frustration, or disengagement.")
-        follow_ups.append("Review and reduce meeting load by 20% next sprint.")
-        follow_ups.append("Block protected focus time on calendar.")
-        context_notes.append(f"Burnout risk score: {br:.0f}/100. After-hours activity: {signals.get('after_hours_events', 0)} events.")
-
+    rule(
+        (col("burnout_risk") >= 50) | (col("high_pressure") >= 55),
+        ("questions", "I've noticed your workload has been intense. What's been the most challenging part?"),
+        ("questions", "Are there meetings or tasks we can deprioritize to give you more focus time?"),
+        ("listening_cues", "Watch for signs of exhaustion, frustration, or disengagement."),
+        ("follow_up_actions", "Review and reduce meeting load by 20% next sprint."),
+        ("follow_up_actions", "Block protected focus time on calendar."),
+        ("context_notes",
+         "Burnout risk score: {burnout_risk:.0f}/100. After-hours activity: {after_hours_events} events."),
+    ),
     # Performance degradation path
-    if pd >= 50:
-        questions.append("Have you run into any blockers on your current projects?")
-        questions.append("Is there support or context you need that you're not getting?")
-        listening_cues.append("Avoid blame framing. Focus on systemic blockers, not individual shortcomings.")
-        follow_ups.append("Identify and address top 2 blockers within this week.")
-        context_notes.append(f"Performance trend declining. Missed deadlines: {signals.get('missed_deadlines', 0)}.")
-
+    rule(
+        col("performance_degradation") >= 50,
+        ("questions", "Have you run into any blockers on your current projects?"),
+        ("questions", "Is there support or context you need that you're not getting?"),
+        ("listening_cues", "Avoid blame framing. Focus on systemic blockers, not individual shortcomings."),
+        ("follow_up_actions", "Identify and address top 2 blockers within this week."),
+        ("context_notes", "Performance trend declining. Missed deadlines: {missed_deadlines}."),
+    ),
     # High potential path
-    if hp >= 55:
-        questions.append("What skills are you most excited to develop right now?")
-        questions.append("Would you be interested in a stretch assignment or mentorship opportunity?")
-        follow_ups.append("Explore stretch project assignment for next quarter.")
-        follow_ups.append("Connect with potential mentor in adjacent team.")
-        context_notes.append(f"High potential score: {hp:.0f}/100. Growth trajectory strong.")
-
+    rule(
+        col("high_potential") >= 55,
+        ("questions", "What skills are you most excited to develop right now?"),
+        ("questions", "Would you be interested in a stretch assignment or mentorship opportunity?"),
+        ("follow_up_actions", "Explore stretch project assignment for next quarter."),
+        ("follow_up_actions", "Connect with potential mentor in adjacent team."),
+        ("context_notes", "High potential score: {high_potential:.0f}/100. Growth trajectory strong."),
+    ),
     # Collaboration
-    if signals.get("unique_collaborators", 0) < 5:
-        questions.append("How do you feel about your connections with other teams?")
-        follow_ups.append("Introduce to cross-team stakeholders.")
-
+    rule(
+        col("unique_collaborators") < 5,
+        ("questions", "How do you feel about your connections with other teams?"),
+        ("follow_up_actions", "Introduce to cross-team stakeholders."),
+    ),
     # Growth
-    if signals.get("learning_hours", 0) >= 3:
-        questions.append("I see you've been investing in learning. What are you working on?")
-        context_notes.append(f"Learning hours: {signals.get('learning_hours', 0)}h this week.")
-
+    rule(
+        col("learning_hours") >= 3,
+        ("questions", "I see you've been investing in learning. What are you working on?"),
+        ("context_notes", "Learning hours: {learning_hours}h this week."),
+    ),
     # Ensure we always have meaningful depth (at least 3 questions before the close)
-    if len(questions) < 3:
-        questions.append("What's been the most rewarding part of your work recently?")
-        listening_cues.append("Look for what energizes them — this reveals engagement drivers.")
-    if len(questions) < 4:
-        questions.append("Are there any process improvements you'd suggest for the team?")
-        follow_ups.append("Document suggested improvements and review at next retrospective.")
-
+    rule(
+        count("questions") < 3,
+        ("questions", "What's been the most rewarding part of your work recently?"),
+        ("listening_cues", "Look for what energizes them — this reveals engagement drivers."),
+    ),
+    rule(
+        count("questions") < 4,
+        ("questions", "Are there any process improvements you'd suggest for the team?"),
+        ("follow_up_actions", "Document suggested improvements and review at next retrospective."),
+    ),
     # General close
-    questions.append("What's one thing I can do to better support you?")
-    listening_cues.append("End with genuine curiosity. Take notes on commitments made.")
-    follow_ups.append("Send summary of action items within 24 hours.")
+    rule(
+        ALWAYS,
+        ("questions", "What's one thing I can do to better support you?"),
+        ("listening_cues", "End with genuine curiosity. Take notes on commitments made."),
+        ("follow_up_actions", "Send summary of action items within 24 hours."),
+    ),
+)
+
+
+def template_questions_many(items: list[tuple[str, dict, dict]]) -> list[QuestionsResponse]:
+    """Rule-based agendas for many ``(emp_name, scores, signals)`` in one pass."""
+    frame = Frame(
+        [{**signals, **scores, "emp_name": emp_name} for emp_name, scores, signals in items],
+        AGENDA_DEFAULTS,
+    )
+    return [
+        QuestionsResponse(employee_name=emp_name, generated_by="template", **lines)
+        for (emp_name, _, _), lines in zip(items, evaluate(AGENDA_RULES, frame))
+    ]
+
+
+def _template_questions(emp_name: str, scores: dict, signals: dict) -> QuestionsResponse:
+    """Rule-based 1:1 agenda generator – works without Ollama."""
+    return template_questions_many([(emp_name, scores, signals)])[0]
+
+
+# ── Ollama-enhanced generation ──────────────────────────────────────
 
+# Prompt budget (estimated tokens) and generation cap for the agenda
+QUESTIONS_TOKEN_BUDGET = 200
+QUESTIONS_NUM_PREDICT = 400
+
+
+def _parse_questions(emp_name: str, result: str) -> QuestionsResponse | None:
+    """Parse a JSON-mode Ollama agenda response."""
+    data = parse_json_object(result)
+    if data is None:
+        return None
     return QuestionsResponse(
         employee_name=emp_name,
-        questions=questions,
-        listening_cues=listening_cues,
-        follow_up_actions=follow_ups,
-        context_notes=context_notes,
-        generated_by="template",
+        questions=_normalize_str_list(data.get("questions", [])),
+        listening_cues=_normalize_str_list(data.get("listening_cues", [])),
+        follow_up_actions=_normalize_str_list(data.get("follow_up_actions", [])),
+        context_notes=_normalize_str_list(data.get("context_notes", [])),
+        generated_by="ollama",
     )
 
 
-# ── Ollama-enhanced generation ──────────────────────────────────────
+def _questions_prompt(emp_name: str, scores: dict, signals: dict) -> PromptSpec:
+    """Compact JSON-mode prompt for the 1:1 agenda."""
+    system = "Empathetic management coach. Specific, action-oriented, human-centered; never blame the employee."
+    return build_prompt(
+        system,
+        f"1:1 agenda for {emp_name}. Scores 0-100.",
+        [("scores", scores), ("this_week", signals)],
+        {
+            "questions": "5-7 warm, specific, open-ended questions",
+            "listening_cues": "3-4 cues for the manager",
+            "follow_up_actions": "3-5 concrete actions",
+            "context_notes": "2-3 notes on the data used",
+        },
+        QUESTIONS_TOKEN_BUDGET,
+        QUESTIONS_NUM_PREDICT,
+    )
 
-async def _ollama_questions(emp_name: str, scores: dict, signals: dict) -> QuestionsResponse | None:
-    """Use Ollama to generate rich 1:1 agenda."""
-    system = (
-        "You are an empathetic management coach. Generate a structured 1:1 meeting agenda. "
-        "Be specific, action-oriented, and human-centered. Never blame the employee. "
-        "Format: list questions, listening cues, follow-up actions, and context notes."
+
+async def _ollama_questions(
+    emp_name: str,
+    scores: dict,
+    signals: dict,
+    cache_scope: str = "",
+    cache_version: str = "",
+    priority: str = LLMQueue.INTERACTIVE,
+) -> QuestionsResponse | None:
+    """Use Ollama to generate rich 1:1 agenda (cached per employee and week)."""
+    spec = _questions_prompt(emp_name, scores, signals)
+    return await generate_cached(
+        spec.prompt, spec.system, lambda text: _parse_questions(emp_name, text), cache_scope, cache_version,
+        priority, json_mode=True, num_predict=spec.num_predict,
     )
 
-    prompt = f"""Generate a 1:1 meeting agenda for {emp_name}.
-
-Current signals (this week):
-- Tasks completed: {signals.get('tasks_completed', 'N/A')}
-- Missed deadlines: {signals.get('missed_deadlines', 'N/A')}
-- Meeting hours: {signals.get('meeting_hours', 'N/A')}h
-- Focus blocks (≥2h): {signals.get('focus_blocks', 'N/A')}
-- After-hours events: {signals.get('after_hours_events', 'N/A')}
-- Unique collaborators: {signals.get('unique_collaborators', 'N/A')}
-- Learning hours: {signals.get('learning_hours', 'N/A')}h
-
-Computed scores (0-100):
-- Burnout risk: {scores.get('burnout_risk', 'N/A')}
-- High pressure: {scores.get('high_pressure', 'N/A')}
-- High potential: {scores.get('high_potential', 'N/A')}
-- Performance degradation: {scores.get('performance_degradation', 'N/A')}
-
-Generate exactly:
-1. 5-7 open-ended questions (warm, specific, non-judgmental)
-2. 3-4 listening cues for the manager
-3. 3-5 concrete follow-up actions
-4. 2-3 context notes about what data informed this
-
-Respond in JSON format:
-{{"questions": [...], "listening_cues": [...], "follow_up_actions": [...], "context_notes": [...]}}
-"""
 
-    result = await ollama.generate(prompt, system)
-    if not result:
-        return None
+# ── Public API ──────────────────────────────────────────────────────
 
-    # Parse the response (best-effort)
-    import json
-    try:
-        # Try to extract JSON from response
-        start = result.find("{")
-        end = result.rfind("}") + 1
-        if start >= 0 and end > start:
-            data = json.loads(result[start:end])
-            return QuestionsResponse(
-                employee_name=emp_name,
-                questions=_normalize_str_list(data.get("questions", [])),
-                listening_cues=_normalize_str_list(data.get("listening_cues", [])),
-                follow_up_actions=_normalize_str_list(data.get("follow_up_actions", [])),
-                context_notes=_normalize_str_list(data.get("context_notes", [])),
-                generated_by="ollama",
-            )
-    except (json.JSONDecodeError, KeyError, TypeError, Exception):
-        pass
-
-    return None
+class QuestionsContext(NamedTuple):
+    """Everything agenda generation needs, loaded up front."""
+    employee_id: uuid.UUID
+    employee_name: str
+    scores: dict
+    signals: dict
+    week: str  # latest signal week (ISO) – the LLM cache version
+    pregenerated: QuestionsResponse | None = None  # overnight draft for `week`
 
+    @property
+    def cache_scope(self) -> str:
+        return f"employee:{self.employee_id}"
 
-# ── Public API ──────────────────────────────────────────────────────
 
-async def generate_questions(db: AsyncSession, employee_id: uuid.UUID) -> QuestionsResponse:
-    """Generate 1:1 coaching agenda for an employee."""
+async def load_questions_context(db: AsyncSession, employee_id: uuid.UUID) -> QuestionsContext:
+    """Latest signals and scores for an employee's 1:1 agenda."""
     emp = await db.get(Employee, employee_id)
     if not emp:
         raise ValueError(f"Employee {employee_id} not found")
@@ -212,9 +242,45 @@ async def generate_questions(db: AsyncSession, employee_id: uuid.UUID) -> Questi
         "performance_degradation": score.performance_degradation if score else 0,
     }
 
+    week = signal.week_start.isoformat() if signal else ""
+    stored = await load_pregenerated(db, employee_id, QUESTIONS, week)
+    pregenerated = QuestionsResponse(**stored) if stored else None
+    return QuestionsContext(employee_id, emp.name, scores, signals, week, pregenerated)
+
+
+async def generate_questions(db: AsyncSession, employee_id: uuid.UUID) -> QuestionsResponse:
+    """Generate 1:1 coaching agenda for an employee."""
+    ctx = await load_questions_context(db, employee_id)
+    if ctx.pregenerated:
+        return ctx.pregenerated
+
     # Try Ollama first, fall back to template
-    ollama_result = await _ollama_questions(emp.name, scores, signals)
+    ollama_result = await _ollama_questions(
+        ctx.employee_name, ctx.scores, ctx.signals,
+        cache_scope=ctx.cache_scope,
+        cache_version=ctx.week,
+    )
     if ollama_result:
         return ollama_result
 
-    return _template_questions(emp.name, scores, signals)
+    return _template_questions(ctx.employee_name, ctx.scores, ctx.signals)
+
+
+async def stream_questions(ctx: QuestionsContext) -> AsyncIterator[tuple[str, str | QuestionsResponse]]:
+    """Stream the agenda: ``("token", text)`` chunks, then ``("result", QuestionsResponse)``.
+
+    A pre-generated draft, cache hit or unavailable model yields the result
+    straight away; the template is the result whenever the streamed text
+    does not parse.
+    """
+    if ctx.pregenerated:
+        yield "result", ctx.pregenerated
+        return
+    spec = _questions_prompt(ctx.employee_name, ctx.scores, ctx.signals)
+    async for kind, payload in stream_cached(
+        spec.prompt, spec.system, lambda text: _parse_questions(ctx.employee_name, text), ctx.cache_scope, ctx.week,
+        json_mode=True, num_predict=spec.num_predict,
+    ):
+        if kind == "result":
+            payload = payload or _template_questions(ctx.employee_name, ctx.scores, ctx.signals)
+        yield kind, payload
@@ -0,0 +1,205 @@
+"""Data retention for the weekly tables.
+
+On Postgres `weekly_signals` and `employee_scores` are range-partitioned by
+`week_start`, one partition per month (migration 004). Maintenance creates
+the partitions for the coming months ahead of the inserts, and retention
+drops a whole partition once every week in it is past the retention window
+– a metadata-only `DROP TABLE` instead of a row-by-row DELETE that bloats
+the table and the WAL. Elsewhere (SQLite, or Postgres before the migration)
+the tables are plain and expired rows are deleted by the purge worker in
+throttled batches. The smaller per-employee weekly tables (insights
+snapshots, pre-generated drafts, collaboration bottlenecks) are never
+partitioned; their expired rows are deleted alongside.
+
+A week expires like a spooled week does: once the whole week is older than
+`data_retention_days`. With partitions, rows of a partially expired month
+are kept until the month's last week expires. Partitions exist from the
+month of the retention cutoff onwards, so a week older than the window has
+nowhere to go on Postgres (it would be dropped anyway). In demo mode "today"
+is the demo calendar's current week, which keeps the fixed demo data.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, timedelta
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models import CollaborationBottleneck, InsightsSnapshot, PregeneratedDraft
+from app.services.purge import create_retention_job, purge_worker
+from app.signals.generate_demo import get_demo_week_start
+from app.signals.ingest import get_retention_days
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED = ("weekly_signals", "employee_scores")
+UNPARTITIONED_WEEKLY = (InsightsSnapshot, PregeneratedDraft, CollaborationBottleneck)  # also keyed by week_start
+
+MAINTENANCE_LOCK_ID = 0x54506D74  # advisory lock key ("TPmt") serializing partition DDL
+
+_PARTITION_RE = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+# ── Month arithmetic ────────────────────────────────────────────────
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, n: int) -> date:
+    years, index = divmod(month.month - 1 + n, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """``weekly_signals_p202610`` for October 2026."""
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(name: str) -> date | None:
+    """Inverse of `partition_name` (None for anything else)."""
+    match = _PARTITION_RE.search(name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def reference_day() -> date:
+    """Today – or the demo calendar's current week in demo mode."""
+    return get_demo_week_start() if get_settings().demo_mode else date.today()
+
+
+def retention_cutoff(retention_days: int, today: date | None = None) -> date:
+    """Weeks that end on or before this day are expired."""
+    return (today or reference_day()) - timedelta(days=retention_days)
+
+
+def partition_expired(month: date, cutoff: date) -> bool:
+    """True when every week starting in `month` ends on or before `cutoff`."""
+    last_week_start = add_months(month, 1) - timedelta(days=1)
+    return last_week_start + timedelta(days=7) <= cutoff
+
+
+# ── Catalog ─────────────────────────────────────────────────────────
+
+async def is_partitioned(db: AsyncSession, table: str) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        return False
+    result = await db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table"
+        ),
+        {"table": table},
+    )
+    return result.scalar() is not None
+
+
+async def list_partitions(db: AsyncSession, table: str) -> dict[date, str]:
+    """``{month: partition table}`` for a partitioned table."""
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table},
+    )
+    partitions = {}
+    for name in result.scalars():
+        month = partition_month(name)
+        if month is not None:
+            partitions[month] = name
+    return partitions
+
+
+# ── Maintenance ─────────────────────────────────────────────────────
+
+async def _lock_maintenance(db: AsyncSession) -> None:
+    """Wait for other workers' partition maintenance (held until the next commit).
+
+    Every worker checks the partitions at startup and `POST /sync/retention`
+    can overlap the nightly job, so concurrent `CREATE TABLE ... PARTITION OF`
+    / `DROP TABLE` on the same month are serialized; the second worker then
+    sees the first one's partitions. No-op off PostgreSQL.
+    """
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_ID})
+
+
+async def ensure_partitions(db: AsyncSession, today: date | None = None) -> list[str]:
+    """Create missing monthly partitions from the retention cutoff's month to
+    `partition_months_ahead` months after this one.
+
+    No-op for plain tables. Returns the partitions created.
+    """
+    await _lock_maintenance(db)
+    today = today or reference_day()
+    first = month_start(retention_cutoff(await get_retention_days(db), today))
+    last = add_months(month_start(today), get_settings().partition_months_ahead)
+    created = []
+    for table in PARTITIONED:
+        if not await is_partitioned(db, table):
+            continue
+        existing = await list_partitions(db, table)
+        month = first
+        while month <= last:
+            upper = add_months(month, 1)
+            if month not in existing:
+                name = partition_name(table, month)
+                await db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+                ))
+                created.append(name)
+            month = upper
+    await db.commit()
+    return created
+
+
+async def enforce_retention(db: AsyncSession, today: date | None = None) -> dict:
+    """Drop expired partitions (or delete expired rows on plain tables)."""
+    await _lock_maintenance(db)
+    cutoff = retention_cutoff(await get_retention_days(db), today)
+    summary = {"cutoff": cutoff.isoformat(), "dropped_partitions": [], "deleted_rows": 0, "purge_job_id": None}
+    if await is_partitioned(db, PARTITIONED[0]):  # migration 004 partitions both tables
+        for table in PARTITIONED:
+            for month, name in sorted((await list_partitions(db, table)).items()):
+                if partition_expired(month, cutoff):
+                    await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                    summary["dropped_partitions"].append(name)
+        # Per-employee tables outside the partitions: a few rows per employee
+        # and week at most – plain deletes are fine
+        for model in UNPARTITIONED_WEEKLY:
+            result = await db.execute(delete(model).where(model.week_start <= cutoff - timedelta(days=7)))
+            summary["deleted_rows"] += result.rowcount or 0
+        await db.commit()
+    else:
+        # Plain tables: row deletes go through the purge worker in throttled batches
+        job = await create_retention_job(db, cutoff)
+        await db.commit()
+        job = await purge_worker.run_job(db, job.id)
+        summary["purge_job_id"] = str(job.id)
+        summary["deleted_rows"] = sum(job.progress.values())
+    return summary
+
+
+async def maintain_weekly_tables(db: AsyncSession, today: date | None = None) -> dict:
+    """Create upcoming partitions, then enforce retention."""
+    from app.db import bump_response_cache
+
+    created = await ensure_partitions(db, today)
+    summary = {**await enforce_retention(db, today), "created_partitions": created}
+    await bump_response_cache()
+    logger.info("Weekly table maintenance finished: %s", summary)
+    return summary
+
+
+async def run_maintenance() -> dict:
+    """Scheduled entry point – runs with its own session."""
+    from app.db import async_session_factory
+
+    async with async_session_factory() as db:
+        return await maintain_weekly_tables(db)
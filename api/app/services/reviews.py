@@ -5,9 +5,11 @@ One-click summary for last 4 weeks: highlights, growth, risks, suggested goals.
 
 from __future__ import annotations
 
-import json
+import asyncio
 import uuid
 from datetime import date, timedelta
+from typing import AsyncIterator, NamedTuple
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -15,7 +17,12 @@ from app.models import Employee, WeeklySignal, EmployeeScore
 from app.schemas import ReviewDraftResponse
 from app.scoring.scorer import compute_all_scores
 from app.signals.compute import compute_all_trends
-from app.ollama_client import ollama
+from app.llm_cache import generate_cached, stream_cached
+from app.llm_prompt import PromptSpec, build_prompt, parse_json_object, trend_directions
+from app.ollama_client import LLMQueue
+from app.services.insights import load_latest_signals, load_stored_scores, load_stored_scores_many
+from app.services.pregenerate import REVIEW, load_pregenerated, load_pregenerated_many
+from app.services.rules import ALWAYS, Frame, col, count, evaluate, rule
 
 
 def _normalize_str_list(items: list) -> list[str]:
@@ -37,163 +44,281 @@ def _normalize_str_list(items: list) -> list[str]:
     return result
 
 
-def _template_review(
-    emp_name: str,
-    period: str,
-    signals: list[dict],
-    scores: list[dict],
-    trends: dict,
-) -> ReviewDraftResponse:
-    """Template-based performance review."""
-    highlights = []
-    growth_areas = []
-    risks = []
-    suggested_goals = []
-
-    if not signals:
-        return ReviewDraftResponse(
-            employee_name=emp_name,
-            period=period,
-            highlights=["Insufficient data for review."],
-            growth_areas=[],
-            risks=[],
-            suggested_goals=[],
-            summary="Not enough signal data to generate a review.",
-            generated_by="template",
-        )
-
-    current = signals[0]
-    score_map = {s["score_name"]: s for s in scores}
+REVIEW_DEFAULTS = {
+    "tasks_completed": 0, "support_actions": 0, "cross_team_ratio": 0, "learning_hours": 0,
+    "missed_deadlines": 0, "unique_collaborators": 0, "after_hours_events": 0,
+    "high_potential": 0, "burnout_risk": 0, "performance_degradation": 0,
+    "tasks_completed_trend": "stable",
+}
 
+REVIEW_RULES = (
     # Highlights
-    if current.get("tasks_completed", 0) >= 8:
-        highlights.append(f"Completed {current['tasks_completed']} tasks this week, demonstrating strong execution.")
-    if current.get("support_actions", 0) >= 4:
-        highlights.append(f"Actively supported teammates with {current['support_actions']} collaborative actions.")
-    if current.get("cross_team_ratio", 0) >= 0.35:
-        highlights.append("Strong cross-team collaboration, contributing to organizational connectivity.")
-    if current.get("learning_hours", 0) >= 3:
-        highlights.append(f"Invested {current['learning_hours']}h in professional development.")
-    if current.get("missed_deadlines", 0) == 0:
-        highlights.append("Perfect on-time delivery record this period.")
-
-    if not highlights:
-        highlights.append("Maintained consistent contributions throughout the period.")
-
+    rule(
+        col("tasks_completed") >= 8,
+        ("highlights", "Completed {tasks_completed} tasks this week, demonstrating strong execution."),
+    ),
+    rule(
+        col("support_actions") >= 4,
+        ("highlights", "Actively supported teammates with {support_actions} collaborative actions."),
+    ),
+    rule(
+        col("cross_team_ratio") >= 0.35,
+        ("highlights", "Strong cross-team collaboration, contributing to organizational connectivity."),
+    ),
+    rule(col("learning_hours") >= 3, ("highlights", "Invested {learning_hours}h in professional development.")),
+    rule(col("missed_deadlines") == 0, ("highlights", "Perfect on-time delivery record this period.")),
+    rule(count("highlights") == 0, ("highlights", "Maintained consistent contributions throughout the period.")),
     # Growth areas
-    task_trend = trends.get("tasks_completed", {}).get("direction", "stable")
-    if task_trend == "increasing":
-        growth_areas.append("Delivery velocity is increasing – potential for expanded scope.")
-    if current.get("unique_collaborators", 0) < 5:
-        growth_areas.append("Expand collaboration network to broaden impact and knowledge sharing.")
-    if current.get("learning_hours", 0) < 1:
-        growth_areas.append("Allocate time for skill development and continuous learning.")
-
-    hp = score_map.get("high_potential", {})
-    if hp.get("score", 0) >= 55:
-        growth_areas.append("Shows high-potential signals – ready for stretch assignments.")
-
+    rule(
+        col("tasks_completed_trend") == "increasing",
+        ("growth_areas", "Delivery velocity is increasing – potential for expanded scope."),
+    ),
+    rule(
+        col("unique_collaborators") < 5,
+        ("growth_areas", "Expand collaboration network to broaden impact and knowledge sharing."),
+    ),
+    rule(
+        col("learning_hours") < 1,
+        ("growth_areas", "Allocate time for skill development and continuous learning."),
+    ),
+    rule(
+        col("high_potential") >= 55,
+        ("growth_areas", "Shows high-potential signals – ready for stretch assignments."),
+    ),
     # Risks
-    br = score_map.get("burnout_risk", {})
-    if br.get("score", 0) >= 50:
-        risks.append(f"Burnout risk at {br['score']:.0f}/100. Monitor workload and well-being.")
-    pd = score_map.get("performance_degradation", {})
-    if pd.get("score", 0) >= 50:
-        risks.append(f"Performance trend declining ({pd['score']:.0f}/100). Identify blockers.")
-    if current.get("after_hours_events", 0) > 4:
-        risks.append("Elevated after-hours activity suggests boundary issues.")
-
+    rule(
+        col("burnout_risk") >= 50,
+        ("risks", "Burnout risk at {burnout_risk:.0f}/100. Monitor workload and well-being."),
+    ),
+    rule(
+        col("performance_degradation") >= 50,
+        ("risks", "Performance trend declining ({performance_degradation:.0f}/100). Identify blockers."),
+    ),
+    rule(col("after_hours_events") > 4, ("risks", "Elevated after-hours activity suggests boundary issues.")),
     # Goals
-    suggested_goals.append("Maintain current delivery pace while protecting work-life balance.")
-    if current.get("learning_hours", 0) < 2:
-        suggested_goals.append("Complete at least one skill development activity per month.")
-    if hp.get("score", 0) >= 55:
-        suggested_goals.append("Take on a cross-functional initiative to expand leadership skills.")
-    suggested_goals.append("Strengthen one cross-team relationship through a collaborative project.")
-
+    rule(ALWAYS, ("suggested_goals", "Maintain current delivery pace while protecting work-life balance.")),
+    rule(
+        col("learning_hours") < 2,
+        ("suggested_goals", "Complete at least one skill development activity per month."),
+    ),
+    rule(
+        col("high_potential") >= 55,
+        ("suggested_goals", "Take on a cross-functional initiative to expand leadership skills."),
+    ),
+    rule(ALWAYS, ("suggested_goals", "Strengthen one cross-team relationship through a collaborative project.")),
+)
+
+
+def _review_row(emp_name: str, signals: list[dict], scores: list[dict], trends: dict) -> dict:
+    """Latest signals, scores by name and the task trend as one rule-table row."""
+    return {
+        **signals[0],
+        **{s["score_name"]: s["score"] for s in scores},
+        "tasks_completed_trend": trends.get("tasks_completed", {}).get("direction", "stable"),
+        "emp_name": emp_name,
+    }
+
+
+def _review_summary(emp_name: str, highlights: list[str], risks: list[str]) -> str:
     summary = (
         f"{emp_name} has demonstrated {'strong' if len(highlights) >= 3 else 'steady'} performance "
         f"over the review period. "
         f"{'Key strengths include ' + highlights[0].lower() + '.' if highlights else ''} "
         f"{'Areas to watch: ' + risks[0].lower() if risks else 'No significant concerns identified.'}"
     )
+    return summary.strip()
+
+
+def template_reviews_many(
+    items: list[tuple[str, str, list[dict], list[dict], dict]],
+) -> list[ReviewDraftResponse]:
+    """Template reviews for many ``(emp_name, period, signals, scores, trends)`` in one pass."""
+    with_data = [item for item in items if item[2]]
+    frame = Frame([_review_row(name, signals, scores, trends) for name, _, signals, scores, trends in with_data],
+                  REVIEW_DEFAULTS)
+    drafted = iter(evaluate(REVIEW_RULES, frame))
+
+    reviews = []
+    for emp_name, period, signals, _, _ in items:
+        if not signals:
+            reviews.append(ReviewDraftResponse(
+                employee_name=emp_name,
+                period=period,
+                highlights=["Insufficient data for review."],
+                growth_areas=[],
+                risks=[],
+                suggested_goals=[],
+                summary="Not enough signal data to generate a review.",
+                generated_by="template",
+            ))
+            continue
+        lines = next(drafted)
+        reviews.append(ReviewDraftResponse(
+            employee_name=emp_name,
+            period=period,
+            summary=_review_summary(emp_name, lines["highlights"], lines["risks"]),
+            generated_by="template",
+            **lines,
+        ))
+    return reviews
+
+
+def _template_review(
+    emp_name: str,
+    period: str,
+    signals: list[dict],
+    scores: list[dict],
+    trends: dict,
+) -> ReviewDraftResponse:
+    """Template-based performance review."""
+    return template_reviews_many([(emp_name, period, signals, scores, trends)])[0]
+
+
+# Prompt budget (estimated tokens) and generation cap for the review draft
+REVIEW_TOKEN_BUDGET = 240
+REVIEW_NUM_PREDICT = 450
+
 
+def _parse_review(emp_name: str, period: str, result: str) -> ReviewDraftResponse | None:
+    """Parse a JSON-mode Ollama review response."""
+    data = parse_json_object(result)
+    if data is None:
+        return None
     return ReviewDraftResponse(
         employee_name=emp_name,
         period=period,
-        highlights=highlights,
-        growth_areas=growth_areas,
-        risks=risks,
-        suggested_goals=suggested_goals,
-        summary=summary.strip(),
-        generated_by="template",
+        highlights=_normalize_str_list(data.get("highlights", [])),
+        growth_areas=_normalize_str_list(data.get("growth_areas", [])),
+        risks=_normalize_str_list(data.get("risks", [])),
+        suggested_goals=_normalize_str_list(data.get("suggested_goals", [])),
+        summary=str(data.get("summary", "")),
+        generated_by="ollama",
     )
 
 
-async def _ollama_review(
+def _review_prompt(
     emp_name: str,
     period: str,
     signals: list[dict],
     scores: list[dict],
     trends: dict,
-) -> ReviewDraftResponse | None:
-    """Ollama-enhanced review generation."""
-    system = (
-        "You are a thoughtful management coach writing a performance review draft. "
-        "Be specific, balanced, and constructive. Use data but maintain empathy. "
-        "NEVER reference raw surveillance data. Only reference aggregated signals."
-    )
-
-    score_map = {s["score_name"]: s for s in scores}
+) -> PromptSpec:
+    """Compact JSON-mode prompt for the review draft."""
+    system = "Thoughtful management coach. Specific, balanced, constructive; cite aggregated signals only."
+
+    recent = signals[:4]
+    weeks = max(len(recent), 1)
+    averages = {
+        key: sum(s.get(key, 0) for s in recent) / weeks
+        for key in ("tasks_completed", "meeting_hours", "focus_blocks", "learning_hours")
+    }
     current = signals[0] if signals else {}
 
-    prompt = f"""Write a performance review draft for {emp_name} for the period {period}.
+    return build_prompt(
+        system,
+        f"Performance review draft for {emp_name}, {period}. Scores 0-100.",
+        [
+            ("scores", {s["score_name"]: s["score"] for s in scores}),
+            ("avg_per_week", averages),
+            ("trends", trend_directions(trends)),
+            ("this_week", {k: current[k] for k in ("cross_team_ratio", "support_actions") if k in current}),
+        ],
+        {
+            "highlights": "2-4 strengths",
+            "growth_areas": "2-3 areas",
+            "risks": "0-3 risks",
+            "suggested_goals": "2-3 goals",
+            "summary": "2-3 sentence narrative",
+        },
+        REVIEW_TOKEN_BUDGET,
+        REVIEW_NUM_PREDICT,
+    )
 
-Signal summary (4-week averages):
-- Avg tasks completed/week: {sum(s.get('tasks_completed', 0) for s in signals[:4]) / max(len(signals[:4]), 1):.1f}
-- Missed deadlines trend: {trends.get('missed_deadlines', {}).get('direction', 'N/A')}
-- Meeting hours/week: {sum(s.get('meeting_hours', 0) for s in signals[:4]) / max(len(signals[:4]), 1):.1f}
-- Focus blocks/week: {sum(s.get('focus_blocks', 0) for s in signals[:4]) / max(len(signals[:4]), 1):.1f}
-- Cross-team collaboration: {current.get('cross_team_ratio', 0):.0%}
-- Learning investment: {sum(s.get('learning_hours', 0) for s in signals[:4]) / max(len(signals[:4]), 1):.1f}h/week
-- Support actions: {current.get('support_actions', 0)}/week
 
-Computed assessments:
-- Burnout risk: {score_map.get('burnout_risk', {}).get('score', 'N/A')}/100
-- Growth potential: {score_map.get('high_potential', {}).get('score', 'N/A')}/100
-- Performance trajectory: {score_map.get('performance_degradation', {}).get('score', 'N/A')}/100
+async def _ollama_review(
+    emp_name: str,
+    period: str,
+    signals: list[dict],
+    scores: list[dict],
+    trends: dict,
+    cache_scope: str = "",
+    cache_version: str = "",
+    priority: str = LLMQueue.INTERACTIVE,
+) -> ReviewDraftResponse | None:
+    """Ollama-enhanced review generation (cached per employee and week)."""
+    spec = _review_prompt(emp_name, period, signals, scores, trends)
+    return await generate_cached(
+        spec.prompt, spec.system, lambda text: _parse_review(emp_name, period, text), cache_scope, cache_version,
+        priority, json_mode=True, num_predict=spec.num_predict,
+    )
 
-Generate a structured review as JSON:
-{{"highlights": ["..."], "growth_areas": ["..."], "risks": ["..."], "suggested_goals": ["..."], "summary": "2-3 sentence narrative"}}
-"""
 
-    result = await ollama.generate(prompt, system)
-    if not result:
-        return None
+class ReviewContext(NamedTuple):
+    """Everything review generation needs, loaded up front."""
+    employee_id: uuid.UUID
+    employee_name: str
+    period: str
+    signals: list[dict]
+    scores: list[dict]
+    trends: dict
+    week: str  # latest signal week (ISO) – the LLM cache version
+    pregenerated: ReviewDraftResponse | None = None  # overnight draft for `week`
+
+    @property
+    def cache_scope(self) -> str:
+        return f"employee:{self.employee_id}"
+
+
+def _signal_dict(s: WeeklySignal) -> dict:
+    return {
+        "tasks_completed": s.tasks_completed,
+        "missed_deadlines": s.missed_deadlines,
+        "workload_items": s.workload_items,
+        "cycle_time_days": s.cycle_time_days,
+        "meeting_hours": s.meeting_hours,
+        "meeting_count": s.meeting_count,
+        "fragmentation_score": s.fragmentation_score,
+        "focus_blocks": s.focus_blocks,
+        "after_hours_events": s.after_hours_events,
+        "unique_collaborators": s.unique_collaborators,
+        "cross_team_ratio": s.cross_team_ratio,
+        "support_actions": s.support_actions,
+        "learning_hours": s.learning_hours,
+        "stretch_assignments": s.stretch_assignments,
+        "skill_progress": s.skill_progress,
+    }
+
+
+def _review_period() -> str:
+    today = date.today()
+    return f"{(today - timedelta(weeks=4)).isoformat()} to {today.isoformat()}"
 
-    try:
-        start = result.find("{")
-        end = result.rfind("}") + 1
-        if start >= 0 and end > start:
-            data = json.loads(result[start:end])
-            return ReviewDraftResponse(
-                employee_name=emp_name,
-                period=period,
-                highlights=_normalize_str_list(data.get("highlights", [])),
-                growth_areas=_normalize_str_list(data.get("growth_areas", [])),
-                risks=_normalize_str_list(data.get("risks", [])),
-                suggested_goals=_normalize_str_list(data.get("suggested_goals", [])),
-                summary=str(data.get("summary", "")),
-                generated_by="ollama",
-            )
-    except (json.JSONDecodeError, KeyError, TypeError, Exception):
-        pass
 
-    return None
+def _build_review_context(
+    employee_id: uuid.UUID,
+    employee_name: str,
+    period: str,
+    signal_models: list[WeeklySignal],
+    stored: dict | None,
+    stored_scores: list[dict] | None = None,
+) -> ReviewContext:
+    """Scores and trends from up to 8 signal rows (newest first).
+
+    `stored_scores` are the scores sync stored for the latest week (computed
+    from the same rows); without them the scores are computed here.
+    """
+    signals = [_signal_dict(s) for s in signal_models]
+    data_quality = signal_models[0].data_quality if signal_models else 1.0
+    scores = stored_scores or compute_all_scores(signals, data_quality)
+    trends = compute_all_trends(signals)
+    week = signal_models[0].week_start.isoformat() if signal_models else ""
+    # the stored period is the one of the night it was generated; serve today's
+    pregenerated = ReviewDraftResponse(**{**stored, "period": period}) if stored else None
+    return ReviewContext(employee_id, employee_name, period, signals, scores, trends, week, pregenerated)
 
 
-async def generate_review(db: AsyncSession, employee_id: uuid.UUID) -> ReviewDraftResponse:
-    """Generate a performance review draft for last 4 weeks."""
+async def load_review_context(db: AsyncSession, employee_id: uuid.UUID) -> ReviewContext:
+    """Last 8 weeks of signals plus recomputed scores and trends."""
     emp = await db.get(Employee, employee_id)
     if not emp:
         raise ValueError(f"Employee {employee_id} not found")
@@ -206,37 +331,105 @@ async def generate_review(db: AsyncSession, employee_id: uuid.UUID) -> ReviewDra
         .limit(8)
     )
     signal_models = result.scalars().all()
-    signals = [
-        {
-            "tasks_completed": s.tasks_completed,
-            "missed_deadlines": s.missed_deadlines,
-            "workload_items": s.workload_items,
-            "cycle_time_days": s.cycle_time_days,
-            "meeting_hours": s.meeting_hours,
-            "meeting_count": s.meeting_count,
-            "fragmentation_score": s.fragmentation_score,
-            "focus_blocks": s.focus_blocks,
-            "after_hours_events": s.after_hours_events,
-            "unique_collaborators": s.unique_collaborators,
-            "cross_team_ratio": s.cross_team_ratio,
-            "support_actions": s.support_actions,
-            "learning_hours": s.learning_hours,
-            "stretch_assignments": s.stretch_assignments,
-            "skill_progress": s.skill_progress,
-        }
-        for s in signal_models
-    ]
-
-    data_quality = signal_models[0].data_quality if signal_models else 1.0
-    scores = compute_all_scores(signals, data_quality)
-    trends = compute_all_trends(signals)
-
-    today = date.today()
-    period = f"{(today - timedelta(weeks=4)).isoformat()} to {today.isoformat()}"
+    week = signal_models[0].week_start.isoformat() if signal_models else ""
+    stored = await load_pregenerated(db, employee_id, REVIEW, week)
+    scores = await load_stored_scores(db, employee_id, signal_models[0].week_start) if signal_models else []
+    return _build_review_context(employee_id, emp.name, _review_period(), signal_models, stored, scores)
+
+
+async def load_team_review_contexts(db: AsyncSession, team_id: uuid.UUID) -> list[ReviewContext]:
+    """Review contexts for every active member of a team.
+
+    One query each for the roster, the members' last 8 signal weeks, the
+    scores stored for each latest week and the stored drafts, instead of a
+    full `load_review_context` per member. Only members without stored
+    scores are scored here.
+    """
+    members = (await db.execute(
+        select(Employee.id, Employee.name)
+        .where(Employee.team_id == team_id, Employee.is_active)
+        .order_by(Employee.name)
+    )).all()
+    if not members:
+        return []
+    ids = [m.id for m in members]
+
+    by_employee = await load_latest_signals(db, ids)
+    scores = await load_stored_scores_many(
+        db, {emp_id: rows[0].week_start for emp_id, rows in by_employee.items() if rows},
+    )
+    stored = await load_pregenerated_many(db, ids, REVIEW)
+    period = _review_period()
+    contexts = []
+    for m in members:
+        signal_models = by_employee[m.id]
+        week = signal_models[0].week_start.isoformat() if signal_models else ""
+        draft = stored.get(m.id)
+        payload = draft[1] if draft and draft[0] == week else None
+        contexts.append(_build_review_context(m.id, m.name, period, signal_models, payload, scores.get(m.id)))
+    return contexts
+
+
+async def draft_review(ctx: ReviewContext, priority: str = LLMQueue.INTERACTIVE) -> ReviewDraftResponse:
+    """Stored draft, else Ollama, else the template."""
+    if ctx.pregenerated:
+        return ctx.pregenerated
 
     # Try Ollama, fall back to template
-    ollama_result = await _ollama_review(emp.name, period, signals, scores, trends)
+    ollama_result = await _ollama_review(
+        ctx.employee_name, ctx.period, ctx.signals, ctx.scores, ctx.trends,
+        cache_scope=ctx.cache_scope,
+        cache_version=ctx.week,
+        priority=priority,
+    )
     if ollama_result:
         return ollama_result
 
-    return _template_review(emp.name, period, signals, scores, trends)
+    return _template_review(ctx.employee_name, ctx.period, ctx.signals, ctx.scores, ctx.trends)
+
+
+async def generate_review(db: AsyncSession, employee_id: uuid.UUID) -> ReviewDraftResponse:
+    """Generate a performance review draft for last 4 weeks."""
+    return await draft_review(await load_review_context(db, employee_id))
+
+
+async def stream_team_reviews(
+    contexts: list[ReviewContext],
+) -> AsyncIterator[tuple[ReviewContext, ReviewDraftResponse]]:
+    """Yield ``(ctx, draft)`` per member in completion order.
+
+    All members are submitted to the LLM queue at once (batch priority, so
+    single-employee requests still go first); the queue keeps Ollama busy
+    back to back and each draft is yielded as soon as it is ready.
+    """
+    async def one(ctx: ReviewContext) -> tuple[ReviewContext, ReviewDraftResponse]:
+        return ctx, await draft_review(ctx, LLMQueue.BATCH)
+
+    tasks = [asyncio.ensure_future(one(ctx)) for ctx in contexts]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def stream_review(ctx: ReviewContext) -> AsyncIterator[tuple[str, str | ReviewDraftResponse]]:
+    """Stream the draft: ``("token", text)`` chunks, then ``("result", ReviewDraftResponse)``.
+
+    A pre-generated draft is the result straight away. Falls back to the
+    template result as soon as the stream fails or does not parse.
+    """
+    if ctx.pregenerated:
+        yield "result", ctx.pregenerated
+        return
+    spec = _review_prompt(ctx.employee_name, ctx.period, ctx.signals, ctx.scores, ctx.trends)
+    async for kind, payload in stream_cached(
+        spec.prompt, spec.system, lambda text: _parse_review(ctx.employee_name, ctx.period, text),
+        ctx.cache_scope, ctx.week, json_mode=True, num_predict=spec.num_predict,
+    ):
+        if kind == "result":
+            payload = payload or _template_review(
+                ctx.employee_name, ctx.period, ctx.signals, ctx.scores, ctx.trends,
+            )
+        yield kind, payload
@@ -0,0 +1,124 @@
+"""Declarative rule tables for the template (no-LLM) path.
+
+The template agenda, review draft and recommendations are threshold rules
+over an employee's latest signals, scores and trends. Each rule is a row in
+a table: a predicate and the lines it contributes to one or more sections.
+Tables are evaluated column-wise with numpy over any number of employees at
+once, so a whole team or org is produced in one pass (bulk exports,
+pre-generation, team streams) with no per-employee branching – only the
+fired lines are formatted per employee.
+
+    RULES = (
+        Rule(col("burnout_risk") >= 60, ("recs", "High burnout risk: {burnout_risk:.0f}")),
+        Rule(count("recs") == 0, ("recs", "Signals look healthy.")),
+    )
+    evaluate(RULES, Frame(rows))  # → [{"recs": [...]}, ...]
+
+Rules are applied in table order; `count(section)` sees the lines emitted by
+earlier rules, which covers "if nothing so far…" fallbacks.
+"""
+
+from __future__ import annotations
+
+import operator
+from typing import Callable, NamedTuple
+
+from app.startup import lazy_import
+
+np = lazy_import("numpy")
+
+
+class Frame:
+    """Per-employee input rows with lazily built numpy columns."""
+
+    def __init__(self, rows: list[dict], defaults: dict | None = None):
+        self.rows = [{**(defaults or {}), **row} for row in rows]
+        self.n = len(self.rows)
+        self._columns: dict[str, np.ndarray] = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        column = self._columns.get(name)
+        if column is None:
+            column = np.array([row.get(name, 0) for row in self.rows])
+            self._columns[name] = column
+        return column
+
+
+Counts = dict[str, "np.ndarray"]
+
+
+class Cond:
+    """Vectorized predicate: ``mask(frame, counts)`` → bool array per employee."""
+
+    def __init__(self, fn: Callable[[Frame, Counts], np.ndarray]):
+        self._fn = fn
+
+    def mask(self, frame: Frame, counts: Counts) -> np.ndarray:
+        return np.asarray(self._fn(frame, counts), dtype=bool)
+
+    def __and__(self, other: Cond) -> Cond:
+        return Cond(lambda f, c: self.mask(f, c) & other.mask(f, c))
+
+    def __or__(self, other: Cond) -> Cond:
+        return Cond(lambda f, c: self.mask(f, c) | other.mask(f, c))
+
+
+class _Operand:
+    """Something comparable: a frame column or a running section count."""
+
+    def __init__(self, get: Callable[[Frame, Counts], np.ndarray]):
+        self._get = get
+
+    def _compare(self, op, value) -> Cond:
+        return Cond(lambda f, c: op(self._get(f, c), value))
+
+    def __ge__(self, value): return self._compare(operator.ge, value)
+    def __gt__(self, value): return self._compare(operator.gt, value)
+    def __le__(self, value): return self._compare(operator.le, value)
+    def __lt__(self, value): return self._compare(operator.lt, value)
+    def __eq__(self, value): return self._compare(operator.eq, value)  # type: ignore[override]
+    def __ne__(self, value): return self._compare(operator.ne, value)  # type: ignore[override]
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def col(name: str) -> _Operand:
+    """An input column (missing values read as 0)."""
+    return _Operand(lambda f, c: f[name])
+
+
+def count(section: str) -> _Operand:
+    """Lines emitted into `section` by the rules before this one."""
+    return _Operand(lambda f, c: c[section])
+
+
+ALWAYS = Cond(lambda f, c: np.ones(f.n, dtype=bool))
+
+
+class Rule(NamedTuple):
+    """When `when` holds, append each ``(section, template)`` line in order."""
+    when: Cond
+    emits: tuple[tuple[str, str], ...]
+
+
+def rule(when: Cond, *emits: tuple[str, str]) -> Rule:
+    return Rule(when, emits)
+
+
+def evaluate(rules: tuple[Rule, ...], frame: Frame) -> list[dict[str, list[str]]]:
+    """Run a rule table over every row; returns each row's lines per section.
+
+    Templates are ``str.format`` strings over the row's values.
+    """
+    sections = {section for r in rules for section, _ in r.emits}
+    counts: Counts = {section: np.zeros(frame.n, dtype=int) for section in sections}
+    out: list[dict[str, list[str]]] = [{section: [] for section in sections} for _ in range(frame.n)]
+    for r in rules:
+        fired = r.when.mask(frame, counts)
+        for section, _ in r.emits:
+            counts[section] = counts[section] + fired
+        for i in np.flatnonzero(fired):
+            row = frame.rows[i]
+            for section, template in r.emits:
+                out[i][section].append(template.format_map(row))
+    return out
@@ -0,0 +1,74 @@
+"""Precomputed `GET /employees/{id}/insights` responses.
+
+Building insights takes the 8-week signal history, stored scores, a cohort
+count, skills and the recommendation / hidden-talent / burnout rules. The
+result only changes when sync writes a new week, so sync renders it once
+per employee and stores the response body in `insights_snapshots`; the
+endpoint then returns the stored bytes as-is, with the body digest as its
+ETag, and builds live only for employees without a snapshot.
+
+One snapshot is kept per employee (the latest week – the one the endpoint
+serves). Erasure drops it before the purge worker runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Employee, InsightsSnapshot
+from app.schemas import EmployeeInsights
+from app.services.insights import get_employee_insights
+
+
+def render(insights: EmployeeInsights) -> tuple[bytes, str]:
+    """``(response body, version)`` for an insights payload."""
+    body = insights.model_dump_json().encode()
+    return body, hashlib.sha256(body).hexdigest()[:32]
+
+
+async def load_snapshot(db: AsyncSession, employee_id: uuid.UUID) -> InsightsSnapshot | None:
+    result = await db.execute(select(InsightsSnapshot).where(InsightsSnapshot.employee_id == employee_id))
+    return result.scalar()
+
+
+async def load_snapshots(db: AsyncSession, employee_ids: list[uuid.UUID]) -> dict[uuid.UUID, InsightsSnapshot]:
+    result = await db.execute(select(InsightsSnapshot).where(InsightsSnapshot.employee_id.in_(employee_ids)))
+    return {s.employee_id: s for s in result.scalars()}
+
+
+async def save_snapshot(db: AsyncSession, employee_id: uuid.UUID) -> InsightsSnapshot | None:
+    """Render and upsert an employee's snapshot (caller commits); None without signals."""
+    insights = await get_employee_insights(db, employee_id)
+    if not insights.signals:
+        return None
+    body, version = render(insights)
+    week_start = insights.signals[0].week_start
+    snapshot = await load_snapshot(db, employee_id)
+    if snapshot is None:
+        snapshot = InsightsSnapshot(employee_id=employee_id, week_start=week_start, version=version, body=body)
+        db.add(snapshot)
+    elif snapshot.version != version:
+        snapshot.week_start, snapshot.version, snapshot.body = week_start, version, body
+        snapshot.created_at = datetime.utcnow()
+    return snapshot
+
+
+async def refresh_snapshots(db: AsyncSession) -> int:
+    """Re-render every active employee's snapshot; returns how many are stored."""
+    result = await db.execute(select(Employee.id).where(Employee.is_active))
+    stored = 0
+    for employee_id in result.scalars().all():
+        if await save_snapshot(db, employee_id) is not None:
+            stored += 1
+    await db.commit()
+    return stored
+
+
+async def drop_snapshot(db: AsyncSession, employee_id: uuid.UUID) -> None:
+    """Forget an employee's snapshot (caller commits)."""
+    await db.execute(delete(InsightsSnapshot).where(InsightsSnapshot.employee_id == employee_id))
@@ -0,0 +1,255 @@
+"""Calendar metadata → weekly engagement signals.
+
+Turns raw `GraphClient.CALENDAR_SELECT` events (start, end, attendees,
+responseStatus, showAs) into the WeeklySignal engagement columns:
+meeting_hours, meeting_count, avg_meeting_length_min, focus_blocks,
+fragmentation_score and after_hours_events.
+
+Overlapping meetings are merged with a sort-and-sweep pass so double-booked
+time is only counted once. Focus blocks are the ≥2h gaps left inside working
+hours once meetings and non-working time are swept together.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import Iterable
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.signals.compute import compute_fragmentation
+from app.startup import lazy_import
+
+np = lazy_import("numpy")
+
+FOCUS_BLOCK_MIN_HOURS = 2.0
+MAX_MEETING_HOURS = 12.0  # longer "meetings" are blockers, not meetings
+WORKDAYS = 5  # Mon-Fri
+
+# showAs values that do not occupy the person's time
+_NOT_BUSY = {"free", "oof", "workingelsewhere"}
+
+
+# ── Time helpers ────────────────────────────────────────────────────
+
+def get_zone(name: str) -> ZoneInfo:
+    """Resolve an IANA zone name, falling back to UTC for unknown names."""
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def parse_graph_datetime(value: dict | str | None) -> datetime | None:
+    """Parse a Graph `dateTimeTimeZone` (or plain ISO string) to aware UTC.
+
+    Graph returns e.g. ``{"dateTime": "2026-02-02T14:00:00.0000000", "timeZone": "UTC"}``.
+    """
+    if not value:
+        return None
+    if isinstance(value, dict):
+        raw, tz_name = value.get("dateTime"), value.get("timeZone", "UTC")
+    else:
+        raw, tz_name = value, "UTC"
+    if not raw:
+        return None
+    try:
+        dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=get_zone(tz_name))
+    return dt.astimezone(dt_timezone.utc)
+
+
+def week_bounds(week_start: date, tz_name: str) -> tuple[datetime, datetime]:
+    """UTC [start, end) of the local week beginning on `week_start`."""
+    tz = get_zone(tz_name)
+    start = datetime.combine(week_start, time.min, tzinfo=tz)
+    end = datetime.combine(week_start + timedelta(days=7), time.min, tzinfo=tz)
+    return start.astimezone(dt_timezone.utc), end.astimezone(dt_timezone.utc)
+
+
+def working_windows(
+    week_start: date,
+    start_hour: int,
+    end_hour: int,
+    tz_name: str,
+) -> np.ndarray:
+    """Working-hour windows for Mon-Fri of the week as UTC epoch seconds.
+
+    Returns a (5, 2) array of [window_start, window_end). Each day is resolved
+    through the zone separately, so DST transitions mid-week are honoured.
+    """
+    tz = get_zone(tz_name)
+    rows = []
+    for d in range(WORKDAYS):
+        day = week_start + timedelta(days=d)
+        ws = datetime.combine(day, time(hour=start_hour), tzinfo=tz)
+        we = datetime.combine(day, time(hour=end_hour % 24), tzinfo=tz)
+        if end_hour >= 24 or end_hour <= start_hour:
+            we += timedelta(days=1)
+        rows.append((ws.timestamp(), we.timestamp()))
+    return np.array(rows, dtype=float)
+
+
+def outside_windows(times: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """Boolean mask of timestamps falling outside every working window."""
+    if times.size == 0:
+        return np.zeros(0, dtype=bool)
+    idx = np.searchsorted(windows[:, 0], times, side="right") - 1
+    valid = idx >= 0
+    inside = np.zeros(times.shape, dtype=bool)
+    inside[valid] = times[valid] < windows[idx[valid], 1]
+    return ~inside
+
+
+# ── Interval math ───────────────────────────────────────────────────
+
+def merge_intervals(starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Merge overlapping/touching [start, end) intervals with one sort-and-sweep.
+
+    A new block begins wherever an interval starts after the running maximum
+    end of everything before it.
+    """
+    if starts.size == 0:
+        return starts.copy(), ends.copy()
+    order = np.argsort(starts, kind="stable")
+    s, e = starts[order], ends[order]
+    running_end = np.maximum.accumulate(e)
+    new_block = np.empty(s.size, dtype=bool)
+    new_block[0] = True
+    new_block[1:] = s[1:] > running_end[:-1]
+    heads = np.flatnonzero(new_block)
+    return s[heads], np.maximum.reduceat(e, heads)
+
+
+def count_focus_blocks(
+    busy_starts: np.ndarray,
+    busy_ends: np.ndarray,
+    windows: np.ndarray,
+    min_hours: float = FOCUS_BLOCK_MIN_HOURS,
+) -> int:
+    """Count uninterrupted gaps of ≥ `min_hours` inside the working windows.
+
+    Non-working time is treated as busy and swept together with the meetings;
+    whatever free gaps remain lie entirely inside working hours.
+    """
+    if windows.size == 0:
+        return 0
+    off_starts = np.concatenate(([-np.inf], windows[:, 1]))
+    off_ends = np.concatenate((windows[:, 0], [np.inf]))
+    s, e = merge_intervals(
+        np.concatenate((busy_starts, off_starts)),
+        np.concatenate((busy_ends, off_ends)),
+    )
+    gaps = s[1:] - e[:-1]
+    return int(np.count_nonzero(gaps >= min_hours * 3600))
+
+
+# ── Aggregator ──────────────────────────────────────────────────────
+
+class CalendarAggregator:
+    """Streaming per-employee, per-week calendar aggregator.
+
+    Feed events page by page with `add` / `extend`; only two float64
+    columns are buffered per meeting. `finalize` computes every signal in
+    vectorized passes over the week.
+    """
+
+    def __init__(
+        self,
+        week_start: date,
+        working_hours_start: int = 9,
+        working_hours_end: int = 18,
+        timezone: str = "UTC",
+    ):
+        self.week_start = week_start
+        self.windows = working_windows(week_start, working_hours_start, working_hours_end, timezone)
+        lo, hi = week_bounds(week_start, timezone)
+        self._lo, self._hi = lo.timestamp(), hi.timestamp()
+        self._starts = array("d")
+        self._ends = array("d")
+        self.skipped = 0
+
+    def add(self, event: dict) -> None:
+        """Buffer one calendar event if it occupies the person's time."""
+        if str(event.get("showAs", "busy")).lower() in _NOT_BUSY:
+            self.skipped += 1
+            return
+        if (event.get("responseStatus") or {}).get("response") == "declined":
+            self.skipped += 1
+            return
+        if "attendees" in event and not event["attendees"]:
+            self.skipped += 1  # solo blocker (e.g. focus time), not a meeting
+            return
+
+        start = parse_graph_datetime(event.get("start"))
+        end = parse_graph_datetime(event.get("end"))
+        if start is None or end is None:
+            self.skipped += 1
+            return
+        s, e = start.timestamp(), end.timestamp()
+        if e <= s or (e - s) > MAX_MEETING_HOURS * 3600 or e <= self._lo or s >= self._hi:
+            self.skipped += 1
+            return
+
+        self._starts.append(max(s, self._lo))
+        self._ends.append(min(e, self._hi))
+
+    def extend(self, events: Iterable[dict]) -> None:
+        for event in events:
+            self.add(event)
+
+    def add_intervals(self, starts: np.ndarray, ends: np.ndarray) -> None:
+        """Buffer already-filtered busy meetings given as UTC epoch seconds.
+
+        Applies the same length / week-window checks as `add`; used when
+        re-aggregating from the metadata spool.
+        """
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        keep = (
+            (ends > starts)
+            & (ends - starts <= MAX_MEETING_HOURS * 3600)
+            & (ends > self._lo)
+            & (starts < self._hi)
+        )
+        self.skipped += int(keep.size - np.count_nonzero(keep))
+        self._starts.extend(np.maximum(starts[keep], self._lo).tolist())
+        self._ends.extend(np.minimum(ends[keep], self._hi).tolist())
+
+    def finalize(self) -> dict:
+        """Compute the WeeklySignal engagement columns for the buffered week."""
+        starts = np.frombuffer(self._starts, dtype=float)
+        ends = np.frombuffer(self._ends, dtype=float)
+
+        meeting_count = int(starts.size)
+        durations = ends - starts
+        busy_s, busy_e = merge_intervals(starts, ends)
+        meeting_hours = round(float(np.sum(busy_e - busy_s)) / 3600, 1)
+        avg_len = round(float(np.mean(durations)) / 60, 1) if meeting_count else 0.0
+        focus_blocks = count_focus_blocks(busy_s, busy_e, self.windows)
+        after_hours = int(np.count_nonzero(outside_windows(starts, self.windows)))
+
+        return {
+            "meeting_hours": meeting_hours,
+            "meeting_count": meeting_count,
+            "avg_meeting_length_min": avg_len,
+            "focus_blocks": focus_blocks,
+            "fragmentation_score": compute_fragmentation(meeting_count, meeting_hours, focus_blocks),
+            "after_hours_events": after_hours,
+        }
+
+
+def aggregate_calendar_week(
+    events: Iterable[dict],
+    week_start: date,
+    working_hours_start: int = 9,
+    working_hours_end: int = 18,
+    timezone: str = "UTC",
+) -> dict:
+    """One-shot convenience wrapper around `CalendarAggregator`."""
+    agg = CalendarAggregator(week_start, working_hours_start, working_hours_end, timezone)
+    agg.extend(events)
+    return agg.finalize()
@@ -5,7 +5,9 @@ from __future__ import annotations
 from datetime import date
 from typing import Sequence
 
-import numpy as np
+from app.startup import lazy_import
+
+np = lazy_import("numpy")
 
 
 def compute_trend(values: Sequence[float]) -> dict:
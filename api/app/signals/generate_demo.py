@@ -11,7 +11,9 @@ import uuid
 from datetime import date, timedelta
 from typing import NamedTuple
 
-import numpy as np
+from app.startup import lazy_import
+
+np = lazy_import("numpy")
 
 
 class DemoEmployee(NamedTuple):
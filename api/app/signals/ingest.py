@@ -0,0 +1,252 @@
+"""Microsoft Graph ingestion – metadata → WeeklySignal rows.
+
+Used by `/sync/run` when demo mode is off and Graph ingestion is enabled.
+Only fields in `GraphClient.*_SELECT` are ever fetched. Fetched metadata is
+also written to the raw spool (`app.signals.spool`), from which
+`reaggregate_week` rebuilds a week without calling Graph again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, timedelta
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.graph_client import GraphClient
+from app.models import AppSettings, CollaborationBottleneck, Employee, EmployeeScore, WeeklySignal
+from app.signals.calendar import CalendarAggregator, week_bounds
+from app.signals.collaboration import CollaborationGraphBuilder, compute_collaboration_metrics
+from app.signals.mail import MailAggregator
+from app.signals.spool import INBOUND, SENT, SHOW_AS_CODES, SpoolWriter, load_week, purge_expired
+from app.startup import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+FETCH_CONCURRENCY = 8
+
+
+def last_complete_week(today: date | None = None) -> date:
+    """Monday of the most recent fully elapsed week."""
+    today = today or date.today()
+    return today - timedelta(days=today.weekday(), weeks=1)
+
+
+def _iso(dt) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+async def get_working_hours(db: AsyncSession) -> tuple[int, int, str]:
+    """Working hours + timezone, preferring the admin-edited AppSettings row."""
+    result = await db.execute(select(AppSettings).where(AppSettings.id == 1))
+    row = result.scalar()
+    if row:
+        return row.working_hours_start, row.working_hours_end, row.timezone
+    s = get_settings()
+    return s.working_hours_start, s.working_hours_end, s.timezone
+
+
+async def get_retention_days(db: AsyncSession) -> int:
+    """Retention window, preferring the admin-edited AppSettings row."""
+    result = await db.execute(select(AppSettings.data_retention_days).where(AppSettings.id == 1))
+    days = result.scalar()
+    return days if days is not None else get_settings().data_retention_days
+
+
+async def upsert_weekly_signals(
+    db: AsyncSession,
+    week_start: date,
+    values_by_employee: dict,
+    source: str = "graph",
+) -> int:
+    """Write ingested columns onto each employee's row for the week.
+
+    Existing rows are looked up with one query for the whole week rather than
+    one per employee. Returns the number of rows created.
+    """
+    result = await db.execute(select(WeeklySignal).where(WeeklySignal.week_start == week_start))
+    existing = {row.employee_id: row for row in result.scalars()}
+    created = 0
+    for employee_id, values in values_by_employee.items():
+        row = existing.get(employee_id)
+        if row is None:
+            row = WeeklySignal(employee_id=employee_id, week_start=week_start)
+            db.add(row)
+            created += 1
+        for key, value in values.items():
+            setattr(row, key, value)
+        row.source = source
+    return created
+
+
+def _week_values(cal: CalendarAggregator, mail: MailAggregator) -> dict:
+    """Merge calendar and mail aggregates into WeeklySignal columns."""
+    values = cal.finalize()
+    mail_stats = mail.finalize()
+    values["response_time_bucket"] = mail_stats["response_time_bucket"]
+    values["after_hours_events"] += mail_stats["after_hours_sent"]
+    return values
+
+
+async def _store_week(
+    db: AsyncSession,
+    employees: list[Employee],
+    week_start: date,
+    aggregates: list[dict | None],
+    graph_builder: CollaborationGraphBuilder,
+    team_ids: list[int],
+) -> dict:
+    """Attach collaboration metrics, upsert WeeklySignal rows and replace the
+    week's bottlenecks. Returns the ingestion counts."""
+    collab = compute_collaboration_metrics(graph_builder.build(), team_ids)
+
+    rows = {}
+    for i, (emp, values) in enumerate(zip(employees, aggregates)):
+        if values is None:
+            continue
+        values["unique_collaborators"] = int(collab["unique_collaborators"][i])
+        values["cross_team_ratio"] = float(collab["cross_team_ratio"][i])
+        rows[emp.id] = values
+    created = await upsert_weekly_signals(db, week_start, rows) if rows else 0
+
+    await db.execute(delete(CollaborationBottleneck).where(CollaborationBottleneck.week_start == week_start))
+    for i in collab["bottlenecks"]:
+        db.add(CollaborationBottleneck(
+            employee_id=employees[i].id,
+            week_start=week_start,
+            betweenness=round(float(collab["betweenness"][i]), 4),
+            unique_collaborators=int(collab["unique_collaborators"][i]),
+            cross_team_ratio=float(collab["cross_team_ratio"][i]),
+        ))
+
+    await db.commit()
+    return {"employees_processed": len(rows), "weeks_generated": created, "failed": len(employees) - len(rows)}
+
+
+async def _active_org(db: AsyncSession) -> tuple[list[Employee], dict[str, int], list[int]]:
+    """Active employees with their graph node index and dense team ids."""
+    result = await db.execute(select(Employee).where(Employee.is_active))
+    employees = list(result.scalars().all())
+    email_index = {emp.email: i for i, emp in enumerate(employees)}
+    team_index: dict = {}
+    team_ids = [team_index.setdefault(emp.team_id, len(team_index)) for emp in employees]
+    return employees, email_index, team_ids
+
+
+async def ingest_graph_week(
+    db: AsyncSession,
+    week_start: date | None = None,
+    client: GraphClient | None = None,
+) -> dict:
+    """Fetch one week of calendar and mail metadata for every active employee
+    and aggregate it into WeeklySignal rows, plus the org collaboration graph.
+
+    Returns counts: employees_processed, weeks_generated (rows created), failed.
+    """
+    week_start = week_start or last_complete_week()
+    if client is None:
+        client = GraphClient()
+        try:
+            return await ingest_graph_week(db, week_start, client)
+        finally:
+            await client.aclose()
+
+    cfg = get_settings()
+    wh_start, wh_end, tz = await get_working_hours(db)
+    lo, hi = week_bounds(week_start, tz)
+
+    employees, email_index, team_ids = await _active_org(db)
+    graph_builder = CollaborationGraphBuilder(email_index)
+    spool = SpoolWriter(cfg.metadata_spool_dir, week_start) if cfg.metadata_spool_dir else None
+
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def _fetch(emp: Employee) -> dict | None:
+        async with sem:
+            try:
+                events = await client.get_calendar_events(emp.email, _iso(lo), _iso(hi))
+                inbound = await client.get_mail_metadata(emp.email, _iso(lo), _iso(hi))
+                sent = await client.get_sent_mail_metadata(emp.email, _iso(lo), _iso(hi))
+            except Exception as e:
+                logger.warning("Graph fetch failed for %s: %s", emp.email, e)
+                return None
+        if spool is not None:
+            spool.add(emp.email, events, inbound, sent)
+        cal = CalendarAggregator(week_start, wh_start, wh_end, tz)
+        cal.extend(events)
+        graph_builder.extend(events)
+        mail = MailAggregator(week_start, wh_start, wh_end, tz)
+        mail.add_inbound(inbound)
+        mail.add_outbound(sent)
+        return _week_values(cal, mail)
+
+    aggregates = await asyncio.gather(*(_fetch(emp) for emp in employees))
+    if spool is not None:
+        spool.flush()
+        purged = purge_expired(cfg.metadata_spool_dir, await get_retention_days(db))
+        if purged:
+            logger.info("Purged %d spooled week(s) past retention", len(purged))
+    return await _store_week(db, employees, week_start, aggregates, graph_builder, team_ids)
+
+
+async def reaggregate_week(db: AsyncSession, week_start: date) -> dict:
+    """Rebuild one week's WeeklySignal rows and bottlenecks from the spool.
+
+    Uses the current working hours and timezone. Scores for the week are
+    dropped so the next `/sync/run` recomputes them from the rebuilt signals.
+    Employees with nothing spooled for the week are counted as failed.
+    """
+    cfg = get_settings()
+    week = load_week(cfg.metadata_spool_dir, week_start) if cfg.metadata_spool_dir else None
+    if week is None:
+        return {"employees_processed": 0, "weeks_generated": 0, "failed": 0}
+
+    wh_start, wh_end, tz = await get_working_hours(db)
+    employees, email_index, team_ids = await _active_org(db)
+    node = {e.lower(): i for e, i in email_index.items()}
+
+    # Collaboration graph over every spooled event (the builder de-duplicates)
+    graph_builder = CollaborationGraphBuilder(email_index)
+    people_node = np.array([node.get(p, -1) for p in week.people.tolist()], dtype=np.int64)
+    collab_events = np.flatnonzero(week.cal_show_as != SHOW_AS_CODES.index("free"))
+    for k in collab_events.tolist():
+        members = people_node[week.attendees(k)].tolist()
+        if week.cal_organizer[k] >= 0:
+            members.append(int(people_node[week.cal_organizer[k]]))
+        graph_builder.add_meeting(
+            float(week.cal_start[k]), float(week.cal_end[k]), (m for m in members if m >= 0),
+        )
+
+    # Per-employee rows: sort once, then slice by owner
+    busy = week.busy_mask()
+    cal_order = np.argsort(week.cal_owner, kind="stable")
+    cal_bounds = np.searchsorted(week.cal_owner[cal_order], np.arange(week.roster.size + 1))
+    mail_order = np.argsort(week.mail_owner, kind="stable")
+    mail_bounds = np.searchsorted(week.mail_owner[mail_order], np.arange(week.roster.size + 1))
+    roster = {email: i for i, email in enumerate(week.roster.tolist())}
+
+    aggregates: list[dict | None] = []
+    for emp in employees:
+        r = roster.get(emp.email.lower())
+        if r is None:
+            aggregates.append(None)
+            continue
+        ev = cal_order[cal_bounds[r]:cal_bounds[r + 1]]
+        ev = ev[busy[ev]]
+        cal = CalendarAggregator(week_start, wh_start, wh_end, tz)
+        cal.add_intervals(week.cal_start[ev], week.cal_end[ev])
+
+        msg = mail_order[mail_bounds[r]:mail_bounds[r + 1]]
+        direction = week.mail_direction[msg]
+        mail = MailAggregator(week_start, wh_start, wh_end, tz)
+        mail.add_inbound_times(week.mail_ts[msg[direction == INBOUND]])
+        mail.add_outbound_times(week.mail_ts[msg[direction == SENT]])
+        aggregates.append(_week_values(cal, mail))
+
+    await db.execute(delete(EmployeeScore).where(EmployeeScore.week_start == week_start))
+    return await _store_week(db, employees, week_start, aggregates, graph_builder, team_ids)
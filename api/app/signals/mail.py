@@ -0,0 +1,146 @@
+"""Mail metadata → responsiveness signals.
+
+Pairs inbound (`receivedDateTime`) and outbound (`sentDateTime`) timestamps
+without thread ids: each sent message is taken as the reply to the latest
+unanswered inbound message within `REPLY_WINDOW_HOURS`, which it then
+consumes – a message is answered at most once. Latency is measured
+in *working* minutes, so a 17:55 email answered at 09:05 counts as a fast
+reply, not an overnight one.
+
+Timestamps are binned onto a per-minute grid of the week, so an aggregator
+holds a fixed ~120 KB regardless of how many messages stream through it.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable
+
+from app.signals.calendar import week_bounds, working_windows
+from app.startup import lazy_import
+
+np = lazy_import("numpy")
+
+MINUTES_PER_WEEK = 7 * 24 * 60
+REPLY_WINDOW_HOURS = 48
+FAST_REPLY_MINUTES = 60      # median ≤ 1 working hour
+SLOW_REPLY_MINUTES = 240     # median > 4 working hours
+
+
+def to_epoch_seconds(timestamps: Iterable[str | None]) -> np.ndarray:
+    """Vectorized parse of Graph UTC timestamps ("2026-02-02T14:03:11Z")."""
+    cleaned = [t[:19] for t in timestamps if t]
+    if not cleaned:
+        return np.zeros(0, dtype=np.int64)
+    return np.array(cleaned, dtype="datetime64[s]").astype(np.int64)
+
+
+class MailAggregator:
+    """Streaming per-employee, per-week mail aggregator with bounded memory."""
+
+    def __init__(
+        self,
+        week_start: date,
+        working_hours_start: int = 9,
+        working_hours_end: int = 18,
+        timezone: str = "UTC",
+    ):
+        self.week_start = week_start
+        lo, _ = week_bounds(week_start, timezone)
+        self._lo = int(lo.timestamp())
+        self._inbound = np.zeros(MINUTES_PER_WEEK, dtype=np.uint32)
+        self._outbound = np.zeros(MINUTES_PER_WEEK, dtype=np.uint32)
+
+        self._working = np.zeros(MINUTES_PER_WEEK, dtype=bool)
+        for ws, we in working_windows(week_start, working_hours_start, working_hours_end, timezone):
+            a = max(0, int(ws - self._lo) // 60)
+            b = min(MINUTES_PER_WEEK, int(we - self._lo) // 60)
+            self._working[a:b] = True
+
+    def _bin(self, seconds: np.ndarray) -> np.ndarray:
+        minutes = (seconds - self._lo) // 60
+        minutes = minutes[(minutes >= 0) & (minutes < MINUTES_PER_WEEK)]
+        return np.bincount(minutes, minlength=MINUTES_PER_WEEK).astype(np.uint32)
+
+    def add_inbound(self, messages: Iterable[dict]) -> None:
+        """Add a page of inbox metadata (uses `receivedDateTime`)."""
+        self.add_inbound_times(to_epoch_seconds(m.get("receivedDateTime") for m in messages))
+
+    def add_outbound(self, messages: Iterable[dict]) -> None:
+        """Add a page of sent-items metadata (uses `sentDateTime`)."""
+        self.add_outbound_times(to_epoch_seconds(m.get("sentDateTime") for m in messages))
+
+    def add_inbound_times(self, seconds: np.ndarray) -> None:
+        """Add inbound messages given as UTC epoch seconds."""
+        self._inbound += self._bin(np.asarray(seconds, dtype=np.int64))
+
+    def add_outbound_times(self, seconds: np.ndarray) -> None:
+        """Add sent messages given as UTC epoch seconds."""
+        self._outbound += self._bin(np.asarray(seconds, dtype=np.int64))
+
+    def reply_latencies(self) -> np.ndarray:
+        """Working-minute latency of every paired (inbound, reply) in the week.
+
+        Walks the occupied minutes in time order (inbound before sends within
+        a minute) with a stack of unanswered inbound messages: each send
+        answers the latest one still unanswered and consumes it, so a second
+        send after the same message answers the one before, or nothing.
+        Messages unanswered for `REPLY_WINDOW_HOURS` drop off the stack.
+        """
+        in_min = np.flatnonzero(self._inbound)
+        out_min = np.flatnonzero(self._outbound)
+        if in_min.size == 0 or out_min.size == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        minutes = np.concatenate((in_min, out_min))
+        sends = np.concatenate((np.zeros(in_min.size, dtype=bool), np.ones(out_min.size, dtype=bool)))
+        order = np.lexsort((sends, minutes))
+        window = REPLY_WINDOW_HOURS * 60
+        pending: list[list[int]] = []  # [minute, unanswered messages], latest last
+        asked, answered = [], []
+        for minute, is_send in zip(minutes[order].tolist(), sends[order].tolist()):
+            if not is_send:
+                pending.append([minute, int(self._inbound[minute])])
+                continue
+            replies = int(self._outbound[minute])
+            while replies and pending:
+                latest = pending[-1]
+                if minute - latest[0] > window:
+                    pending.clear()  # everything older is past the window too
+                    break
+                asked.append(latest[0])
+                answered.append(minute)
+                replies -= 1
+                latest[1] -= 1
+                if not latest[1]:
+                    pending.pop()
+
+        cum_working = np.cumsum(self._working, dtype=np.int64)
+        return cum_working[np.array(answered, dtype=np.int64)] - cum_working[np.array(asked, dtype=np.int64)]
+
+    def finalize(self) -> dict:
+        """Response-time bucket, latency distribution and after-hours sends."""
+        latencies = self.reply_latencies()
+        if latencies.size:
+            p50, p90 = (float(v) for v in np.percentile(latencies, [50, 90]))
+        else:
+            p50 = p90 = 0.0
+
+        if not latencies.size:
+            bucket = "normal"
+        elif p50 <= FAST_REPLY_MINUTES:
+            bucket = "fast"
+        elif p50 <= SLOW_REPLY_MINUTES:
+            bucket = "normal"
+        else:
+            bucket = "slow"
+
+        return {
+            "response_time_bucket": bucket,
+            "after_hours_sent": int(self._outbound[~self._working].sum()),
+            "inbound_count": int(self._inbound.sum()),
+            "outbound_count": int(self._outbound.sum()),
+            "replies_paired": int(latencies.size),
+            "reply_latency_p50_min": round(p50, 1),
+            "reply_latency_p90_min": round(p90, 1),
+        }
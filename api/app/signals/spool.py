@@ -0,0 +1,428 @@
+"""Raw metadata spool – compressed, append-only, per-week columnar files.
+
+Graph ingestion writes the metadata it fetched here before aggregating, so
+WeeklySignal rows can be rebuilt from local disk (after an aggregation or
+working-hours change) without re-fetching a week from Microsoft 365.
+
+Layout::
+
+    {metadata_spool_dir}/2026-02-02/segment-<run>-<seq>.npz
+
+Each segment is one ``np.savez_compressed`` archive of flat columns (see
+`SpoolWriter`). Only what the aggregators consume from the
+`GraphClient.*_SELECT` fields is kept: event start/end, showAs and response
+codes and participant addresses; mail is reduced to timestamps and
+direction. Re-ingesting a week appends a newer run rather than rewriting
+files, and readers take each employee's rows from the newest run that
+covered them. Week directories older than the retention window (the
+AppSettings override, else `data_retention_days`) are removed by
+`purge_expired`.
+
+    python -m app.signals.spool reaggregate --week 2026-02-02
+    python -m app.signals.spool purge
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+from app.signals.calendar import parse_graph_datetime
+from app.signals.mail import to_epoch_seconds
+from app.startup import lazy_import
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+np = lazy_import("numpy")
+
+FLUSH_ROWS = 50_000  # events + messages buffered before a segment is written
+
+SHOW_AS_CODES = ("busy", "tentative", "free", "oof", "workingelsewhere")
+RESPONSE_CODES = ("none", "organizer", "tentativelyaccepted", "accepted", "declined", "notresponded")
+_SHOW_AS = {name: i for i, name in enumerate(SHOW_AS_CODES)}
+_RESPONSE = {name: i for i, name in enumerate(RESPONSE_CODES)}
+
+INBOUND, SENT = 0, 1
+
+_EVENT_COLUMNS = (
+    "cal_owner", "cal_start", "cal_end", "cal_show_as", "cal_response", "cal_solo", "cal_organizer",
+)
+_ATTENDEE_COLUMNS = ("cal_att_ptr", "cal_att", "cal_att_declined")
+_MAIL_COLUMNS = ("mail_owner", "mail_ts", "mail_direction")
+_COLUMNS = _EVENT_COLUMNS + _ATTENDEE_COLUMNS + _MAIL_COLUMNS
+
+
+def week_dir(root: str | Path, week_start: date) -> Path:
+    return Path(root) / week_start.isoformat()
+
+
+def _code(table: dict[str, int], value, default: str) -> int:
+    """Small-int code for a Graph enum; unknown values take the default."""
+    return table.get(str(value or default).lower(), table[default])
+
+
+def _write_segment(path: Path, columns: dict[str, np.ndarray]) -> None:
+    """Write atomically so a reader never sees a half-written segment."""
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as fh:
+        np.savez_compressed(fh, **columns)
+    os.replace(tmp, path)
+
+
+# ── Writer ──────────────────────────────────────────────────────────
+
+class SpoolWriter:
+    """Buffers one ingestion run's metadata for a week and writes segments.
+
+    Columns per segment:
+
+    - ``roster``                      employee addresses covered by the segment
+    - ``people``                      participant address table
+    - ``cal_owner``                   roster index of the calendar's owner
+    - ``cal_start`` / ``cal_end``     UTC epoch seconds
+    - ``cal_show_as`` / ``cal_response`` codes into SHOW_AS_CODES / RESPONSE_CODES
+    - ``cal_solo``                    attendees field present but empty
+    - ``cal_organizer``               people index (-1 when absent)
+    - ``cal_att_ptr`` / ``cal_att`` / ``cal_att_declined``
+                                      CSR-style attendee lists (people indices)
+    - ``mail_owner`` / ``mail_ts`` / ``mail_direction``
+                                      one row per message (INBOUND / SENT)
+
+    An employee's rows always land in a single segment, so a segment's roster
+    is exactly the set of employees it holds complete data for.
+    """
+
+    def __init__(self, root: str | Path, week_start: date, run: int | None = None, flush_rows: int = FLUSH_ROWS):
+        self.dir = week_dir(root, week_start)
+        self.run = run or time.time_ns()
+        self.flush_rows = flush_rows
+        self.segments: list[Path] = []
+        self._reset()
+
+    def _reset(self) -> None:
+        self._roster: list[str] = []
+        self._people: dict[str, int] = {}
+        self._cal_owner = array("i")
+        self._cal_start = array("d")
+        self._cal_end = array("d")
+        self._cal_show_as = array("B")
+        self._cal_response = array("B")
+        self._cal_solo = array("B")
+        self._cal_organizer = array("i")
+        self._cal_att_ptr = array("q", [0])
+        self._cal_att = array("i")
+        self._cal_att_declined = array("B")
+        self._mail_owner = array("i")
+        self._mail_ts = array("q")
+        self._mail_direction = array("B")
+
+    def _person(self, address: str | None) -> int:
+        if not address:
+            return -1
+        return self._people.setdefault(address.lower(), len(self._people))
+
+    @property
+    def buffered_rows(self) -> int:
+        return len(self._cal_start) + len(self._mail_ts)
+
+    def add(self, email: str, events: Iterable[dict], inbound: Iterable[dict], sent: Iterable[dict]) -> None:
+        """Spool one employee's fetched week."""
+        owner = len(self._roster)
+        self._roster.append(email.lower())
+
+        for event in events:
+            start = parse_graph_datetime(event.get("start"))
+            end = parse_graph_datetime(event.get("end"))
+            if start is None or end is None:
+                continue
+            attendees = event.get("attendees")
+            self._cal_owner.append(owner)
+            self._cal_start.append(start.timestamp())
+            self._cal_end.append(end.timestamp())
+            self._cal_show_as.append(_code(_SHOW_AS, event.get("showAs"), "busy"))
+            self._cal_response.append(_code(_RESPONSE, (event.get("responseStatus") or {}).get("response"), "none"))
+            self._cal_solo.append(attendees is not None and not attendees)
+            organizer = (event.get("organizer") or {}).get("emailAddress", {}).get("address")
+            self._cal_organizer.append(self._person(organizer))
+            for att in attendees or []:
+                idx = self._person((att.get("emailAddress") or {}).get("address"))
+                if idx < 0:
+                    continue
+                self._cal_att.append(idx)
+                self._cal_att_declined.append((att.get("status") or {}).get("response") == "declined")
+            self._cal_att_ptr.append(len(self._cal_att))
+
+        for direction, times in (
+            (INBOUND, to_epoch_seconds(m.get("receivedDateTime") for m in inbound)),
+            (SENT, to_epoch_seconds(m.get("sentDateTime") for m in sent)),
+        ):
+            self._mail_owner.extend([owner] * times.size)
+            self._mail_ts.extend(times.tolist())
+            self._mail_direction.extend([direction] * times.size)
+
+        if self.buffered_rows >= self.flush_rows:
+            self.flush()
+
+    def flush(self) -> Path | None:
+        """Write buffered rows as a new segment (no-op when empty)."""
+        if not self._roster:
+            return None
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self.dir / f"segment-{self.run}-{len(self.segments):04d}.npz"
+        _write_segment(path, {
+            "run": np.array(self.run, dtype=np.int64),
+            "roster": np.array(self._roster, dtype=str),
+            "people": np.array(list(self._people), dtype=str),
+            "cal_owner": np.frombuffer(self._cal_owner, dtype=np.int32),
+            "cal_start": np.frombuffer(self._cal_start, dtype=float),
+            "cal_end": np.frombuffer(self._cal_end, dtype=float),
+            "cal_show_as": np.frombuffer(self._cal_show_as, dtype=np.uint8),
+            "cal_response": np.frombuffer(self._cal_response, dtype=np.uint8),
+            "cal_solo": np.frombuffer(self._cal_solo, dtype=np.uint8).astype(bool),
+            "cal_organizer": np.frombuffer(self._cal_organizer, dtype=np.int32),
+            "cal_att_ptr": np.frombuffer(self._cal_att_ptr, dtype=np.int64),
+            "cal_att": np.frombuffer(self._cal_att, dtype=np.int32),
+            "cal_att_declined": np.frombuffer(self._cal_att_declined, dtype=np.uint8).astype(bool),
+            "mail_owner": np.frombuffer(self._mail_owner, dtype=np.int32),
+            "mail_ts": np.frombuffer(self._mail_ts, dtype=np.int64),
+            "mail_direction": np.frombuffer(self._mail_direction, dtype=np.uint8),
+        })
+        self.segments.append(path)
+        self._reset()
+        return path
+
+
+# ── Reader ──────────────────────────────────────────────────────────
+
+@dataclass
+class WeekSpool:
+    """All spooled rows for one week, newest run per employee, one index space.
+
+    ``cal_owner`` / ``mail_owner`` index ``roster``; ``cal_organizer`` and
+    ``cal_att`` index ``people``.
+    """
+    roster: np.ndarray
+    people: np.ndarray
+    cal_owner: np.ndarray
+    cal_start: np.ndarray
+    cal_end: np.ndarray
+    cal_show_as: np.ndarray
+    cal_response: np.ndarray
+    cal_solo: np.ndarray
+    cal_organizer: np.ndarray
+    cal_att_ptr: np.ndarray
+    cal_att: np.ndarray
+    cal_att_declined: np.ndarray
+    mail_owner: np.ndarray
+    mail_ts: np.ndarray
+    mail_direction: np.ndarray
+
+    @property
+    def event_count(self) -> int:
+        return int(self.cal_start.size)
+
+    @property
+    def message_count(self) -> int:
+        return int(self.mail_ts.size)
+
+    def busy_mask(self) -> np.ndarray:
+        """Events `CalendarAggregator.add` would count as occupied time."""
+        not_busy = np.isin(self.cal_show_as, [_SHOW_AS[s] for s in ("free", "oof", "workingelsewhere")])
+        declined = self.cal_response == _RESPONSE["declined"]
+        return ~(not_busy | declined | self.cal_solo)
+
+    def attendees(self, event: int) -> np.ndarray:
+        """People indices of the non-declined attendees of one event."""
+        lo, hi = self.cal_att_ptr[event], self.cal_att_ptr[event + 1]
+        return self.cal_att[lo:hi][~self.cal_att_declined[lo:hi]]
+
+
+def segment_paths(root: str | Path, week_start: date) -> list[Path]:
+    return sorted(week_dir(root, week_start).glob("segment-*.npz"))
+
+
+def load_week(root: str | Path, week_start: date) -> WeekSpool | None:
+    """Concatenate every segment of a week, keeping each employee's newest run."""
+    paths = segment_paths(root, week_start)
+    if not paths:
+        return None
+    segments = []
+    for path in paths:
+        with np.load(path) as npz:
+            segments.append({k: npz[k] for k in npz.files})
+
+    # One global people table; per-segment lookup arrays into it
+    people, inverse = np.unique(np.concatenate([s["people"] for s in segments]), return_inverse=True)
+    people_maps = np.split(inverse, np.cumsum([s["people"].size for s in segments])[:-1])
+
+    roster = np.concatenate([s["roster"] for s in segments])
+    roster_run = np.concatenate([np.full(s["roster"].size, s["run"], dtype=np.int64) for s in segments])
+    roster_offsets = np.cumsum([0] + [s["roster"].size for s in segments])
+
+    # Newest run wins: sort by (address, run) and keep the last entry per address
+    order = np.lexsort((roster_run, roster))
+    last = np.ones(order.size, dtype=bool)
+    last[:-1] = roster[order][1:] != roster[order][:-1]
+    keep = np.zeros(roster.size, dtype=bool)
+    keep[order[last]] = True
+    remap = np.full(roster.size, -1, dtype=np.int64)
+    remap[keep] = np.arange(np.count_nonzero(keep))
+
+    cols: dict[str, list[np.ndarray]] = {k: [] for k in _COLUMNS}
+    att_base = 0
+    for seg, pmap, offset in zip(segments, people_maps, roster_offsets):
+        owner = remap[seg["cal_owner"].astype(np.int64) + offset]
+        ev = owner >= 0
+        counts = np.diff(seg["cal_att_ptr"])
+        att_keep = np.repeat(ev, counts)
+        cols["cal_owner"].append(owner[ev])
+        for k in _EVENT_COLUMNS[1:-1]:
+            cols[k].append(seg[k][ev])
+        org = seg["cal_organizer"][ev].astype(np.int64)
+        cols["cal_organizer"].append(np.where(org >= 0, pmap[np.maximum(org, 0)], -1))
+        cols["cal_att"].append(pmap[seg["cal_att"][att_keep]])
+        cols["cal_att_declined"].append(seg["cal_att_declined"][att_keep])
+        cols["cal_att_ptr"].append(att_base + np.cumsum(counts[ev]))
+        att_base += int(counts[ev].sum())
+
+        owner = remap[seg["mail_owner"].astype(np.int64) + offset]
+        msg = owner >= 0
+        cols["mail_owner"].append(owner[msg])
+        cols["mail_ts"].append(seg["mail_ts"][msg])
+        cols["mail_direction"].append(seg["mail_direction"][msg])
+
+    merged = {k: np.concatenate(v) for k, v in cols.items()}
+    merged["cal_att_ptr"] = np.concatenate(([0], merged["cal_att_ptr"])).astype(np.int64)
+    return WeekSpool(roster=roster[keep], people=people, **merged)
+
+
+# ── Retention & erasure ─────────────────────────────────────────────
+
+def spooled_weeks(root: str | Path) -> list[date]:
+    base = Path(root)
+    if not base.is_dir():
+        return []
+    weeks = []
+    for child in base.iterdir():
+        try:
+            weeks.append(date.fromisoformat(child.name))
+        except ValueError:
+            continue
+    return sorted(weeks)
+
+
+def purge_expired(root: str | Path, retention_days: int, today: date | None = None) -> list[date]:
+    """Delete week directories whose whole week is older than the retention window."""
+    cutoff = (today or date.today()) - timedelta(days=retention_days)
+    purged = []
+    for week in spooled_weeks(root):
+        if week + timedelta(days=7) <= cutoff:
+            shutil.rmtree(week_dir(root, week), ignore_errors=True)
+            purged.append(week)
+    return purged
+
+
+def erase_person(root: str | Path, email: str) -> int:
+    """Remove an employee's own rows and blank their address as a participant.
+
+    The one exception to append-only: affected segments are rewritten in
+    place (atomically). Returns the number of segments rewritten.
+    """
+    email = email.lower()
+    rewritten = 0
+    for week in spooled_weeks(root):
+        for path in segment_paths(root, week):
+            with np.load(path) as npz:
+                seg = {k: npz[k] for k in npz.files}
+            in_roster = np.flatnonzero(seg["roster"] == email)
+            in_people = seg["people"] == email
+            if not in_roster.size and not in_people.any():
+                continue
+
+            seg["people"] = np.where(in_people, "", seg["people"])
+            events = ~np.isin(seg["cal_owner"], in_roster)
+            counts = np.diff(seg["cal_att_ptr"])
+            attendees = np.repeat(events, counts)
+            for k in _EVENT_COLUMNS:
+                seg[k] = seg[k][events]
+            seg["cal_att"] = seg["cal_att"][attendees]
+            seg["cal_att_declined"] = seg["cal_att_declined"][attendees]
+            seg["cal_att_ptr"] = np.concatenate(([0], np.cumsum(counts[events]))).astype(np.int64)
+            messages = ~np.isin(seg["mail_owner"], in_roster)
+            for k in _MAIL_COLUMNS:
+                seg[k] = seg[k][messages]
+            # Keep the roster entry (so an older run is not resurrected), minus the address
+            seg["roster"] = np.where(seg["roster"] == email, "", seg["roster"])
+            _write_segment(path, seg)
+            rewritten += 1
+    return rewritten
+
+
+# ── CLI ─────────────────────────────────────────────────────────────
+
+async def purge_spool(db: AsyncSession) -> list[date]:
+    """`purge_expired` over the retention window the retention service enforces."""
+    from app.config import get_settings
+    from app.services.retention import reference_day
+    from app.signals.ingest import get_retention_days
+
+    return purge_expired(get_settings().metadata_spool_dir, await get_retention_days(db), reference_day())
+
+
+async def reaggregate_spool(db: AsyncSession, weeks: Iterable[date]) -> dict[date, dict]:
+    """Rebuild `weeks` from the spool, then what is derived from them.
+
+    As after `/sync/run`, the insights snapshots are re-rendered and the
+    dashboard response cache is bumped once any week was rebuilt – otherwise
+    both keep serving the numbers from before.
+    """
+    from app.db import bump_response_cache
+    from app.services.snapshots import refresh_snapshots
+    from app.signals.ingest import reaggregate_week
+
+    results = {}
+    for week in weeks:
+        t0 = time.perf_counter()
+        results[week] = await reaggregate_week(db, week)
+        print(f"{week}: {results[week]} in {time.perf_counter() - t0:.2f}s")
+    if any(r["employees_processed"] for r in results.values()):
+        await refresh_snapshots(db)
+        await bump_response_cache()
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+    import asyncio
+
+    from app.config import get_settings
+    from app.db import async_session_factory
+
+    cfg = get_settings()
+    parser = argparse.ArgumentParser(prog="python -m app.signals.spool", description="Raw metadata spool tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    re_p = sub.add_parser("reaggregate", help="rebuild WeeklySignal rows from spooled metadata")
+    re_p.add_argument("--week", type=date.fromisoformat, action="append",
+                      help="week start (YYYY-MM-DD); repeatable, default = every spooled week")
+    sub.add_parser("purge", help="delete spooled weeks older than the retention window")
+    args = parser.parse_args(argv)
+
+    async def _run() -> None:
+        async with async_session_factory() as db:
+            if args.command == "purge":
+                print(f"Purged {len(await purge_spool(db))} spooled week(s)")
+            else:
+                await reaggregate_spool(db, args.week or spooled_weeks(cfg.metadata_spool_dir))
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
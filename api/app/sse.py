@@ -0,0 +1,12 @@
+"""Server-Sent Events helpers shared by the streaming routes."""
+
+from __future__ import annotations
+
+import json
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+SSE_OPEN = ": stream open\n\n"  # first byte goes out before any generation finishes
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
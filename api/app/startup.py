@@ -0,0 +1,78 @@
+"""Startup timing and lazy imports.
+
+Importing the app must stay cheap so a new worker accepts traffic quickly
+(rolling deploys, autoscaling). Heavy libraries that are only needed once
+requests arrive are bound with `lazy_import`, which returns a module object
+that executes on first attribute access; `startup_report` records how long
+the router imports and each lifespan phase took (logged once at startup and
+shown by `GET /health`).
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from types import ModuleType
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """`import name`, deferred until an attribute of the module is used."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name: str) -> bool:
+    """True once `name` is imported for real (not just bound lazily)."""
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(module, importlib.util._LazyModule)
+
+
+class StartupReport:
+    """Wall-clock time of import and startup phases, in milliseconds."""
+
+    def __init__(self):
+        self.imports: dict[str, float] = {}
+        self.startup: dict[str, float] = {}
+        self.background: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, section: dict[str, float], name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            section[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def report(self) -> dict:
+        return {
+            "imports_ms": dict(self.imports),
+            "startup_ms": dict(self.startup),
+            "background_ms": dict(self.background),
+            "total_ms": round(sum(self.imports.values()) + sum(self.startup.values()), 1),
+        }
+
+    def log(self) -> None:
+        def fmt(section: dict[str, float]) -> str:
+            return ", ".join(f"{name} {ms:.0f}ms" for name, ms in section.items()) or "-"
+
+        logger.info(
+            "Startup finished in %.0fms – imports: %s; startup: %s",
+            self.report()["total_ms"], fmt(self.imports), fmt(self.startup),
+        )
+
+
+startup_report = StartupReport()
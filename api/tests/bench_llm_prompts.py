@@ -0,0 +1,198 @@
+"""Prompt size and generation latency: legacy free-form vs compact JSON-mode prompts.
+
+Builds the 1:1 agenda and review-draft prompts for every demo archetype both
+ways. Offline it reports estimated prompt tokens, the generation cap and a
+worst-case latency estimate from CPU prefill/decode rates. With ``--live`` it
+times real generations against ``OLLAMA_BASE_URL`` (uncached) and reports the
+share of replies each parser accepts.
+
+    cd api && python -m tests.bench_llm_prompts
+    cd api && python -m tests.bench_llm_prompts --live --runs 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from app.llm_prompt import PromptSpec
+from app.ollama_client import OllamaClient
+from app.scoring.scorer import compute_all_scores
+from app.services.questions import _parse_questions, _questions_prompt
+from app.services.reviews import _parse_review, _review_prompt
+from app.signals.compute import compute_all_trends
+from app.signals.generate_demo import ARCHETYPES, generate_weekly_signals
+
+PERIOD = "2026-01-05 to 2026-02-02"
+AGENDA_SIGNALS = (  # what `load_questions_context` passes to the agenda prompt
+    "tasks_completed", "missed_deadlines", "meeting_hours", "focus_blocks",
+    "after_hours_events", "unique_collaborators", "learning_hours",
+)
+LEGACY_NUM_PREDICT = 1024
+
+
+# ── Legacy prompts (as shipped before the compact builder) ──────────
+
+def _legacy_questions(emp_name: str, scores: dict, signals: dict) -> PromptSpec:
+    system = (
+        "You are an empathetic management coach. Generate a structured 1:1 meeting agenda. "
+        "Be specific, action-oriented, and human-centered. Never blame the employee. "
+        "Format: list questions, listening cues, follow-up actions, and context notes."
+    )
+    prompt = f"""Generate a 1:1 meeting agenda for {emp_name}.
+
+Current signals (this week):
+- Tasks completed: {signals.get('tasks_completed', 'N/A')}
+- Missed deadlines: {signals.get('missed_deadlines', 'N/A')}
+- Meeting hours: {signals.get('meeting_hours', 'N/A')}h
+- Focus blocks (≥2h): {signals.get('focus_blocks', 'N/A')}
+- After-hours events: {signals.get('after_hours_events', 'N/A')}
+- Unique collaborators: {signals.get('unique_collaborators', 'N/A')}
+- Learning hours: {signals.get('learning_hours', 'N/A')}h
+
+Computed scores (0-100):
+- Burnout risk: {scores.get('burnout_risk', 'N/A')}
+- High pressure: {scores.get('high_pressure', 'N/A')}
+- High potential: {scores.get('high_potential', 'N/A')}
+- Performance degradation: {scores.get('performance_degradation', 'N/A')}
+
+Generate exactly:
+1. 5-7 open-ended questions (warm, specific, non-judgmental)
+2. 3-4 listening cues for the manager
+3. 3-5 concrete follow-up actions
+4. 2-3 context notes about what data informed this
+
+Respond in JSON format:
+{{"questions": [...], "listening_cues": [...], "follow_up_actions": [...], "context_notes": [...]}}
+"""
+    return PromptSpec(system, prompt, LEGACY_NUM_PREDICT)
+
+
+def _legacy_review(emp_name: str, period: str, signals: list[dict], scores: list[dict], trends: dict) -> PromptSpec:
+    system = (
+        "You are a thoughtful management coach writing a performance review draft. "
+        "Be specific, balanced, and constructive. Use data but maintain empathy. "
+        "NEVER reference raw surveillance data. Only reference aggregated signals."
+    )
+    score_map = {s["score_name"]: s for s in scores}
+    current = signals[0] if signals else {}
+    recent = signals[:4]
+    weeks = max(len(recent), 1)
+    prompt = f"""Write a performance review draft for {emp_name} for the period {period}.
+
+Signal summary (4-week averages):
+- Avg tasks completed/week: {sum(s.get('tasks_completed', 0) for s in recent) / weeks:.1f}
+- Missed deadlines trend: {trends.get('missed_deadlines', {}).get('direction', 'N/A')}
+- Meeting hours/week: {sum(s.get('meeting_hours', 0) for s in recent) / weeks:.1f}
+- Focus blocks/week: {sum(s.get('focus_blocks', 0) for s in recent) / weeks:.1f}
+- Cross-team collaboration: {current.get('cross_team_ratio', 0):.0%}
+- Learning investment: {sum(s.get('learning_hours', 0) for s in recent) / weeks:.1f}h/week
+- Support actions: {current.get('support_actions', 0)}/week
+
+Computed assessments:
+- Burnout risk: {score_map.get('burnout_risk', {}).get('score', 'N/A')}/100
+- Growth potential: {score_map.get('high_potential', {}).get('score', 'N/A')}/100
+- Performance trajectory: {score_map.get('performance_degradation', {}).get('score', 'N/A')}/100
+
+Generate a structured review as JSON:
+{{"highlights": ["..."], "growth_areas": ["..."], "risks": ["..."], "suggested_goals": ["..."], "summary": "2-3 sentence narrative"}}
+"""
+    return PromptSpec(system, prompt, LEGACY_NUM_PREDICT)
+
+
+def _legacy_parse(text: str) -> bool:
+    start, end = text.find("{"), text.rfind("}") + 1
+    try:
+        return start >= 0 and end > start and isinstance(json.loads(text[start:end]), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+# ── Benchmark ───────────────────────────────────────────────────────
+
+def _cases() -> list[tuple[str, PromptSpec, PromptSpec, object]]:
+    """(kind, legacy, compact, compact parser) for every archetype."""
+    cases = []
+    for i, archetype in enumerate(ARCHETYPES):
+        signals = list(reversed(generate_weekly_signals(archetype, num_weeks=8, seed=i)))  # newest first
+        scores = compute_all_scores(signals)
+        trends = compute_all_trends(signals)
+        score_map = {s["score_name"]: s["score"] for s in scores}
+        week = {k: signals[0][k] for k in AGENDA_SIGNALS}
+        name = archetype.replace("_", " ").title()
+        cases.append((
+            "questions",
+            _legacy_questions(name, score_map, week),
+            _questions_prompt(name, score_map, week),
+            lambda text, n=name: _parse_questions(n, text),
+        ))
+        cases.append((
+            "review",
+            _legacy_review(name, PERIOD, signals, scores, trends),
+            _review_prompt(name, PERIOD, signals, scores, trends),
+            lambda text, n=name: _parse_review(n, PERIOD, text),
+        ))
+    return cases
+
+
+async def _time_live(client: OllamaClient, spec: PromptSpec, json_mode: bool, runs: int, parse) -> tuple[float, float]:
+    latencies, parsed = [], 0
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        text = await client.generate(spec.prompt, spec.system, json_mode=json_mode, num_predict=spec.num_predict)
+        latencies.append(time.perf_counter() - t0)
+        parsed += bool(text) and bool(parse(text))
+    return statistics.median(latencies), parsed / runs
+
+
+async def run(args: argparse.Namespace) -> dict:
+    cases = _cases()
+    stats: dict = {}
+    for kind in ("questions", "review"):
+        subset = [c for c in cases if c[0] == kind]
+        for label, idx in (("legacy", 1), ("compact", 2)):
+            specs = [c[idx] for c in subset]
+            tokens = statistics.mean(s.tokens for s in specs)
+            cap = specs[0].num_predict
+            stats[f"{kind}.{label}.prompt_tokens"] = round(tokens, 1)
+            stats[f"{kind}.{label}.num_predict"] = cap
+            stats[f"{kind}.{label}.est_worst_case_s"] = round(tokens / args.prefill_tps + cap / args.decode_tps, 1)
+
+    if args.live:
+        client = OllamaClient()
+        client.queue.deadlines[client.queue.INTERACTIVE] = 0  # never reject in the benchmark
+        if not await client.is_available():
+            raise SystemExit(f"Ollama not reachable at {client.base_url}")
+        await client.warm_up()
+        for kind in ("questions", "review"):
+            subset = [c for c in cases if c[0] == kind]
+            for label, idx, json_mode in (("legacy", 1, False), ("compact", 2, True)):
+                medians, ok = [], []
+                for case in subset:
+                    parse = _legacy_parse if label == "legacy" else case[3]
+                    median, rate = await _time_live(client, case[idx], json_mode, args.runs, parse)
+                    medians.append(median)
+                    ok.append(rate)
+                stats[f"{kind}.{label}.live_median_s"] = round(statistics.median(medians), 2)
+                stats[f"{kind}.{label}.parsed_ratio"] = round(statistics.mean(ok), 2)
+        await client.aclose()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="time real generations against Ollama")
+    parser.add_argument("--runs", type=int, default=1, help="live generations per prompt")
+    parser.add_argument("--prefill-tps", type=float, default=60.0, help="prompt tokens/sec for the estimate")
+    parser.add_argument("--decode-tps", type=float, default=8.0, help="generated tokens/sec for the estimate")
+    stats = asyncio.run(run(parser.parse_args()))
+    width = max(len(k) for k in stats)
+    for key, value in stats.items():
+        print(f"{key:<{width}}  {value}")
+
+
+if __name__ == "__main__":
+    main()
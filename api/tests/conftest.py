@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import os
+import tempfile
 import uuid
 
 import pytest
@@ -16,9 +17,13 @@ os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///./test.db"
 os.environ["DATABASE_URL_SYNC"] = "sqlite:///./test.db"
 os.environ["DEMO_MODE"] = "true"
 os.environ["OLLAMA_BASE_URL"] = "http://localhost:99999"  # unreachable for tests
+os.environ["METADATA_SPOOL_DIR"] = tempfile.mkdtemp(prefix="tp-spool-")
+os.environ["RESPONSE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="tp-response-cache-"), "responses.sqlite3")
+os.environ["LLM_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="tp-llm-cache-"), "llm_cache.sqlite3")
 
-from app.db import Base, get_db
+from app.db import Base, get_cached_read_db, get_db, get_read_db
 from app.main import app
+from app.response_cache import response_cache
 
 
 # ── Test engine ─────────────────────────────────────────────────────
@@ -34,6 +39,8 @@ async def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_cached_read_db] = override_get_db
 
 
 @pytest.fixture(scope="session")
@@ -48,6 +55,7 @@ async def setup_db():
     """Create tables before each test, drop after."""
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await response_cache.bump()  # a fresh database: nothing cached is valid
     yield
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -0,0 +1,290 @@
+"""In-process fake of the Microsoft Graph endpoints `GraphClient` uses.
+
+Serve it through ``httpx.ASGITransport`` – the transport ignores the host,
+so the client's real login.microsoftonline.com / graph.microsoft.com URLs
+route straight here:
+
+    fake = FakeGraph(org_size=200)
+    client = GraphClient(transport=httpx.ASGITransport(app=fake.app))
+
+Implements the token endpoint, `calendarView` (+ `/delta`), inbox / sent
+items `messages`, `$batch`, `@odata.nextLink` paging and injectable 429s.
+Synthetic metadata is deterministic for a given seed; every response is
+restricted to the `$select`ed fields, and selecting anything outside
+`GraphClient`'s allow-lists is rejected so privacy regressions fail tests.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.graph_client import GraphClient
+
+GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+ALLOWED_CALENDAR = set(GraphClient.CALENDAR_SELECT.split(","))
+ALLOWED_MAIL = set(GraphClient.MAIL_SELECT.split(","))
+
+
+@dataclass
+class FakeUser:
+    name: str
+    email: str
+    team: str
+
+
+@dataclass
+class FakeGraphStats:
+    requests: int = 0
+    throttled: int = 0
+    events_served: int = 0
+    messages_served: int = 0
+    batches: int = 0
+
+
+def _dt(ts: float) -> dict:
+    return {
+        "dateTime": datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.0000000"),
+        "timeZone": "UTC",
+    }
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_iso(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class FakeGraph:
+    """Synthetic tenant: `org_size` users in teams of `team_size`."""
+
+    def __init__(
+        self,
+        org_size: int = 20,
+        team_size: int = 8,
+        meetings_per_user: int = 12,
+        messages_per_user: int = 40,
+        week_start: date = date(2026, 2, 2),
+        page_size: int = 50,
+        throttle_every: int = 0,
+        seed: int = 0,
+    ):
+        self.week_start = week_start
+        self.page_size = page_size
+        self.throttle_every = throttle_every
+        self.stats = FakeGraphStats()
+        self.users = [
+            FakeUser(f"User {i}", f"user{i}@fake.talentpulse.demo", f"Team {i // team_size}")
+            for i in range(org_size)
+        ]
+        self._by_email = {u.email: i for i, u in enumerate(self.users)}
+        self._rng = np.random.default_rng(seed)
+        self._week_lo = datetime(week_start.year, week_start.month, week_start.day, tzinfo=timezone.utc).timestamp()
+        self._calendars: list[list[tuple[float, dict]]] = [[] for _ in self.users]
+        self._inbox: list[np.ndarray] = []
+        self._sent: list[np.ndarray] = []
+        self._generate(team_size, meetings_per_user, messages_per_user)
+        self.app = self._build_app()
+
+    # ── Synthetic data ───────────────────────────────────────────────
+
+    def _generate(self, team_size: int, meetings_per_user: int, messages_per_user: int) -> None:
+        rng, n = self._rng, len(self.users)
+        n_meetings = max(1, n * meetings_per_user // 4)
+        for _ in range(n_meetings):
+            organizer = int(rng.integers(n))
+            team_lo = organizer - organizer % team_size
+            size = int(rng.integers(2, 6))
+            same_team = rng.integers(team_lo, min(team_lo + team_size, n), size=size)
+            cross = rng.integers(n, size=max(0, size // 3))
+            members = sorted({organizer, *same_team.tolist(), *cross.tolist()} - {organizer})
+            day = int(rng.integers(0, 5))
+            hour = float(rng.choice([8, 9, 10, 11, 13, 14, 15, 16, 17, 19]))
+            start = self._week_lo + day * 86400 + hour * 3600
+            end = start + float(rng.choice([0.5, 1.0, 1.5])) * 3600
+            event = {
+                "start": _dt(start),
+                "end": _dt(end),
+                "organizer": {"emailAddress": {"address": self.users[organizer].email}},
+                "attendees": [
+                    {"emailAddress": {"address": self.users[m].email}, "type": "required",
+                     "status": {"response": "accepted"}}
+                    for m in members
+                ],
+                "responseStatus": {"response": "organizer"},
+                "showAs": "busy",
+                # Content fields exist on the server but must never be selected
+                "subject": "CONFIDENTIAL",
+                "bodyPreview": "CONFIDENTIAL",
+            }
+            for who in [organizer, *members]:
+                self._calendars[who].append((start, event))
+
+        for _ in self.users:
+            inbound = np.sort(self._week_lo + rng.uniform(0, 5 * 86400, messages_per_user))
+            answered = inbound[rng.random(messages_per_user) < 0.6]
+            replies = answered + rng.exponential(3600, answered.size)
+            self._inbox.append(inbound)
+            self._sent.append(np.sort(replies))
+
+    @property
+    def total_events(self) -> int:
+        return sum(len(c) for c in self._calendars)
+
+    # ── Helpers ──────────────────────────────────────────────────────
+
+    def _select(self, item: dict, select: str | None) -> dict:
+        fields = [f for f in (select or "").split(",") if f]
+        if not fields:
+            return item
+        return {f: item[f] for f in fields if f in item}
+
+    def _page(self, request: Request, values: list, key: str) -> dict:
+        params = dict(request.query_params)
+        top = min(int(params.get("$top", self.page_size)), self.page_size)
+        skip = int(params.pop("$skiptoken", 0))
+        page = values[skip:skip + top]
+        body: dict = {"value": page}
+        if skip + top < len(values):
+            params["$skiptoken"] = str(skip + top)
+            body["@odata.nextLink"] = f"{GRAPH_BASE}{request.url.path[len('/v1.0'):]}?{urlencode(params)}"
+        setattr(self.stats, key, getattr(self.stats, key) + len(page))
+        return body
+
+    def _should_throttle(self) -> bool:
+        self.stats.requests += 1
+        if self.throttle_every and self.stats.requests % self.throttle_every == 0:
+            self.stats.throttled += 1
+            return True
+        return False
+
+    def _check_select(self, select: str | None, allowed: set[str]) -> dict | None:
+        extra = {f for f in (select or "").split(",") if f} - allowed
+        if extra:
+            return {"error": {"code": "Forbidden", "message": f"non-metadata fields {sorted(extra)}"}}
+        return None
+
+    def _user(self, user_id: str) -> int | None:
+        return self._by_email.get(user_id.lower())
+
+    def calendar_view(self, request: Request, user_id: str) -> tuple[int, dict]:
+        params = request.query_params
+        if (err := self._check_select(params.get("$select"), ALLOWED_CALENDAR)) is not None:
+            return 400, err
+        idx = self._user(user_id)
+        if idx is None:
+            return 404, {"error": {"code": "ErrorItemNotFound"}}
+        lo = _parse_iso(params.get("startDateTime", _iso(self._week_lo)))
+        hi = _parse_iso(params.get("endDateTime", _iso(self._week_lo + 7 * 86400)))
+        events = [
+            self._select(e, params.get("$select"))
+            for start, e in self._calendars[idx]
+            if lo <= start < hi
+        ]
+        return 200, self._page(request, events, "events_served")
+
+    def messages(self, request: Request, user_id: str, folder: str) -> tuple[int, dict]:
+        params = request.query_params
+        if (err := self._check_select(params.get("$select"), ALLOWED_MAIL)) is not None:
+            return 400, err
+        idx = self._user(user_id)
+        if idx is None:
+            return 404, {"error": {"code": "ErrorItemNotFound"}}
+        times = self._inbox[idx] if folder.lower() == "inbox" else self._sent[idx]
+        msgs = [
+            self._select(
+                {"receivedDateTime": _iso(t), "sentDateTime": _iso(t - 5), "importance": "normal",
+                 "isRead": True, "subject": "CONFIDENTIAL"},
+                params.get("$select"),
+            )
+            for t in times
+        ]
+        return 200, self._page(request, msgs, "messages_served")
+
+    # ── ASGI app ─────────────────────────────────────────────────────
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        def throttled() -> JSONResponse:
+            return JSONResponse(
+                {"error": {"code": "TooManyRequests"}}, status_code=429, headers={"Retry-After": "0"},
+            )
+
+        @app.post("/{tenant}/oauth2/v2.0/token")
+        async def token(tenant: str):
+            return {"token_type": "Bearer", "expires_in": 3599, "access_token": f"fake-token-{tenant}"}
+
+        def _authorized(request: Request) -> bool:
+            return request.headers.get("Authorization", "").startswith("Bearer fake-token-")
+
+        @app.get("/v1.0/users/{user_id}/calendarView")
+        async def calendar_view(user_id: str, request: Request):
+            if not _authorized(request):
+                return JSONResponse({"error": {"code": "InvalidAuthenticationToken"}}, 401)
+            if self._should_throttle():
+                return throttled()
+            status, body = self.calendar_view(request, user_id)
+            return JSONResponse(body, status)
+
+        @app.get("/v1.0/users/{user_id}/calendarView/delta")
+        async def calendar_delta(user_id: str, request: Request):
+            if self._should_throttle():
+                return throttled()
+            if request.query_params.get("$deltatoken"):
+                return {"value": [], "@odata.deltaLink": str(request.url)}
+            status, body = self.calendar_view(request, user_id)
+            if status == 200 and "@odata.nextLink" not in body:
+                body["@odata.deltaLink"] = (
+                    f"{GRAPH_BASE}/users/{user_id}/calendarView/delta?$deltatoken=latest"
+                )
+            return JSONResponse(body, status)
+
+        @app.get("/v1.0/users/{user_id}/mailFolders/{folder}/messages")
+        async def messages(user_id: str, folder: str, request: Request):
+            if not _authorized(request):
+                return JSONResponse({"error": {"code": "InvalidAuthenticationToken"}}, 401)
+            if self._should_throttle():
+                return throttled()
+            status, body = self.messages(request, user_id, folder)
+            return JSONResponse(body, status)
+
+        @app.post("/v1.0/$batch")
+        async def batch(request: Request):
+            self.stats.batches += 1
+            payload = await request.json()
+            if len(payload.get("requests", [])) > GraphClient.BATCH_LIMIT:
+                return JSONResponse({"error": {"code": "BadRequest"}}, 400)
+            responses = []
+            for sub in payload["requests"]:
+                if self._should_throttle():
+                    responses.append({"id": sub["id"], "status": 429, "headers": {"Retry-After": "0"}})
+                    continue
+                parts = urlsplit(sub["url"])
+                sub_request = Request({
+                    "type": "http", "method": "GET", "path": "/v1.0" + parts.path,
+                    "query_string": parts.query.encode(), "headers": [],
+                })
+                segments = parts.path.strip("/").split("/")
+                if segments[-1] == "calendarView":
+                    status, body = self.calendar_view(sub_request, segments[1])
+                elif segments[-1] == "messages":
+                    status, body = self.messages(sub_request, segments[1], segments[3])
+                else:
+                    status, body = 404, {"error": {"code": "BadRequest"}}
+                responses.append({"id": sub["id"], "status": status, "body": body})
+            return {"responses": responses}
+
+        return app
+
+
+def week_bounds_utc(week_start: date) -> tuple[str, str]:
+    lo = datetime(week_start.year, week_start.month, week_start.day, tzinfo=timezone.utc)
+    return _iso(lo.timestamp()), _iso((lo + timedelta(days=7)).timestamp())
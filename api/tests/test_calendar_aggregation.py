@@ -0,0 +1,141 @@
+"""Tests for calendar metadata → weekly signal aggregation."""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.signals.calendar import (
+    CalendarAggregator,
+    aggregate_calendar_week,
+    count_focus_blocks,
+    merge_intervals,
+    parse_graph_datetime,
+    working_windows,
+)
+
+WEEK = date(2026, 2, 2)  # Monday
+
+
+def _event(day: int, start: str, end: str, **extra) -> dict:
+    d = f"2026-02-{2 + day:02d}"
+    ev = {
+        "start": {"dateTime": f"{d}T{start}:00.0000000", "timeZone": "UTC"},
+        "end": {"dateTime": f"{d}T{end}:00.0000000", "timeZone": "UTC"},
+        "showAs": "busy",
+        "attendees": [{"emailAddress": {"address": "x@talentpulse.demo"}}],
+    }
+    ev.update(extra)
+    return ev
+
+
+class TestMergeIntervals:
+    def test_overlapping_merged(self):
+        s, e = merge_intervals(np.array([0.0, 5.0, 20.0]), np.array([10.0, 15.0, 30.0]))
+        assert s.tolist() == [0.0, 20.0]
+        assert e.tolist() == [15.0, 30.0]
+
+    def test_contained_interval(self):
+        s, e = merge_intervals(np.array([10.0, 0.0]), np.array([12.0, 30.0]))
+        assert s.tolist() == [0.0]
+        assert e.tolist() == [30.0]
+
+    def test_empty(self):
+        s, e = merge_intervals(np.array([]), np.array([]))
+        assert s.size == 0 and e.size == 0
+
+
+class TestFocusBlocks:
+    def test_empty_week_has_one_block_per_day(self):
+        windows = working_windows(WEEK, 9, 18, "UTC")
+        assert count_focus_blocks(np.array([]), np.array([]), windows) == 5
+
+    def test_midday_meeting_splits_day(self):
+        windows = working_windows(WEEK, 9, 18, "UTC")
+        start = windows[0, 0] + 3 * 3600  # 12:00
+        blocks = count_focus_blocks(np.array([start]), np.array([start + 3600]), windows)
+        assert blocks == 6  # 9-12 and 13-18 on Monday, plus 4 free days
+
+    def test_dst_aware_windows(self):
+        # US DST starts Sunday 2026-03-08; Monday 9am is 13:00 UTC afterwards
+        windows = working_windows(date(2026, 3, 9), 9, 18, "America/New_York")
+        assert parse_graph_datetime("2026-03-09T13:00:00Z").timestamp() == windows[0, 0]
+
+
+class TestCalendarAggregator:
+    def test_overlaps_counted_once(self):
+        result = aggregate_calendar_week(
+            [_event(0, "10:00", "11:00"), _event(0, "10:30", "11:30")], WEEK,
+        )
+        assert result["meeting_count"] == 2
+        assert result["meeting_hours"] == 1.5
+        assert result["avg_meeting_length_min"] == 60.0
+
+    def test_free_declined_and_solo_events_ignored(self):
+        result = aggregate_calendar_week(
+            [
+                _event(0, "10:00", "11:00", showAs="free"),
+                _event(1, "10:00", "11:00", responseStatus={"response": "declined"}),
+                _event(2, "10:00", "11:00", attendees=[]),
+            ],
+            WEEK,
+        )
+        assert result["meeting_count"] == 0
+        assert result["focus_blocks"] == 5
+
+    def test_after_hours_uses_timezone(self):
+        # 22:00 UTC is 17:00 in New York – inside a 9-18 day there, after hours in UTC
+        events = [_event(0, "22:00", "22:30")]
+        assert aggregate_calendar_week(events, WEEK, 9, 18, "UTC")["after_hours_events"] == 1
+        assert aggregate_calendar_week(events, WEEK, 9, 18, "America/New_York")["after_hours_events"] == 0
+
+    def test_weekend_is_after_hours(self):
+        result = aggregate_calendar_week([_event(5, "10:00", "11:00")], WEEK)
+        assert result["after_hours_events"] == 1
+
+    def test_streaming_matches_one_shot(self):
+        events = [_event(d % 5, f"{9 + d % 8:02d}:00", f"{10 + d % 8:02d}:30") for d in range(40)]
+        agg = CalendarAggregator(WEEK)
+        for i in range(0, len(events), 7):
+            agg.extend(events[i:i + 7])
+        assert agg.finalize() == aggregate_calendar_week(events, WEEK)
+
+    def test_fragmentation_in_range(self):
+        events = [_event(d, f"{h:02d}:00", f"{h:02d}:45") for d in range(5) for h in (9, 11, 13, 15, 17)]
+        result = aggregate_calendar_week(events, WEEK)
+        assert result["focus_blocks"] == 0
+        assert 0.0 <= result["fragmentation_score"] <= 1.0
+        assert result["fragmentation_score"] > 0.5
+
+
+@pytest.mark.asyncio
+async def test_ingest_graph_week_writes_signals(db_session):
+    from app.models import AppSettings, Employee, Team, WeeklySignal
+    from app.signals.ingest import ingest_graph_week
+    from sqlalchemy import select
+
+    team = Team(name="Platform", department="Engineering")
+    db_session.add(team)
+    await db_session.flush()
+    db_session.add(Employee(name="A", email="a@talentpulse.demo", team_id=team.id))
+    db_session.add(AppSettings(id=1, timezone="UTC"))
+    await db_session.commit()
+
+    class StubGraph:
+        async def get_calendar_events(self, user_id, start, end):
+            return [_event(0, "10:00", "11:00"), _event(0, "10:30", "12:00")]
+
+        async def get_mail_metadata(self, user_id, start, end):
+            return [{"receivedDateTime": "2026-02-02T14:00:00Z"}]
+
+        async def get_sent_mail_metadata(self, user_id, start, end):
+            return [{"sentDateTime": "2026-02-02T14:20:00Z"}, {"sentDateTime": "2026-02-02T21:00:00Z"}]
+
+    result = await ingest_graph_week(db_session, WEEK, client=StubGraph())
+    assert result["employees_processed"] == 1
+    row = (await db_session.execute(select(WeeklySignal))).scalar()
+    assert row.source == "graph"
+    assert row.meeting_count == 2
+    assert row.meeting_hours == 2.0
+    assert row.response_time_bucket == "fast"
+    assert row.after_hours_events == 1  # the 21:00 send
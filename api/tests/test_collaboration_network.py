@@ -0,0 +1,98 @@
+"""Tests for the collaboration network engine."""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.signals.collaboration import (
+    CollaborationGraphBuilder,
+    approximate_betweenness,
+    compute_collaboration_metrics,
+)
+
+
+def _meeting(emails: list[str], day: int = 2, hour: int = 10, hours: int = 1) -> dict:
+    return {
+        "start": {"dateTime": f"2026-02-{day:02d}T{hour:02d}:00:00", "timeZone": "UTC"},
+        "end": {"dateTime": f"2026-02-{day:02d}T{hour + hours:02d}:00:00", "timeZone": "UTC"},
+        "organizer": {"emailAddress": {"address": emails[0]}},
+        "attendees": [{"emailAddress": {"address": e}} for e in emails[1:]],
+    }
+
+
+def _index(n: int) -> dict[str, int]:
+    return {f"e{i}@talentpulse.demo": i for i in range(n)}
+
+
+def _e(i: int) -> str:
+    return f"e{i}@talentpulse.demo"
+
+
+class TestGraphBuilder:
+    def test_duplicate_calendar_copies_counted_once(self):
+        b = CollaborationGraphBuilder(_index(3))
+        meeting = _meeting([_e(0), _e(1), _e(2)], hours=2)
+        b.extend([meeting, meeting, meeting])  # seen on all three calendars
+        g = b.build()
+        assert g.degree().tolist() == [2, 2, 2]
+        assert np.allclose(g.data, 2.0)
+
+    def test_repeat_meetings_accumulate_weight(self):
+        b = CollaborationGraphBuilder(_index(2))
+        b.extend([_meeting([_e(0), _e(1)], hour=h) for h in (9, 11, 14)])
+        g = b.build()
+        assert g.data.tolist() == [3.0, 3.0]
+
+    def test_unknown_and_oversized_meetings_ignored(self):
+        b = CollaborationGraphBuilder(_index(30))
+        b.add_event(_meeting([_e(0), "external@vendor.com"]))
+        b.add_event(_meeting([_e(i) for i in range(30)]))
+        assert b.build().indices.size == 0
+
+
+class TestMetrics:
+    def test_exact_betweenness_on_path(self):
+        b = CollaborationGraphBuilder(_index(5))
+        b.extend([_meeting([_e(i), _e(i + 1)], day=2 + i) for i in range(4)])
+        bc = approximate_betweenness(b.build(), pivots=10)
+        assert np.allclose(bc, np.array([0, 3, 4, 3, 0]) / 6)
+
+    def test_cross_team_ratio(self):
+        b = CollaborationGraphBuilder(_index(3))
+        b.add_event(_meeting([_e(0), _e(1)], hours=3))
+        b.add_event(_meeting([_e(0), _e(2)], hour=14, hours=1))
+        metrics = compute_collaboration_metrics(b.build(), [0, 0, 1])
+        assert metrics["cross_team_ratio"].tolist() == [0.25, 0.0, 1.0]
+        assert metrics["unique_collaborators"].tolist() == [2, 1, 1]
+
+    def test_bridge_between_teams_is_bottleneck(self):
+        # Two 8-person teams whose only link is employee 16 sitting in both team meetings
+        b = CollaborationGraphBuilder(_index(17))
+        b.add_event(_meeting([_e(16)] + [_e(i) for i in range(0, 8)], hour=9))
+        b.add_event(_meeting([_e(16)] + [_e(i) for i in range(8, 16)], hour=11))
+        metrics = compute_collaboration_metrics(b.build(), [0] * 8 + [1] * 8 + [2], pivots=17)
+        assert metrics["bottlenecks"].tolist() == [16]
+        assert metrics["cross_team_ratio"][16] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_org_overview_reports_bottlenecks(client, db_session):
+    from app.models import CollaborationBottleneck, Employee, Team
+
+    team = Team(name="Platform", department="Engineering")
+    db_session.add(team)
+    await db_session.flush()
+    emp = Employee(name="Bridge Person", email="bridge@talentpulse.demo", team_id=team.id)
+    db_session.add(emp)
+    await db_session.flush()
+    db_session.add(CollaborationBottleneck(
+        employee_id=emp.id, week_start=date(2026, 2, 2),
+        betweenness=0.42, unique_collaborators=14, cross_team_ratio=0.6,
+    ))
+    await db_session.commit()
+
+    data = (await client.get("/org/overview")).json()
+    assert len(data["collaboration_bottlenecks"]) == 1
+    assert data["collaboration_bottlenecks"][0]["employee"] == "Bridge Person"
+    assert data["collaboration_bottlenecks"][0]["team"] == "Platform"
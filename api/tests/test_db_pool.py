@@ -0,0 +1,101 @@
+"""Tests for connection pool settings and utilization metrics."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from app.config import get_settings
+from app.db import MeteredQueuePool, _engine, engine_options, pool_stats
+
+
+@pytest.fixture
+def make_engine(tmp_path, monkeypatch):
+    engines = []
+
+    def make(**settings):
+        for name, value in settings.items():
+            monkeypatch.setattr(get_settings(), name, value)
+        engine = _engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db")
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.sync_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_is_sized_from_settings(make_engine):
+    engine = make_engine(db_pool_size=3, db_max_overflow=2, db_pool_recycle=600)
+    pool = engine.sync_engine.pool
+    assert isinstance(pool, MeteredQueuePool)
+    assert (pool.size(), pool._max_overflow, pool._recycle) == (3, 2, 600)
+
+
+@pytest.mark.asyncio
+async def test_waiters_and_wait_time_are_recorded(make_engine):
+    engine = make_engine(db_pool_size=1, db_max_overflow=0)
+
+    async def second():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        waiter = asyncio.create_task(second())
+        await asyncio.sleep(0.1)
+        stats = pool_stats(engine)
+        assert (stats["checked_out"], stats["waiting"]) == (1, 1)
+    await waiter
+
+    stats = pool_stats(engine)
+    assert stats["waiting"] == 0 and stats["peak_waiting"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["max_wait_ms"] >= 50
+
+
+@pytest.mark.asyncio
+async def test_checkout_timeouts_are_counted(make_engine):
+    engine = make_engine(db_pool_size=1, db_max_overflow=0, db_pool_timeout=0.1)
+    async with engine.connect():
+        with pytest.raises(PoolTimeout):
+            async with engine.connect():
+                pass
+    stats = pool_stats(engine)
+    assert stats["timeouts"] == 1 and stats["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_pre_ping_only_pings_idle_connections(make_engine):
+    busy = make_engine(db_pool_pre_ping="idle", db_pool_pre_ping_idle_seconds=60.0)
+    idle = make_engine(db_pool_pre_ping="idle", db_pool_pre_ping_idle_seconds=0.0)
+    never = make_engine(db_pool_pre_ping="never", db_pool_pre_ping_idle_seconds=0.0)
+    for engine in (busy, idle, never):
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    assert pool_stats(busy)["pings"] == 0
+    assert pool_stats(idle)["pings"] == 2  # the first checkout opened a fresh connection
+    assert pool_stats(never)["pings"] == 0
+
+
+def test_asyncpg_statement_cache_size_is_passed_through(monkeypatch):
+    monkeypatch.setattr(get_settings(), "db_statement_cache_size", 0)  # e.g. behind PgBouncer
+    options = engine_options("postgresql+asyncpg://user:pw@localhost/db")
+    assert options["connect_args"] == {"prepared_statement_cache_size": 0, "statement_cache_size": 0}
+    assert "connect_args" not in engine_options("sqlite+aiosqlite:///./x.db")
+
+
+def test_pre_ping_strategies(monkeypatch):
+    url = "postgresql+asyncpg://user:pw@localhost/db"
+    for strategy, pre_ping in (("always", True), ("idle", False), ("never", False)):
+        monkeypatch.setattr(get_settings(), "db_pool_pre_ping", strategy)
+        assert engine_options(url)["pool_pre_ping"] is pre_ping
+
+
+@pytest.mark.asyncio
+async def test_health_reports_pool_utilization(client):
+    data = (await client.get("/health")).json()
+    assert {"size", "checked_out", "waiting", "avg_wait_ms", "timeouts"} <= data["database"]["pool"].keys()
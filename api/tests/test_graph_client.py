@@ -0,0 +1,110 @@
+"""Tests for GraphClient against the in-process fake Graph server."""
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.graph_client import GraphClient
+from tests.fake_graph import FakeGraph, week_bounds_utc
+
+
+def _client(fake: FakeGraph) -> GraphClient:
+    client = GraphClient(transport=httpx.ASGITransport(app=fake.app))
+    client.tenant_id = "fake-tenant"
+    return client
+
+
+@pytest.mark.asyncio
+async def test_calendar_paging_follows_next_link():
+    fake = FakeGraph(org_size=10, meetings_per_user=40, page_size=7)
+    client = _client(fake)
+    user = fake.users[0].email
+    start, end = week_bounds_utc(fake.week_start)
+
+    events = await client.get_calendar_events(user, start, end)
+    assert len(events) == len(fake._calendars[0])
+    assert len(events) > fake.page_size
+    assert fake.stats.events_served == len(events)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_only_metadata_fields_returned():
+    fake = FakeGraph(org_size=4)
+    client = _client(fake)
+    start, end = week_bounds_utc(fake.week_start)
+    events = await client.get_calendar_events(fake.users[0].email, start, end)
+    inbox = await client.get_mail_metadata(fake.users[0].email, start, end)
+    for item in events + inbox:
+        assert "CONFIDENTIAL" not in str(item)
+    assert set(events[0]) <= set(GraphClient.CALENDAR_SELECT.split(","))
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_throttling_is_retried():
+    fake = FakeGraph(org_size=4, page_size=5, throttle_every=3)
+    client = _client(fake)
+    start, end = week_bounds_utc(fake.week_start)
+    sent = await client.get_sent_mail_metadata(fake.users[1].email, start, end)
+    assert len(sent) == fake._sent[1].size
+    assert fake.stats.throttled > 0
+    assert client.throttled == fake.stats.throttled
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_batch_requests_and_retries_throttled_parts():
+    fake = FakeGraph(org_size=30, page_size=1000, throttle_every=4)
+    client = _client(fake)
+    requests = [
+        {"id": str(i), "url": f"/users/{u.email}/calendarView?$select={GraphClient.CALENDAR_SELECT}"}
+        for i, u in enumerate(fake.users)
+    ]
+    results = await client.batch(requests)
+    assert len(results) == 30
+    assert all(r["status"] == 200 for r in results.values())
+    assert len(results["5"]["body"]["value"]) == len(fake._calendars[5])
+    assert fake.stats.batches >= 2  # 30 requests > 20 per batch
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_calendar_delta_round_trip():
+    fake = FakeGraph(org_size=6, page_size=3)
+    client = _client(fake)
+    start, end = week_bounds_utc(fake.week_start)
+    events, delta_link = await client.get_calendar_delta(fake.users[2].email, start, end)
+    assert len(events) == len(fake._calendars[2])
+    assert delta_link
+    changes, _ = await client.get_calendar_delta(fake.users[2].email, start, end, delta_link)
+    assert changes == []
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_end_to_end_ingestion_through_fake(db_session):
+    from app.models import AppSettings, CollaborationBottleneck, Employee, Team, WeeklySignal
+    from app.signals.ingest import ingest_graph_week
+
+    fake = FakeGraph(org_size=24, team_size=8, throttle_every=11)
+    teams = {}
+    for u in fake.users:
+        if u.team not in teams:
+            teams[u.team] = Team(name=u.team)
+            db_session.add(teams[u.team])
+            await db_session.flush()
+        db_session.add(Employee(name=u.name, email=u.email, team_id=teams[u.team].id))
+    db_session.add(AppSettings(id=1, timezone="UTC"))
+    await db_session.commit()
+
+    result = await ingest_graph_week(db_session, fake.week_start, client=_client(fake))
+    assert result == {"employees_processed": 24, "weeks_generated": 24, "failed": 0}
+
+    rows = (await db_session.execute(select(WeeklySignal))).scalars().all()
+    assert all(r.source == "graph" for r in rows)
+    assert sum(r.meeting_count for r in rows) == fake.total_events
+    assert any(r.unique_collaborators > 0 for r in rows)
+    assert {r.response_time_bucket for r in rows} <= {"fast", "normal", "slow"}
+    bottlenecks = (await db_session.execute(select(CollaborationBottleneck))).scalars().all()
+    assert len(bottlenecks) <= 10
@@ -0,0 +1,90 @@
+"""Tests for POST /employees/insights:batch."""
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import delete, event
+
+import app.routes.employees as employees_routes
+from app.db import engine
+from app.models import InsightsSnapshot
+
+
+def _lines(resp) -> list[dict]:
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+async def _employee_ids(client) -> list[str]:
+    await client.post("/sync/run")
+    return [e["id"] for e in (await client.get("/employees")).json()]
+
+
+@pytest.fixture
+def count_queries():
+    statements = []
+
+    def before(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", before)
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_requests_in_order(client):
+    ids = (await _employee_ids(client))[:5]
+    unknown = str(uuid.uuid4())
+    resp = await client.post("/employees/insights:batch", json={"employee_ids": [ids[2], unknown, *ids, ids[0]]})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = resp.text.splitlines()
+    assert len(lines) == 6  # duplicates dropped
+    assert json.loads(lines[1]) == {"employee_id": unknown, "error": f"Employee {unknown} not found"}
+    expected_order = [ids[2], ids[0], ids[1], ids[3], ids[4]]
+    for emp_id, line in zip(expected_order, lines[:1] + lines[2:]):
+        single = await client.get(f"/employees/{emp_id}/insights")
+        assert line.encode() == single.content
+
+
+@pytest.mark.asyncio
+async def test_live_batch_build_matches_the_single_build(client, db_session):
+    ids = await _employee_ids(client)
+    await db_session.execute(delete(InsightsSnapshot))
+    await db_session.commit()
+
+    lines = (await client.post("/employees/insights:batch", json={"employee_ids": ids})).text.splitlines()
+    for emp_id, line in zip(ids, lines):
+        single = await client.get(f"/employees/{emp_id}/insights")
+        assert single.headers["x-insights-source"] == "live"
+        assert line.encode() == single.content
+
+
+@pytest.mark.asyncio
+async def test_query_count_does_not_grow_with_the_batch(client, db_session, count_queries):
+    ids = await _employee_ids(client)
+    await db_session.execute(delete(InsightsSnapshot))
+    await db_session.commit()
+
+    counts = []
+    for batch in (ids[:1], ids):
+        count_queries.clear()
+        resp = await client.post("/employees/insights:batch", json={"employee_ids": batch})
+        assert len(_lines(resp)) == len(batch)
+        counts.append(len(count_queries))
+    assert counts[0] == counts[1] <= 8
+
+
+@pytest.mark.asyncio
+async def test_large_batches_are_loaded_in_chunks(client, monkeypatch):
+    ids = await _employee_ids(client)
+    monkeypatch.setattr(employees_routes, "BATCH_CHUNK", 2)
+    lines = _lines(await client.post("/employees/insights:batch", json={"employee_ids": ids}))
+    assert [line["employee"]["id"] for line in lines] == ids
+
+
+@pytest.mark.asyncio
+async def test_empty_batch_is_rejected(client):
+    assert (await client.post("/employees/insights:batch", json={"employee_ids": []})).status_code == 422
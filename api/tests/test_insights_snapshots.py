@@ -0,0 +1,71 @@
+"""Tests for stored insights snapshots and their ETags."""
+
+import uuid
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.models import InsightsSnapshot
+
+
+async def _first_employee(client) -> str:
+    await client.post("/sync/run")
+    return (await client.get("/employees")).json()[0]["id"]
+
+
+@pytest.mark.asyncio
+async def test_sync_stores_a_snapshot_per_active_employee(client, db_session):
+    await client.post("/sync/run")
+    employees = (await client.get("/employees")).json()
+    assert await db_session.scalar(select(func.count()).select_from(InsightsSnapshot)) == len(employees)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_served_and_matches_the_live_build(client, db_session):
+    emp_id = await _first_employee(client)
+    stored = await client.get(f"/employees/{emp_id}/insights")
+    assert stored.headers["x-insights-source"] == "snapshot"
+
+    await db_session.execute(delete(InsightsSnapshot))
+    await db_session.commit()
+    live = await client.get(f"/employees/{emp_id}/insights")
+    assert live.headers["x-insights-source"] == "live"
+    assert live.content == stored.content
+    assert live.headers["etag"] == stored.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_if_none_match_gets_304(client):
+    emp_id = await _first_employee(client)
+    url = f"/employees/{emp_id}/insights"
+    etag = (await client.get(url)).headers["etag"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        resp = await client.get(url, headers={"If-None-Match": header})
+        assert resp.status_code == 304 and resp.content == b""
+        assert resp.headers["etag"] == etag
+    assert (await client.get(url, headers={"If-None-Match": '"other"'})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_etag_is_stable_across_unchanged_syncs(client):
+    emp_id = await _first_employee(client)
+    etag = (await client.get(f"/employees/{emp_id}/insights")).headers["etag"]
+    await client.post("/sync/run")
+    assert (await client.get(f"/employees/{emp_id}/insights")).headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_erasure_drops_the_snapshot_at_once(client, db_session):
+    emp_id = await _first_employee(client)
+    await client.delete(f"/employees/{emp_id}/data")
+    count = await db_session.scalar(
+        select(func.count()).select_from(InsightsSnapshot).where(InsightsSnapshot.employee_id == uuid.UUID(emp_id))
+    )
+    assert count == 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_employee_is_404(client):
+    await client.post("/sync/run")
+    assert (await client.get(f"/employees/{uuid.uuid4()}/insights")).status_code == 404
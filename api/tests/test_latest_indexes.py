@@ -0,0 +1,158 @@
+"""Query-plan regression tests for the latest-row lookups.
+
+The SQLite check always runs. The Postgres check needs `TEST_POSTGRES_URL`
+(an asyncpg URL to a scratch database – the test migrates its own schema
+with Alembic) and asserts the lookups are index-only scans on the
+per-partition copies of the migration 006 indexes.
+"""
+
+import json
+import os
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import SCORE_SUMMARY_COLUMNS, EmployeeScore, WeeklySignal
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL", "")
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+def _latest_score(employee_id: uuid.UUID):
+    return (
+        select(*SCORE_SUMMARY_COLUMNS)
+        .where(EmployeeScore.employee_id == employee_id)
+        .order_by(EmployeeScore.week_start.desc())
+        .limit(1)
+    )
+
+
+def _latest_workload(employee_id: uuid.UUID):
+    return (
+        select(WeeklySignal.workload_items)
+        .where(WeeklySignal.employee_id == employee_id)
+        .order_by(WeeklySignal.week_start.desc())
+        .limit(1)
+    )
+
+
+def _sql(stmt, dialect) -> str:
+    return str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_latest_lookups_use_the_latest_index_without_sorting(db_session):
+    checks = (
+        (_latest_score(uuid.uuid4()), "ix_score_employee_latest"),
+        (_latest_workload(uuid.uuid4()), "ix_signal_employee_latest"),
+    )
+    for stmt, index in checks:
+        rows = (await db_session.execute(text("EXPLAIN QUERY PLAN " + _sql(stmt, sqlite.dialect())))).all()
+        detail = " | ".join(row[-1] for row in rows)
+        assert f"INDEX {index}" in detail, detail
+        assert "TEMP B-TREE" not in detail, detail
+
+
+def _migrate(sync_conn) -> None:
+    """`alembic upgrade head` on the given connection (its search_path decides the schema)."""
+    from alembic import command
+    from alembic.config import Config
+
+    cfg = Config(str(API_DIR / "alembic.ini"))
+    cfg.set_main_option("script_location", str(API_DIR / "alembic"))
+    cfg.attributes["connection"] = sync_conn
+    command.upgrade(cfg, "head")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+async def test_postgres_latest_lookups_are_index_only_scans():
+    """Production schema: migrations 001–head, partitioned tables (004) and the
+    006 indexes, which Postgres creates on every partition."""
+    pytest.importorskip("asyncpg")
+    pytest.importorskip("alembic.command")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.models import Employee, Team
+    from app.services.retention import add_months, month_start, partition_name
+
+    schema = f"tp_explain_{uuid.uuid4().hex[:8]}"
+    admin = create_async_engine(POSTGRES_URL, isolation_level="AUTOCOMMIT")
+    engine = create_async_engine(
+        POSTGRES_URL, isolation_level="AUTOCOMMIT", connect_args={"server_settings": {"search_path": schema}},
+    )
+    async with admin.connect() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+    try:
+        async with engine.connect() as conn:
+            await conn.run_sync(_migrate)
+            assert await conn.scalar(text(
+                "SELECT count(*) FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = :schema"
+            ), {"schema": schema}) == 2
+
+            # Weeks from ten weeks ago (partitions 004 did not create) through the
+            # last month 004 created ahead, so every partition holds rows
+            first_week = date.today() - timedelta(weeks=10)
+            end = add_months(month_start(date.today()), 4)
+            month = month_start(first_week)
+            while month <= month_start(date.today()):
+                for table in ("weekly_signals", "employee_scores"):
+                    await conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                    ))
+                month = add_months(month, 1)
+
+            team_id = uuid.uuid4()
+            await conn.execute(Team.__table__.insert(), [{"id": team_id, "name": "T"}])
+            employees = [
+                {"id": uuid.uuid4(), "name": f"E{i}", "email": f"e{i}@x.test", "team_id": team_id}
+                for i in range(100)
+            ]
+            await conn.execute(Employee.__table__.insert(), employees)
+            weeks = [first_week + timedelta(weeks=w) for w in range((end - first_week).days // 7 + 1)]
+            weeks = [w for w in weeks if w < end]
+            rows = [{"id": uuid.uuid4(), "employee_id": e["id"], "week_start": w} for e in employees for w in weeks]
+            await conn.execute(EmployeeScore.__table__.insert(), rows)
+            await conn.execute(WeeklySignal.__table__.insert(), rows)
+            await conn.execute(text("VACUUM ANALYZE employee_scores"))
+            await conn.execute(text("VACUUM ANALYZE weekly_signals"))
+
+            checks = (
+                (_latest_score(employees[0]["id"]), "ix_score_employee_latest"),
+                (_latest_workload(employees[0]["id"]), "ix_signal_employee_latest"),
+            )
+            for stmt, index in checks:
+                partition_indexes = set((await conn.execute(text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+                    "WHERE p.relname = :index"
+                ), {"index": index})).scalars())
+                assert partition_indexes  # one per partition
+
+                result = await conn.execute(text("EXPLAIN (FORMAT JSON) " + _sql(stmt, postgresql.dialect())))
+                plan = result.scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                nodes = list(_plan_nodes(plan[0]["Plan"]))
+                types = [n["Node Type"] for n in nodes]
+                scans = [(n["Node Type"], n.get("Index Name")) for n in nodes if "Scan" in n["Node Type"]]
+                assert {"Append", "Merge Append"} & set(types), types
+                assert {t for t, _ in scans} == {"Index Only Scan"}, scans
+                assert {i for _, i in scans} == partition_indexes, scans
+                assert "Sort" not in types
+    finally:
+        await engine.dispose()
+        async with admin.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await admin.dispose()
@@ -0,0 +1,94 @@
+"""Tests for the persistent LLM response cache."""
+
+import json
+import time
+
+import pytest
+
+from app.llm_cache import LLMResponseCache, llm_cache
+from app.ollama_client import ollama
+
+
+def test_entries_survive_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LLMResponseCache(path)
+    key = cache.key("llama3.1:8b", "system", "prompt")
+    cache.put(key, "answer", "employee:1", "2026-02-02")
+    cache.close()
+
+    reopened = LLMResponseCache(path)
+    assert reopened.get(key, "employee:1", "2026-02-02") == "answer"
+    assert reopened.stats()["hits"] == 1
+
+
+def test_key_depends_on_model_system_and_prompt():
+    keys = {
+        LLMResponseCache.key("m1", "s", "p"),
+        LLMResponseCache.key("m2", "s", "p"),
+        LLMResponseCache.key("m1", "s2", "p"),
+        LLMResponseCache.key("m1", "s", "p2"),
+    }
+    assert len(keys) == 4
+
+
+def test_ttl_expiry(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "c.sqlite3"), ttl_seconds=0.01)
+    cache.put("k", "v")
+    time.sleep(0.02)
+    assert cache.get("k") is None
+
+
+def test_lru_bound_in_memory_and_on_disk(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    cache = LLMResponseCache(path, max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # "b" is now least recently used
+    cache.put("c", "3")
+    assert cache.stats()["entries"] == 2
+    cache.close()
+
+    reopened = LLMResponseCache(path, max_entries=2)
+    assert reopened.get("b") is None
+    assert reopened.get("a") == "1" and reopened.get("c") == "3"
+
+
+def test_new_week_invalidates_employee_scope(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "c.sqlite3"))
+    cache.put("agenda", "old", "employee:1", "2026-02-02")
+    cache.put("review", "old", "employee:1", "2026-02-02")
+    cache.put("other", "kept", "employee:2", "2026-02-02")
+
+    assert cache.get("unrelated-new-prompt", "employee:1", "2026-02-09") is None
+    assert cache.get("agenda", "employee:1", "2026-02-09") is None
+    assert cache.get("review", "employee:1", "2026-02-09") is None
+    assert cache.get("other", "employee:2", "2026-02-02") == "kept"
+
+
+@pytest.mark.asyncio
+async def test_repeat_questions_served_from_cache(client, monkeypatch):
+    calls = []
+
+    async def fake_generate(prompt: str, system: str = "", priority: str = "interactive", **options) -> str:
+        calls.append(prompt)
+        return json.dumps({
+            "questions": ["How is the week going?"],
+            "listening_cues": ["Energy"],
+            "follow_up_actions": ["Recap"],
+            "context_notes": ["Signals"],
+        })
+
+    monkeypatch.setattr(ollama, "generate", fake_generate)
+    llm_cache.clear()
+
+    await client.post("/sync/run")
+    emp_id = (await client.get("/employees")).json()[0]["id"]
+    first = (await client.get(f"/employees/{emp_id}/questions")).json()
+    second = (await client.get(f"/employees/{emp_id}/questions")).json()
+
+    assert first["generated_by"] == second["generated_by"] == "ollama"
+    assert first == second
+    assert len(calls) == 1
+
+    await client.delete(f"/employees/{emp_id}/data")
+    assert llm_cache.stats()["entries"] == 0
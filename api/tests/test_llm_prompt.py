@@ -0,0 +1,86 @@
+"""Tests for the compact, token-budgeted prompt builder."""
+
+import json
+
+import pytest
+
+from app.llm_prompt import build_prompt, compact_line, estimate_tokens, parse_json_object, trend_directions
+from app.ollama_client import OllamaClient, ollama
+from app.services.questions import QUESTIONS_NUM_PREDICT, QUESTIONS_TOKEN_BUDGET, _parse_questions, _questions_prompt
+from app.services.reviews import REVIEW_NUM_PREDICT, REVIEW_TOKEN_BUDGET, _review_prompt
+from app.scoring.scorer import compute_all_scores
+from app.signals.compute import compute_all_trends
+from app.signals.generate_demo import generate_weekly_signals
+
+
+def test_compact_line_formats_numbers_tersely():
+    line = compact_line("scores", {"burnout_risk": 62.345, "ratio": 0.25, "blocks": 3, "hours": 4.0})
+    assert line == "scores: burnout_risk=62 ratio=0.25 blocks=3 hours=4"
+
+
+def test_trend_directions_skips_stable():
+    trends = {
+        "meeting_hours": {"direction": "increasing"},
+        "focus_blocks": {"direction": "decreasing"},
+        "tasks_completed": {"direction": "stable"},
+    }
+    assert trend_directions(trends) == {"meeting_hours": "up", "focus_blocks": "down"}
+
+
+def test_budget_drops_least_important_sections_first():
+    sections = [("scores", {"a": 1}), ("extra", {f"k{i}": i for i in range(100)})]
+    spec = build_prompt("sys", "task", sections, {"x": "y"}, budget=40, num_predict=100)
+    assert "scores: a=1" in spec.prompt
+    assert "extra:" not in spec.prompt
+    assert spec.tokens <= 40
+    assert spec.num_predict == 100
+
+
+def test_service_prompts_fit_budget_and_cap_output():
+    signals = generate_weekly_signals("overloaded", num_weeks=8, seed=7)[::-1]
+    scores = compute_all_scores(signals)
+    review = _review_prompt("Ada", "2026-01-05 to 2026-02-02", signals, scores, compute_all_trends(signals))
+    assert review.tokens <= REVIEW_TOKEN_BUDGET
+    assert review.num_predict == REVIEW_NUM_PREDICT
+    assert "scores: burnout_risk=" in review.prompt
+
+    agenda = _questions_prompt("Ada", {s["score_name"]: s["score"] for s in scores}, signals[0])
+    assert agenda.tokens <= QUESTIONS_TOKEN_BUDGET
+    assert agenda.num_predict == QUESTIONS_NUM_PREDICT
+    assert estimate_tokens(agenda.prompt) < 200
+
+
+def test_json_mode_parsing_is_strict():
+    assert parse_json_object('{"a": 1}') == {"a": 1}
+    assert parse_json_object("[1, 2]") is None
+    assert parse_json_object('Sure! {"questions": []}') is None
+    agenda = _parse_questions("Ada", json.dumps({"questions": ["Q?"], "listening_cues": []}))
+    assert agenda.questions == ["Q?"] and agenda.generated_by == "ollama"
+
+
+def test_payload_sets_json_format_and_num_predict():
+    client = OllamaClient()
+    payload = client._payload("p", "s", False, json_mode=True, num_predict=400)
+    assert payload["format"] == "json"
+    assert payload["options"]["num_predict"] == 400
+    plain = client._payload("p", "s", False)
+    assert "format" not in plain and plain["options"]["num_predict"] == OllamaClient.NUM_PREDICT
+
+
+@pytest.mark.asyncio
+async def test_services_request_json_mode(client, monkeypatch):
+    seen = []
+
+    async def fake_generate(prompt, system="", priority="interactive", **options):
+        seen.append(options)
+        return None
+
+    monkeypatch.setattr(ollama, "generate", fake_generate)
+    await client.post("/sync/run")
+    emp_id = (await client.get("/employees")).json()[0]["id"]
+    await client.get(f"/employees/{emp_id}/questions")
+    await client.post(f"/employees/{emp_id}/review-draft")
+    assert seen == [
+        {"json_mode": True, "num_predict": QUESTIONS_NUM_PREDICT},
+        {"json_mode": True, "num_predict": REVIEW_NUM_PREDICT},
+    ]
@@ -0,0 +1,124 @@
+"""Tests for the prioritized, bounded LLM work queue."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.ollama_client import LLMQueue, OllamaClient
+
+INTERACTIVE, BATCH = LLMQueue.INTERACTIVE, LLMQueue.BATCH
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_is_enforced():
+    queue = LLMQueue(concurrency=2)
+    running, peak = 0, 0
+
+    async def job():
+        nonlocal running, peak
+        async with queue.slot() as admitted:
+            assert admitted
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(job() for _ in range(6)))
+    assert peak == 2
+    assert queue.stats()["active"] == 0
+    assert queue.admitted == 6
+
+
+@pytest.mark.asyncio
+async def test_interactive_jumps_ahead_of_batch():
+    queue = LLMQueue(concurrency=1)
+    order = []
+    assert await queue.acquire(BATCH)
+
+    async def job(name, priority):
+        assert await queue.acquire(priority)
+        order.append(name)
+        queue.release()
+
+    batch = [asyncio.create_task(job(f"batch{i}", BATCH)) for i in range(2)]
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(job("interactive", INTERACTIVE))
+    await asyncio.sleep(0)
+    assert queue.depth(BATCH) == 2 and queue.depth(INTERACTIVE) == 1
+
+    queue.release()
+    await asyncio.gather(*batch, interactive)
+    assert order == ["interactive", "batch0", "batch1"]
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_expected_wait_exceeds_deadline():
+    queue = LLMQueue(concurrency=1, deadline=5.0)
+    queue.avg_service = 10.0
+    assert await queue.acquire()
+    assert queue.expected_wait() == 10.0
+    assert await queue.acquire() is False
+    assert queue.rejected == 1
+    # Batch work has no deadline by default and simply waits its turn
+    waiter = asyncio.create_task(queue.acquire(BATCH))
+    await asyncio.sleep(0)
+    queue.release()
+    assert await waiter is True
+
+
+@pytest.mark.asyncio
+async def test_gives_up_once_deadline_passes_in_queue():
+    queue = LLMQueue(concurrency=1, deadline=0.05)
+    assert await queue.acquire()
+    assert await queue.acquire() is False
+    assert queue.rejected == 1 and queue.depth() == 0
+    queue.release()
+    assert queue.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    queue = LLMQueue(concurrency=1)
+    assert await queue.acquire()
+    waiter = asyncio.create_task(queue.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    queue.release()
+    assert queue.active == 0
+    assert await queue.acquire()
+
+
+@pytest.mark.asyncio
+async def test_ollama_client_runs_one_generation_at_a_time():
+    running, peak = 0, 0
+
+    async def handler(req):
+        nonlocal running, peak
+        if req.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": []})
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return httpx.Response(200, json={"response": json.loads(req.content)["prompt"]})
+
+    client = OllamaClient(transport=httpx.MockTransport(handler))
+    client.base_url = "http://ollama.test"
+    client.queue = LLMQueue(concurrency=1, deadline=5.0)
+    prompts = [f"p{i}" for i in range(4)]
+    assert await asyncio.gather(*(client.generate(p) for p in prompts)) == prompts
+    assert peak == 1
+    stats = client.stats()["queue"]
+    assert stats["admitted"] == 4 and stats["depth"] == 0
+    assert stats["avg_wait_s"] > 0 and stats["avg_service_s"] > 0
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_health_reports_queue(client):
+    resp = await client.get("/health")
+    queue = resp.json()["llm"]["queue"]
+    assert {"depth", "active", "avg_wait_s", "rejected"} <= queue.keys()
@@ -0,0 +1,87 @@
+"""Tests for mail metadata → response-time bucketing."""
+
+from datetime import date
+
+import numpy as np
+
+from app.signals.mail import MailAggregator, to_epoch_seconds
+
+WEEK = date(2026, 2, 2)  # Monday
+
+
+def _in(ts: str) -> dict:
+    return {"receivedDateTime": ts, "sentDateTime": ts, "isRead": True}
+
+
+def _out(ts: str) -> dict:
+    return {"sentDateTime": ts, "receivedDateTime": ts}
+
+
+class TestMailAggregator:
+    def test_fast_replies(self):
+        agg = MailAggregator(WEEK)
+        agg.add_inbound([_in("2026-02-02T10:00:00Z"), _in("2026-02-03T11:00:00Z")])
+        agg.add_outbound([_out("2026-02-02T10:15:00Z"), _out("2026-02-03T11:30:00Z")])
+        result = agg.finalize()
+        assert result["response_time_bucket"] == "fast"
+        assert result["replies_paired"] == 2
+        assert result["reply_latency_p50_min"] == 22.5
+
+    def test_slow_replies(self):
+        agg = MailAggregator(WEEK)
+        agg.add_inbound([_in("2026-02-02T09:30:00Z")])
+        agg.add_outbound([_out("2026-02-02T16:00:00Z")])
+        assert agg.finalize()["response_time_bucket"] == "slow"
+
+    def test_latency_counts_working_minutes_only(self):
+        # 17:50 Monday → 09:10 Tuesday is 20 working minutes
+        agg = MailAggregator(WEEK)
+        agg.add_inbound([_in("2026-02-02T17:50:00Z")])
+        agg.add_outbound([_out("2026-02-03T09:10:00Z")])
+        assert agg.reply_latencies().tolist() == [20]
+
+    def test_each_inbound_answered_once(self):
+        agg = MailAggregator(WEEK)
+        agg.add_inbound([_in("2026-02-02T10:00:00Z")])
+        agg.add_outbound([_out("2026-02-02T10:05:00Z"), _out("2026-02-02T15:00:00Z")])
+        assert agg.reply_latencies().tolist() == [5]
+
+    def test_second_send_answers_the_previous_unanswered_message(self):
+        agg = MailAggregator(WEEK)
+        agg.add_inbound([_in("2026-02-02T10:00:00Z"), _in("2026-02-02T10:30:00Z")])
+        agg.add_outbound([_out("2026-02-02T10:40:00Z"), _out("2026-02-02T11:00:00Z"), _out("2026-02-02T11:05:00Z")])
+        assert agg.reply_latencies().tolist() == [10, 60]
+
+    def test_messages_in_the_same_minute_are_answered_separately(self):
+        agg = MailAggregator(WEEK)
+        agg.add_inbound([_in("2026-02-02T10:00:00Z"), _in("2026-02-02T10:00:30Z")])
+        agg.add_outbound([_out("2026-02-02T10:20:00Z"), _out("2026-02-02T10:45:00Z")])
+        assert agg.reply_latencies().tolist() == [20, 45]
+
+    def test_replies_after_the_window_are_unpaired(self):
+        agg = MailAggregator(WEEK)
+        agg.add_inbound([_in("2026-02-02T10:00:00Z")])
+        agg.add_outbound([_out("2026-02-05T10:00:00Z")])
+        assert agg.reply_latencies().tolist() == []
+
+    def test_no_mail_is_normal(self):
+        result = MailAggregator(WEEK).finalize()
+        assert result["response_time_bucket"] == "normal"
+        assert result["after_hours_sent"] == 0
+
+    def test_after_hours_sends_use_timezone(self):
+        # 23:30 UTC Monday is 18:30 in New York
+        sends = [_out("2026-02-02T23:30:00Z"), _out("2026-02-03T15:00:00Z")]
+        ny = MailAggregator(WEEK, 9, 18, "America/New_York")
+        ny.add_outbound(sends)
+        assert ny.finalize()["after_hours_sent"] == 1
+
+    def test_streaming_pages_bounded_state(self):
+        agg = MailAggregator(WEEK)
+        base = to_epoch_seconds(["2026-02-02T09:00:00Z"])[0]
+        times = base + np.arange(0, 5 * 24 * 3600, 97)
+        stamps = np.datetime_as_string(times.astype("datetime64[s]")).tolist()
+        for i in range(0, len(stamps), 500):
+            agg.add_inbound([{"receivedDateTime": t + "Z"} for t in stamps[i:i + 500]])
+        assert agg.finalize()["inbound_count"] == len(stamps)
+        assert agg._inbound.nbytes == agg._outbound.nbytes == 7 * 24 * 60 * 4
@@ -0,0 +1,203 @@
+"""Tests for the raw metadata spool and re-aggregation from it."""
+
+from datetime import date, timedelta
+
+import httpx
+import numpy as np
+import pytest
+from sqlalchemy import delete, select
+
+from app.config import get_settings
+from app.graph_client import GraphClient
+from app.signals.spool import (
+    INBOUND, SENT, SpoolWriter, erase_person, load_week, purge_expired, purge_spool, reaggregate_spool,
+    spooled_weeks,
+)
+from tests.fake_graph import FakeGraph
+
+WEEK = date(2026, 2, 2)
+
+
+def _event(start: str, end: str, attendees=("b@x.demo",), **extra) -> dict:
+    event = {
+        "start": {"dateTime": f"2026-02-02T{start}:00.0000000", "timeZone": "UTC"},
+        "end": {"dateTime": f"2026-02-02T{end}:00.0000000", "timeZone": "UTC"},
+        "organizer": {"emailAddress": {"address": "A@x.demo"}},
+        "attendees": [{"emailAddress": {"address": a}, "status": {"response": "accepted"}} for a in attendees],
+        "showAs": "busy",
+    }
+    event.update(extra)
+    return event
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "metadata_spool_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_round_trip_keeps_only_metadata_columns(tmp_path):
+    writer = SpoolWriter(tmp_path, WEEK)
+    writer.add(
+        "a@x.demo",
+        [
+            _event("10:00", "11:00"),
+            _event("12:00", "13:00", showAs="free"),
+            _event("14:00", "15:00", attendees=(), subject="CONFIDENTIAL"),
+            _event("16:00", "17:00", responseStatus={"response": "declined"}),
+        ],
+        [{"receivedDateTime": "2026-02-02T09:00:00Z", "isRead": True}],
+        [{"sentDateTime": "2026-02-02T09:30:00Z"}, {"sentDateTime": "2026-02-02T22:00:00Z"}],
+    )
+    path = writer.flush()
+    assert path is not None and path.suffix == ".npz"
+    assert b"CONFIDENTIAL" not in path.read_bytes()
+
+    week = load_week(tmp_path, WEEK)
+    assert week.roster.tolist() == ["a@x.demo"]
+    assert week.event_count == 4 and week.message_count == 3
+    assert week.busy_mask().tolist() == [True, False, False, False]
+    assert sorted(week.people[week.attendees(0)].tolist()) == ["b@x.demo"]
+    assert week.people[week.cal_organizer[0]] == "a@x.demo"
+    assert (week.mail_direction == INBOUND).sum() == 1
+    assert (week.mail_direction == SENT).sum() == 2
+
+
+def test_newest_run_wins_per_employee(tmp_path):
+    first = SpoolWriter(tmp_path, WEEK, run=1)
+    first.add("a@x.demo", [_event("10:00", "11:00"), _event("12:00", "13:00")], [], [])
+    first.add("c@x.demo", [_event("10:00", "11:00")], [], [])
+    first.flush()
+    second = SpoolWriter(tmp_path, WEEK, run=2)
+    second.add("a@x.demo", [_event("15:00", "16:00")], [], [])  # c's fetch failed in run 2
+    second.flush()
+
+    week = load_week(tmp_path, WEEK)
+    by_owner = dict(zip(week.roster.tolist(), np.bincount(week.cal_owner, minlength=2).tolist()))
+    assert by_owner == {"a@x.demo": 1, "c@x.demo": 1}
+
+
+def test_segments_split_at_flush_threshold(tmp_path):
+    writer = SpoolWriter(tmp_path, WEEK, flush_rows=3)
+    for i in range(4):
+        writer.add(f"u{i}@x.demo", [_event("10:00", "11:00"), _event("12:00", "13:00")], [], [])
+    writer.flush()
+    assert len(writer.segments) == 2
+    assert load_week(tmp_path, WEEK).event_count == 8
+
+
+def test_purge_expired_respects_retention(tmp_path):
+    for week in (date(2026, 1, 5), date(2026, 3, 2)):
+        writer = SpoolWriter(tmp_path, week)
+        writer.add("a@x.demo", [], [{"receivedDateTime": "2026-01-05T09:00:00Z"}], [])
+        writer.flush()
+    purged = purge_expired(tmp_path, retention_days=30, today=date(2026, 3, 10))
+    assert purged == [date(2026, 1, 5)]
+    assert spooled_weeks(tmp_path) == [date(2026, 3, 2)]
+
+
+@pytest.mark.asyncio
+async def test_cli_purge_uses_the_retention_window_of_the_retention_service(db_session, spool_dir):
+    from app.models import AppSettings
+    from app.services.retention import reference_day
+
+    old = reference_day() - timedelta(days=200)  # past the 90-day default
+    writer = SpoolWriter(spool_dir, old)
+    writer.add("a@x.demo", [], [], [])
+    writer.flush()
+    settings = AppSettings(id=1, data_retention_days=365)
+    db_session.add(settings)
+    await db_session.commit()
+    assert await purge_spool(db_session) == []
+
+    settings.data_retention_days = 30
+    await db_session.commit()
+    assert await purge_spool(db_session) == [old]
+
+
+@pytest.mark.asyncio
+async def test_cli_reaggregate_refreshes_snapshots_and_the_response_cache(db_session, monkeypatch):
+    import app.services.snapshots as snapshots
+    import app.signals.ingest as ingest
+    from app.response_cache import response_cache
+
+    processed = {WEEK: 3, WEEK + timedelta(weeks=1): 0}
+    refreshed = []
+
+    async def fake_reaggregate(db, week):
+        return {"employees_processed": processed[week], "weeks_generated": processed[week], "failed": 0}
+
+    async def fake_refresh(db):
+        refreshed.append(1)
+        return 0
+
+    monkeypatch.setattr(ingest, "reaggregate_week", fake_reaggregate)
+    monkeypatch.setattr(snapshots, "refresh_snapshots", fake_refresh)
+    generation = await response_cache.generation()
+
+    await reaggregate_spool(db_session, [WEEK + timedelta(weeks=1)])  # nothing rebuilt
+    assert refreshed == [] and await response_cache.generation() == generation
+    await reaggregate_spool(db_session, list(processed))
+    assert refreshed == [1] and await response_cache.generation() == generation + 1
+
+
+def test_erase_person_removes_rows_and_address(tmp_path):
+    writer = SpoolWriter(tmp_path, WEEK)
+    writer.add("a@x.demo", [_event("10:00", "11:00")], [{"receivedDateTime": "2026-02-02T09:00:00Z"}], [])
+    writer.add("b@x.demo", [_event("10:00", "11:00")], [], [])
+    writer.flush()
+
+    assert erase_person(tmp_path, "A@x.demo") == 1
+    week = load_week(tmp_path, WEEK)
+    assert "a@x.demo" not in week.roster.tolist()
+    assert "a@x.demo" not in week.people.tolist()
+    assert week.event_count == 1 and week.message_count == 0
+    assert week.people[week.attendees(0)].tolist() == ["b@x.demo"]
+
+
+@pytest.mark.asyncio
+async def test_reaggregate_rebuilds_signals_without_graph(db_session, spool_dir):
+    from app.models import AppSettings, CollaborationBottleneck, Employee, Team, WeeklySignal
+    from app.signals.ingest import ingest_graph_week, reaggregate_week
+
+    fake = FakeGraph(org_size=24, team_size=8)
+    teams = {}
+    for u in fake.users:
+        if u.team not in teams:
+            teams[u.team] = Team(name=u.team)
+            db_session.add(teams[u.team])
+            await db_session.flush()
+        db_session.add(Employee(name=u.name, email=u.email, team_id=teams[u.team].id))
+    # The fixed fake week is older than the default 90-day retention
+    db_session.add(AppSettings(id=1, timezone="UTC", data_retention_days=3650))
+    await db_session.commit()
+
+    client = GraphClient(transport=httpx.ASGITransport(app=fake.app))
+    client.tenant_id = "fake-tenant"
+    await ingest_graph_week(db_session, fake.week_start, client=client)
+    await client.aclose()
+    assert spooled_weeks(spool_dir) == [fake.week_start]
+
+    columns = (
+        "meeting_hours", "meeting_count", "avg_meeting_length_min", "focus_blocks",
+        "fragmentation_score", "after_hours_events", "response_time_bucket",
+        "unique_collaborators", "cross_team_ratio",
+    )
+
+    async def snapshot():
+        rows = (await db_session.execute(select(WeeklySignal))).scalars().all()
+        bottlenecks = (await db_session.execute(select(CollaborationBottleneck))).scalars().all()
+        return (
+            {r.employee_id: tuple(getattr(r, c) for c in columns) for r in rows},
+            sorted((b.employee_id, b.betweenness) for b in bottlenecks),
+        )
+
+    before = await snapshot()
+    requests = fake.stats.requests
+    await db_session.execute(delete(WeeklySignal))
+    await db_session.commit()
+
+    result = await reaggregate_week(db_session, fake.week_start)
+    assert result == {"employees_processed": 24, "weeks_generated": 24, "failed": 0}
+    assert await snapshot() == before
+    assert fake.stats.requests == requests  # nothing re-fetched
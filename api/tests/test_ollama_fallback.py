@@ -1,7 +1,12 @@
 """Tests for Ollama client fallback behavior."""
 
+import asyncio
+import json
+import time
+
+import httpx
 import pytest
-from app.ollama_client import OllamaClient
+from app.ollama_client import CircuitBreaker, OllamaClient
 
 
 class TestOllamaFallback:
@@ -52,3 +57,230 @@ class TestOllamaFallback:
         resp = await client.post(f"/employees/{emps[0]['id']}/review-draft")
         assert resp.status_code == 200
         assert resp.json()["generated_by"] == "template"
+
+
+def _mock_ollama(handler) -> OllamaClient:
+    client = OllamaClient(transport=httpx.MockTransport(handler))
+    client.base_url = "http://ollama.test"
+    return client
+
+
+class TestOllamaPoolAndBreaker:
+    """Pooled client, TTL re-probing and the circuit breaker."""
+
+    @pytest.mark.asyncio
+    async def test_http_client_is_pooled(self):
+        client = _mock_ollama(lambda req: httpx.Response(200, json={"response": "ok", "models": []}))
+        assert await client.generate("a") == "ok"
+        pooled = client._http()
+        assert await client.generate("b") == "ok"
+        assert client._http() is pooled
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_breaker_opens_after_consecutive_failures(self):
+        calls = []
+
+        def handler(req):
+            calls.append(req.url.path)
+            if req.url.path == "/api/tags":
+                return httpx.Response(200, json={"models": []})
+            return httpx.Response(500)
+
+        client = _mock_ollama(handler)
+        for _ in range(OllamaClient.FAILURE_THRESHOLD):
+            assert await client.generate("x") is None
+        assert client.breaker.state == CircuitBreaker.OPEN
+        assert await client.is_available() is False
+
+        before = len(calls)
+        started = time.perf_counter()
+        assert await client.generate("x") is None
+        assert time.perf_counter() - started < 0.01
+        assert len(calls) == before  # failed over without touching the network
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_half_open_trial_closes_breaker(self):
+        healthy = False
+
+        def handler(req):
+            if req.url.path == "/api/generate" and not healthy:
+                return httpx.Response(503)
+            return httpx.Response(200, json={"response": "back", "models": []})
+
+        client = _mock_ollama(handler)
+        client.breaker.reset_seconds = 0.0
+        for _ in range(OllamaClient.FAILURE_THRESHOLD):
+            await client.generate("x")
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+        healthy = True
+        assert await client.generate("x") == "back"
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        assert client.stats()["circuit_trips"] == 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_closed_during_half_open_trial_releases_it(self):
+        lines = [{"response": "tok", "done": False}, {"response": "", "done": True}]
+
+        def handler(req):
+            if req.url.path == "/api/tags":
+                return httpx.Response(200, json={"models": []})
+            if not json.loads(req.content)["stream"]:
+                return httpx.Response(200, json={"response": "back"})
+            return httpx.Response(200, content="\n".join(json.dumps(x) for x in lines).encode())
+
+        client = _mock_ollama(handler)
+        client.breaker.reset_seconds = 0.0
+        for _ in range(OllamaClient.FAILURE_THRESHOLD):
+            client.breaker.record_failure()
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+        stream = client.generate_stream("x")
+        assert await anext(stream) == "tok"  # claims the half-open trial
+        await stream.aclose()  # client disconnected mid-stream
+        assert client.breaker.state == CircuitBreaker.HALF_OPEN
+        assert client.queue.active == 0
+
+        assert await client.generate("x") == "back"  # a new trial may go out
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stale_availability_is_reprobed_in_background(self):
+        client = _mock_ollama(lambda req: httpx.Response(200, json={"models": []}))
+        client._available = False
+        client._checked_at = time.monotonic() - OllamaClient.UNAVAILABLE_TTL - 1
+
+        assert await client.is_available() is False  # cached answer, no waiting
+        await client._probe_task
+        assert await client.is_available() is True
+        await client.aclose()
+
+
+class TestOllamaSingleFlight:
+    """Identical concurrent generations share one Ollama request."""
+
+    @staticmethod
+    def _slow_client(calls: list) -> OllamaClient:
+        async def handler(req):
+            if req.url.path == "/api/tags":
+                return httpx.Response(200, json={"models": []})
+            calls.append(json.loads(req.content)["prompt"])
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"response": "shared"})
+
+        return _mock_ollama(handler)
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_are_coalesced(self):
+        calls = []
+        client = self._slow_client(calls)
+        results = await asyncio.gather(*(client.generate("same", "sys") for _ in range(5)))
+        assert results == ["shared"] * 5
+        assert calls == ["same"]
+        stats = client.stats()
+        assert stats["generations"] == 1
+        assert stats["coalesced"] == 4
+        assert stats["in_flight"] == 0
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_different_prompts_are_not_coalesced(self):
+        calls = []
+        client = self._slow_client(calls)
+        await asyncio.gather(client.generate("a"), client.generate("b"), client.generate("a", "other system"))
+        assert sorted(calls) == ["a", "a", "b"]
+        assert client.coalesced == 0
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_followers(self):
+        calls = []
+        client = self._slow_client(calls)
+        leader = asyncio.create_task(client.generate("p"))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(client.generate("p"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == "shared"
+        assert len(calls) == 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_generation_is_cancelled_when_every_caller_leaves(self):
+        calls = []
+        client = self._slow_client(calls)
+        callers = [asyncio.create_task(client.generate("p")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert client.queue.active == 1
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        stats = client.stats()
+        assert stats["in_flight"] == 0
+        assert stats["queue"]["active"] == 0
+        assert client._waiters == {}
+        await client.aclose()
+
+
+class TestOllamaWarmup:
+    """Startup warm-up, keep_alive on requests and the background keeper."""
+
+    @staticmethod
+    def _recording_client(bodies: list) -> OllamaClient:
+        def handler(req):
+            if req.url.path == "/api/tags":
+                return httpx.Response(200, json={"models": []})
+            bodies.append(json.loads(req.content))
+            return httpx.Response(200, json={"response": "ok", "done": True})
+
+        return _mock_ollama(handler)
+
+    @pytest.mark.asyncio
+    async def test_warm_up_loads_model_with_empty_prompt(self):
+        bodies = []
+        client = self._recording_client(bodies)
+        assert await client.warm_up() is True
+        assert bodies == [{"model": client.model, "prompt": "", "stream": False, "keep_alive": client.keep_alive}]
+        assert client.stats()["warmups"] == 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_generation_requests_carry_keep_alive(self):
+        bodies = []
+        client = self._recording_client(bodies)
+        await client.generate("hi")
+        assert bodies[0]["keep_alive"] == client.keep_alive
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_warm_up_without_ollama_is_harmless(self):
+        client = _mock_ollama(lambda req: httpx.Response(503))
+        assert await client.warm_up() is False
+        assert client.warmups == 0
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_keeper_rewarms_before_eviction(self):
+        bodies = []
+        client = self._recording_client(bodies)
+        client.keep_alive = 0.05
+        client.start_keeper()
+        await asyncio.sleep(0.2)
+        assert client.warmups >= 3
+        await client.aclose()
+        settled = client.warmups
+        await asyncio.sleep(0.1)
+        assert client.warmups == settled
+
+    @pytest.mark.asyncio
+    async def test_keeper_disabled_for_permanent_keep_alive(self):
+        client = self._recording_client([])
+        client.keep_alive = -1
+        client.start_keeper()
+        assert client._keeper_task is None
+        await client.aclose()
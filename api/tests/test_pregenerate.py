@@ -0,0 +1,139 @@
+"""Tests for overnight pre-generation of agendas and review drafts."""
+
+import json
+import uuid
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.llm_cache import llm_cache
+from app.models import EmployeeScore, PregeneratedDraft
+from app.ollama_client import ollama
+from app.services.pregenerate import _latest_scores, score_fingerprint
+from app.services.reviews import _review_period
+
+AGENDA = {
+    "questions": ["How is the week going?"],
+    "listening_cues": ["Energy"],
+    "follow_up_actions": ["Recap"],
+    "context_notes": ["Signals"],
+}
+REVIEW = {
+    "highlights": ["Shipped"],
+    "growth_areas": ["Delegation"],
+    "risks": ["Load"],
+    "suggested_goals": ["Mentor"],
+    "summary": "Solid month.",
+}
+
+
+@pytest.fixture
+def fake_ollama(monkeypatch):
+    calls = []
+
+    async def fake_generate(prompt: str, system: str = "", priority: str = "interactive", **options) -> str:
+        calls.append(priority)
+        return json.dumps(REVIEW if "review" in prompt else AGENDA)
+
+    async def available() -> bool:
+        return True
+
+    monkeypatch.setattr(ollama, "generate", fake_generate)
+    monkeypatch.setattr(ollama, "is_available", available)
+    llm_cache.clear()
+    yield calls
+    llm_cache.clear()  # the fake's answers must not leak into later tests
+
+
+@pytest.mark.asyncio
+async def test_pregenerates_through_batch_queue_and_serves_stored(client, fake_ollama):
+    await client.post("/sync/run")
+    employees = (await client.get("/employees")).json()
+
+    summary = (await client.post("/sync/pregenerate")).json()
+    assert summary["employees_changed"] == len(employees)
+    assert summary["drafts_generated"] == 2 * len(employees)
+    assert set(fake_ollama) == {"batch"}
+
+    # Served from the table: no generation, even with the response cache empty
+    fake_ollama.clear()
+    llm_cache.clear()
+    emp_id = employees[0]["id"]
+    agenda = (await client.get(f"/employees/{emp_id}/questions")).json()
+    review = (await client.post(f"/employees/{emp_id}/review-draft")).json()
+    assert agenda["generated_by"] == review["generated_by"] == "ollama"
+    assert agenda["questions"] == AGENDA["questions"]
+    assert review["summary"] == REVIEW["summary"]
+    stream = (await client.get(f"/employees/{emp_id}/questions/stream")).text
+    assert "event: token" not in stream and "event: result" in stream
+    assert fake_ollama == []
+
+
+@pytest.mark.asyncio
+async def test_only_changed_scores_are_regenerated(client, db_session, fake_ollama):
+    await client.post("/sync/run")
+    await client.post("/sync/pregenerate")
+    again = (await client.post("/sync/pregenerate")).json()
+    assert again["employees_changed"] == 0 and again["drafts_generated"] == 0
+
+    score = (await db_session.execute(select(EmployeeScore))).scalars().first()
+    await db_session.execute(
+        update(EmployeeScore).where(EmployeeScore.id == score.id).values(burnout_risk=score.burnout_risk + 7)
+    )
+    await db_session.commit()
+    changed = (await client.post("/sync/pregenerate")).json()
+    assert changed["employees_changed"] == 1 and changed["drafts_generated"] == 2
+
+
+@pytest.mark.asyncio
+async def test_skips_when_ollama_unavailable(client, db_session):
+    await client.post("/sync/run")
+    summary = (await client.post("/sync/pregenerate")).json()
+    assert summary["ollama_available"] is False
+    assert summary["drafts_generated"] == 0
+    assert (await db_session.execute(select(PregeneratedDraft))).scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_stored_drafts(client, db_session, fake_ollama):
+    await client.post("/sync/run")
+    await client.post("/sync/pregenerate")
+    emp_id = (await client.get("/employees")).json()[0]["id"]
+    await client.delete(f"/employees/{emp_id}/data")
+    drafts = (await db_session.execute(select(PregeneratedDraft))).scalars().all()
+    assert drafts and all(str(d.employee_id) != emp_id for d in drafts)
+
+
+@pytest.mark.asyncio
+async def test_stored_review_is_served_with_the_current_period(client, db_session, fake_ollama):
+    await client.post("/sync/run")
+    await client.post("/sync/pregenerate")
+    emp_id = (await client.get("/employees")).json()[0]["id"]
+    draft = (await db_session.execute(
+        select(PregeneratedDraft).where(PregeneratedDraft.kind == "review")
+        .where(PregeneratedDraft.employee_id == uuid.UUID(emp_id))
+    )).scalar_one()
+    await db_session.execute(
+        update(PregeneratedDraft).where(PregeneratedDraft.id == draft.id)
+        .values(payload={**draft.payload, "period": "2020-01-01 to 2020-01-29"})
+    )
+    await db_session.commit()
+
+    fake_ollama.clear()
+    review = (await client.post(f"/employees/{emp_id}/review-draft")).json()
+    assert fake_ollama == [] and review["summary"] == REVIEW["summary"]
+    assert review["period"] == _review_period()
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_comes_from_the_newest_score_week(client, db_session):
+    await client.post("/sync/run")
+    score = (await db_session.execute(select(EmployeeScore))).scalars().first()
+    emp_id, week = score.employee_id, score.week_start
+    db_session.add(EmployeeScore(employee_id=emp_id, week_start=week - timedelta(weeks=1), burnout_risk=99.0))
+    await db_session.commit()
+
+    latest = await _latest_scores(db_session)
+    assert latest[emp_id].week_start == week
+    assert score_fingerprint(latest[emp_id]) == score_fingerprint(score)
@@ -0,0 +1,144 @@
+"""Tests for the batched purge worker (GDPR erasure and retention)."""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.config import get_settings
+from app.models import EmployeeScore, PurgeJob, WeeklySignal
+from app.services.purge import RUNNING, PurgeWorker, create_erasure_job, purge_worker
+from tests.conftest import test_session_factory as session_factory
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    cfg = get_settings()
+    monkeypatch.setattr(cfg, "purge_batch_size", 3)
+    monkeypatch.setattr(cfg, "purge_batch_pause_ms", 0)
+
+
+async def _rows(db, model, employee_id) -> int:
+    return await db.scalar(select(func.count()).select_from(model).where(model.employee_id == employee_id))
+
+
+@pytest.mark.asyncio
+async def test_erasure_runs_in_batches_and_reports_progress(client, db_session, small_batches):
+    await client.post("/sync/run")
+    emp_id = (await client.get("/employees")).json()[0]["id"]
+    batches_before = purge_worker.batches
+
+    resp = (await client.delete(f"/employees/{emp_id}/data")).json()
+    status = (await client.get(f"/sync/purge-jobs/{resp['purge_job_id']}")).json()
+
+    assert status["status"] == "done"
+    assert status["kind"] == "erasure" and status["employee_id"] == emp_id
+    assert status["tables_done"] == status["tables_total"]
+    assert status["progress"]["weekly_signals"] == 8
+    # 8 signal rows in batches of 3 → 3 batches for that table alone
+    assert purge_worker.batches - batches_before >= 3 + 2
+    assert await _rows(db_session, WeeklySignal, uuid.UUID(emp_id)) == 0
+    assert await _rows(db_session, EmployeeScore, uuid.UUID(emp_id)) == 0
+
+
+@pytest.mark.asyncio
+async def test_interrupted_job_resumes_where_it_stopped(client, db_session, small_batches):
+    await client.post("/sync/run")
+    emp_id = uuid.UUID((await client.get("/employees")).json()[0]["id"])
+
+    # A crash after the first four tables: left RUNNING, signals and scores still there
+    job = await create_erasure_job(db_session, emp_id)
+    job.status, job.step = RUNNING, 4
+    job_id = job.id
+    await db_session.commit()
+
+    assert await purge_worker.resume() == 1
+    db_session.expire_all()
+    job = await db_session.get(PurgeJob, job_id)
+    assert job.status == "done" and job.step == 6
+    assert set(job.progress) == {"employee_scores", "weekly_signals"}
+    assert await _rows(db_session, WeeklySignal, emp_id) == 0
+
+
+@pytest.mark.asyncio
+async def test_purge_job_listing_and_unknown_job(client):
+    await client.post("/sync/run")
+    emp_id = (await client.get("/employees")).json()[0]["id"]
+    await client.delete(f"/employees/{emp_id}/data")
+
+    listing = (await client.get("/sync/purge-jobs")).json()
+    assert listing["jobs"][0]["employee_id"] == emp_id
+    assert set(listing["worker"]) == {"busy", "batches", "rows_deleted", "jobs_finished"}
+    assert (await client.get(f"/sync/purge-jobs/{uuid.uuid4()}")).status_code == 404
+
+
+async def _held_job(db, emp_id, owner: str, heartbeat_age: float) -> uuid.UUID:
+    job = await create_erasure_job(db, emp_id)
+    job.status, job.owner = RUNNING, owner
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=heartbeat_age)
+    await db.commit()
+    return job.id
+
+
+@pytest.mark.asyncio
+async def test_job_held_by_a_live_worker_is_left_alone(client, db_session, small_batches):
+    await client.post("/sync/run")
+    emp_id = uuid.UUID((await client.get("/employees")).json()[0]["id"])
+    job_id = await _held_job(db_session, emp_id, "other-host:42:abc", heartbeat_age=1)
+
+    assert await purge_worker.resume() == 0
+    db_session.expire_all()
+    job = await db_session.get(PurgeJob, job_id)
+    assert job.status == RUNNING and job.owner == "other-host:42:abc" and job.progress == {}
+    assert await _rows(db_session, WeeklySignal, emp_id) == 8
+
+
+@pytest.mark.asyncio
+async def test_job_of_a_dead_worker_is_taken_over(client, db_session, small_batches):
+    await client.post("/sync/run")
+    emp_id = uuid.UUID((await client.get("/employees")).json()[0]["id"])
+    job_id = await _held_job(db_session, emp_id, "gone:1:abc", heartbeat_age=PurgeWorker.STALE_SECONDS + 1)
+
+    assert await purge_worker.resume() == 1
+    db_session.expire_all()
+    job = await db_session.get(PurgeJob, job_id)
+    assert job.status == "done" and job.owner == purge_worker.worker_id
+
+
+@pytest.mark.asyncio
+async def test_a_claimed_job_runs_in_one_worker_only(client, db_session, small_batches):
+    await client.post("/sync/run")
+    emp_id = uuid.UUID((await client.get("/employees")).json()[0]["id"])
+    job_id = (await create_erasure_job(db_session, emp_id)).id
+    await db_session.commit()
+
+    first, second = PurgeWorker(), PurgeWorker()
+    async with session_factory() as db:
+        assert await first._claim(db, job_id)
+        assert not await second._claim(db, job_id)
+        assert (await second.run_job(db, job_id)).status == RUNNING  # left to its owner
+        job = await first.run_job(db, job_id)
+    assert job.status == "done" and job.owner == first.worker_id
+    assert job.progress["weekly_signals"] == 8  # counted once
+
+
+@pytest.mark.asyncio
+async def test_worker_stops_when_its_job_is_taken_over(client, db_session, small_batches):
+    await client.post("/sync/run")
+    emp_id = uuid.UUID((await client.get("/employees")).json()[0]["id"])
+    job_id = (await create_erasure_job(db_session, emp_id)).id
+    await db_session.commit()
+
+    class Stalled(PurgeWorker):
+        async def _purge_table(self, db, job, model):
+            # Meanwhile another worker decided this one was dead and took the job
+            await db.execute(update(PurgeJob).where(PurgeJob.id == job.id).values(owner="thief"))
+            await db.commit()
+            await super()._purge_table(db, job, model)
+
+    async with session_factory() as db:
+        job = await Stalled().run_job(db, job_id)
+    assert job.status == RUNNING and job.owner == "thief"
+    assert job.progress == {}  # the first batch was rolled back, not recorded
+    assert await _rows(db_session, WeeklySignal, emp_id) == 8
@@ -0,0 +1,158 @@
+"""Tests for read-replica routing of the dashboard endpoints."""
+
+import math
+
+import pytest
+
+import app.db as db_module
+from app.config import get_settings
+from app.db import ReplicaRouter, get_cached_read_db, lsn_value
+from app.main import app
+from app.response_cache import response_cache
+
+from tests.conftest import TEST_DB_URL, test_session_factory as primary_factory
+
+
+@pytest.fixture
+def router():
+    routers = []
+
+    def make(*urls):
+        r = ReplicaRouter(primary_factory, list(urls))
+        routers.append(r)
+        return r
+
+    yield make
+    for r in routers:
+        for replica in r.replicas:
+            replica.engine.sync_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_without_replicas_reads_go_to_the_primary(router):
+    r = router()
+    assert await r.read_session_factory() is primary_factory
+    assert r.stats() == {"replicas": [], "reads": {"replica": 0, "primary": 1}}
+
+
+@pytest.mark.asyncio
+async def test_reads_rotate_over_healthy_replicas(router):
+    r = router(TEST_DB_URL, TEST_DB_URL)
+    first, second, third = [await r.read_session_factory() for _ in range(3)]
+    assert first is r.replicas[0].session_factory
+    assert second is r.replicas[1].session_factory
+    assert third is first
+    assert r.reads == {"replica": 3, "primary": 0}
+    assert [s["lag_seconds"] for s in r.stats()["replicas"]] == [0.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_the_primary(router, monkeypatch):
+    r = router(TEST_DB_URL)
+    replica = r.replicas[0]
+
+    async def lagging(primary_lsn=None):
+        replica.lag, replica.checked_at = 60.0, math.inf  # checked "now", never re-measured
+        return replica.lag
+
+    monkeypatch.setattr(replica, "measure_lag", lagging)
+    assert await r.read_session_factory() is primary_factory
+
+    monkeypatch.setattr(get_settings(), "replica_max_lag_seconds", 120.0)
+    assert await r.read_session_factory() is replica.session_factory
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_to_the_primary(router, tmp_path):
+    r = router(f"sqlite+aiosqlite:///{tmp_path}/missing/dir/replica.db")
+    assert await r.read_session_factory() is primary_factory
+    status = r.stats()["replicas"][0]
+    assert status["lag_seconds"] is None and status["error"]
+
+
+@pytest.mark.asyncio
+async def test_lag_is_measured_once_per_interval(router, monkeypatch):
+    r = router(TEST_DB_URL)
+    replica = r.replicas[0]
+    calls = []
+    measure = replica.measure_lag
+
+    async def counting(primary_lsn=None):
+        calls.append(1)
+        return await measure(primary_lsn)
+
+    monkeypatch.setattr(replica, "measure_lag", counting)
+    for _ in range(5):
+        await r.read_session_factory()
+    assert len(calls) == 1
+
+    monkeypatch.setattr(get_settings(), "replica_check_interval_seconds", 0.0)
+    await r.read_session_factory()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_lag_is_measured_against_the_primary_wal_position(router, monkeypatch):
+    r = router(TEST_DB_URL)
+    replica = r.replicas[0]
+    seen = []
+
+    async def primary_lsn():
+        return "0/3000060"
+
+    async def measure(primary_lsn=None):
+        seen.append(primary_lsn)
+        replica.lag, replica.checked_at = 0.0, math.inf
+        return replica.lag
+
+    assert await r.primary_lsn() is None  # SQLite has no WAL position
+    monkeypatch.setattr(r, "primary_lsn", primary_lsn)
+    monkeypatch.setattr(replica, "measure_lag", measure)
+    assert await r.read_session_factory() is replica.session_factory
+    assert seen == ["0/3000060"]
+
+
+@pytest.mark.asyncio
+async def test_cached_misses_wait_for_a_replica_past_the_bump(client, router, monkeypatch):
+    """A replica behind the last bump would cache its stale body as current."""
+    await client.post("/sync/run")
+    r = router(TEST_DB_URL)
+    replica = r.replicas[0]
+    monkeypatch.setattr(db_module, "replica_router", r)
+    monkeypatch.delitem(app.dependency_overrides, get_cached_read_db)
+    await replica.measure_lag()
+    await response_cache.bump(wal_lsn=lsn_value("0/3000060"))  # a write the replica has not replayed
+
+    replica.replay_lsn = lsn_value("0/3000000")
+    resp = await client.get("/teams")
+    assert resp.headers["x-cache"] == "miss" and r.reads == {"replica": 0, "primary": 1}
+
+    replica.replay_lsn = lsn_value("0/3000060")
+    resp = await client.get("/employees")
+    assert resp.headers["x-cache"] == "miss" and r.reads == {"replica": 1, "primary": 1}
+
+
+@pytest.mark.asyncio
+async def test_bumps_record_the_primary_wal_position(router, monkeypatch):
+    r = router(TEST_DB_URL)
+    assert await r.write_position() == 0  # SQLite has no WAL position
+
+    async def primary_lsn():
+        return "1/0"
+
+    monkeypatch.setattr(r, "primary_lsn", primary_lsn)
+    assert await r.write_position() == 1 << 32
+    assert await router().write_position() == 0  # no replica to hold back
+
+
+@pytest.mark.asyncio
+async def test_uncached_dashboard_endpoints_read_from_the_replica(client, router, monkeypatch):
+    await client.post("/sync/run")
+    r = router(TEST_DB_URL)
+    monkeypatch.setattr(db_module, "replica_router", r)
+    monkeypatch.setattr(response_cache, "enabled", False)
+    monkeypatch.delitem(app.dependency_overrides, get_cached_read_db)
+
+    for path in ("/org/overview", "/teams", "/employees"):
+        assert (await client.get(path)).status_code == 200
+    assert r.reads == {"replica": 3, "primary": 0}
@@ -0,0 +1,161 @@
+"""Tests for the dashboard response cache."""
+
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from starlette.requests import Request
+
+from app.response_cache import ResponseCache, etag_for
+from app.schemas import OrgOverview
+
+
+def _request(path: str = "/teams", query: str = "") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": []})
+
+
+@pytest.mark.asyncio
+async def test_repeat_polls_are_hits_with_a_strong_etag(client):
+    await client.post("/sync/run")
+    first = await client.get("/org/overview")
+    second = await client.get("/org/overview")
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("miss", "hit")
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"] == etag_for(first.content)
+    assert not first.headers["etag"].startswith("W/")
+    OrgOverview.model_validate_json(second.content)
+
+    resp = await client.get("/org/overview", headers={"If-None-Match": first.headers["etag"]})
+    assert resp.status_code == 304 and resp.content == b""
+
+
+@pytest.mark.asyncio
+async def test_query_params_are_part_of_the_key(client):
+    await client.post("/sync/run")
+    everyone = (await client.get("/employees")).json()
+    high = await client.get("/employees", params={"risk_filter": "High"})
+    assert high.headers["x-cache"] == "miss"
+    assert all(e["burnout_label"] == "High" for e in high.json())
+    assert len(high.json()) < len(everyone)
+    reordered = await client.get("/employees?team=Platform&risk_filter=High")
+    assert (await client.get("/employees?risk_filter=High&team=Platform")).headers["x-cache"] == "hit"
+    assert reordered.headers["x-cache"] == "miss"
+
+
+@pytest.mark.asyncio
+async def test_sync_and_settings_invalidate(client):
+    await client.post("/sync/run")
+    await client.get("/teams")
+    await client.post("/sync/run")
+    assert (await client.get("/teams")).headers["x-cache"] == "miss"
+    assert (await client.get("/teams")).headers["x-cache"] == "hit"
+    await client.post("/settings", json={"working_hours_start": 8})
+    assert (await client.get("/teams")).headers["x-cache"] == "miss"
+
+
+@pytest.mark.asyncio
+async def test_erasure_drops_the_employee_from_cached_lists(client):
+    await client.post("/sync/run")
+    employees = (await client.get("/employees")).json()
+    await client.delete(f"/employees/{employees[0]['id']}/data")
+    after = await client.get("/employees")
+    assert after.headers["x-cache"] == "miss"
+    assert employees[0]["id"] not in {e["id"] for e in after.json()}
+
+
+@pytest.mark.asyncio
+async def test_workers_share_entries_and_generation(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    a, b = ResponseCache(path), ResponseCache(path)
+    generation = await a.generation()
+    etag = await a.put("/teams?", generation, b"[]")
+    assert await b.get("/teams?", await b.generation()) == (etag, b"[]")
+
+    await b.bump(wal_lsn=42)
+    assert await a.state() == (generation + 1, 42)
+    assert await a.get("/teams?", await a.generation()) is None
+    a.close(), b.close()
+
+
+@pytest.mark.asyncio
+async def test_build_that_straddles_a_bump_is_never_served(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    started = await cache.generation()
+    await cache.bump()  # a sync finished while the response was being built
+    await cache.put("/teams?", started, b"[stale]")
+    assert await cache.get("/teams?", await cache.generation()) is None
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_entry_is_stored_under_the_generation_its_session_was_chosen_for():
+    cache = ResponseCache("")
+    request = _request()
+    request.state.response_cache_generation = await cache.generation()
+    await cache.bump()  # a write landed after the session was chosen
+
+    async def build():
+        return []
+
+    await cache.respond(request, build, list[int])
+    assert await cache.get(cache.key(request), await cache.generation()) is None
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_miss():
+    cache = ResponseCache("", ttl_seconds=0)
+    await cache.put("/teams?", await cache.generation(), b"[]")
+    assert await cache.get("/teams?", await cache.generation()) is None
+
+
+@pytest.mark.asyncio
+async def test_a_locked_cache_file_does_not_stall_the_event_loop(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path)
+    generation = await cache.generation()
+    other_worker = sqlite3.connect(path)
+    other_worker.execute("BEGIN IMMEDIATE")  # holds the write lock
+
+    put = asyncio.create_task(cache.put("/teams?", generation, b"[]"))
+    started = time.monotonic()
+    await asyncio.sleep(0.05)
+    assert time.monotonic() - started < 1 and not put.done()
+
+    other_worker.rollback()
+    await put
+    assert await cache.get("/teams?", generation) is not None
+    other_worker.close(), cache.close()
+
+
+@pytest.mark.asyncio
+async def test_the_file_is_trimmed_periodically_not_on_every_insert(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path, max_entries=2)
+    generation = await cache.generation()
+    for i in range(4):
+        await cache.put(f"/teams?page={i}", generation, b"[]")
+    count = "SELECT COUNT(*) FROM response_cache"
+    with sqlite3.connect(path) as db:
+        assert db.execute(count).fetchone()[0] == 4
+
+    cache._trimmed_at -= ResponseCache.TRIM_INTERVAL_SECONDS
+    await cache.put("/teams?page=4", generation, b"[]")
+    with sqlite3.connect(path) as db:
+        assert db.execute(count).fetchone()[0] == 2
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_still_sends_etags():
+    cache = ResponseCache("", enabled=False)
+    calls = []
+
+    async def build():
+        calls.append(1)
+        return []
+
+    for _ in range(2):
+        resp = await cache.respond(_request(), build, list[int])
+        assert resp.body == b"[]" and resp.headers["etag"] == etag_for(b"[]")
+    assert len(calls) == 2 and (await cache.stats())["hits"] == 0
@@ -0,0 +1,85 @@
+"""Tests for weekly table retention and partition maintenance."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.models import CollaborationBottleneck, EmployeeScore, PregeneratedDraft, WeeklySignal
+from app.services.retention import (
+    add_months, ensure_partitions, is_partitioned, partition_expired, partition_month,
+    partition_name, retention_cutoff,
+)
+from app.signals.generate_demo import get_demo_week_start
+
+
+def test_partition_names_round_trip():
+    month = date(2026, 10, 1)
+    assert partition_name("weekly_signals", month) == "weekly_signals_p202610"
+    assert partition_month("employee_scores_p202610") == month
+    assert partition_month("weekly_signals_legacy") is None
+
+
+def test_add_months_crosses_years():
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_partition_expires_only_when_its_last_week_has():
+    # September 2026: last week starts on the 30th and ends on October 7th
+    cutoff = retention_cutoff(90, today=date(2027, 1, 5))  # 2026-10-07
+    assert partition_expired(date(2026, 9, 1), cutoff)
+    assert not partition_expired(date(2026, 9, 1), cutoff - timedelta(days=1))
+    assert not partition_expired(date(2026, 10, 1), cutoff)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_tables_are_plain(db_session):
+    assert not await is_partitioned(db_session, "weekly_signals")
+    assert await ensure_partitions(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_retention_deletes_expired_rows_on_plain_tables(client, db_session):
+    await client.post("/sync/run")
+    signal = (await db_session.execute(select(WeeklySignal))).scalars().first()
+    expired = get_demo_week_start(weeks_ago=30)  # demo mode: retention runs on the demo calendar
+    db_session.add(WeeklySignal(employee_id=signal.employee_id, week_start=expired))
+    db_session.add(EmployeeScore(employee_id=signal.employee_id, week_start=expired))
+    await db_session.commit()
+    before = await db_session.scalar(select(func.count()).select_from(WeeklySignal))
+
+    summary = (await client.post("/sync/retention")).json()
+    assert summary["deleted_rows"] == 2
+    assert summary["dropped_partitions"] == summary["created_partitions"] == []
+
+    db_session.expire_all()
+    assert await db_session.scalar(select(func.count()).select_from(WeeklySignal)) == before - 1
+    oldest = await db_session.scalar(select(func.min(EmployeeScore.week_start)))
+    assert oldest > expired
+
+
+@pytest.mark.asyncio
+async def test_retention_covers_bottlenecks_and_drafts(client, db_session):
+    await client.post("/sync/run")
+    emp_id = await db_session.scalar(select(WeeklySignal.employee_id).limit(1))
+    expired, kept = get_demo_week_start(weeks_ago=30), get_demo_week_start()
+    await db_session.execute(delete(PregeneratedDraft).where(PregeneratedDraft.employee_id == emp_id))
+    await db_session.execute(delete(CollaborationBottleneck).where(CollaborationBottleneck.employee_id == emp_id))
+    db_session.add_all([
+        CollaborationBottleneck(employee_id=emp_id, week_start=expired),
+        CollaborationBottleneck(employee_id=emp_id, week_start=kept),
+        PregeneratedDraft(employee_id=emp_id, kind="review", week_start=expired),
+        PregeneratedDraft(employee_id=emp_id, kind="questions", week_start=kept),
+    ])
+    await db_session.commit()
+
+    summary = (await client.post("/sync/retention")).json()
+    assert summary["deleted_rows"] == 2
+
+    db_session.expire_all()
+    for model in (CollaborationBottleneck, PregeneratedDraft):
+        weeks = (await db_session.execute(
+            select(model.week_start).where(model.employee_id == emp_id)
+        )).scalars().all()
+        assert weeks == [kept]
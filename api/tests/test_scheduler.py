@@ -0,0 +1,71 @@
+"""Tests for the scheduler leader election."""
+
+import pytest
+
+from app.db import engine
+from app.scheduler import SchedulerLeader
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.running = True
+
+    def shutdown(self, wait=True):
+        self.running = False
+
+    def get_jobs(self):
+        return []
+
+
+class LockedLeader(SchedulerLeader):
+    """Leader whose advisory lock is a shared dict instead of PostgreSQL."""
+
+    def __init__(self, lock: dict, name: str):
+        super().__init__(engine, start=FakeScheduler)
+        self.lock, self.name = lock, name
+
+    async def _acquire(self) -> bool:
+        if self.lock.get("holder") in (None, self.name):
+            self.lock["holder"] = self.name
+            return True
+        return False
+
+    async def _holds_lock(self) -> bool:
+        return self.lock.get("holder") == self.name
+
+    async def _release(self) -> None:
+        if self.lock.get("holder") == self.name:
+            self.lock["holder"] = None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_process_always_leads():
+    leader = SchedulerLeader(engine, start=FakeScheduler)
+    assert await leader.step()
+    assert leader.scheduler.running
+    await leader.aclose()
+    assert not leader.leading and leader.scheduler is None
+
+
+@pytest.mark.asyncio
+async def test_only_one_worker_runs_the_scheduler():
+    lock = {}
+    workers = [LockedLeader(lock, f"w{i}") for i in range(3)]
+    assert [await w.step() for w in workers] == [True, False, False]
+    assert [w.scheduler is not None for w in workers] == [True, False, False]
+    assert [await w.step() for w in workers] == [True, False, False]  # still the same leader
+
+
+@pytest.mark.asyncio
+async def test_another_worker_takes_over_when_the_leader_goes():
+    lock = {}
+    first, second = LockedLeader(lock, "a"), LockedLeader(lock, "b")
+    await first.step()
+    await first.aclose()  # worker shut down: lock released
+    assert await second.step()
+    scheduler = second.scheduler
+
+    lock["holder"] = "someone else"  # e.g. the lock connection dropped and another worker took it
+    assert not await second.step()
+    assert second.scheduler is None
+    assert not scheduler.running
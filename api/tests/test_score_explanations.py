@@ -0,0 +1,97 @@
+"""Tests for the packed score explanation column."""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import InvalidRequestError
+
+from app.models import EmployeeScore, InsightsSnapshot
+from app.scoring.explanations import pack_explanations, unpack_explanations
+from app.scoring.scorer import compute_all_scores
+from app.signals.generate_demo import ARCHETYPES, generate_weekly_signals
+
+
+def _cases():
+    for archetype in ARCHETYPES:
+        for seed in range(5):
+            for weeks in (1, 3, 8):
+                yield generate_weekly_signals(archetype, num_weeks=weeks, seed=seed)
+
+
+def _score_columns(results: list[dict]) -> dict:
+    return {r["score_name"]: (r["score"], r["label"]) for r in results}
+
+
+def test_round_trip_is_exact():
+    for signals in _cases():
+        results = compute_all_scores(signals, 0.8)
+        blob = pack_explanations(results)
+        assert unpack_explanations(blob, _score_columns(results)) == results
+
+
+def test_packed_blob_is_a_fraction_of_the_json():
+    results = compute_all_scores(generate_weekly_signals("overloaded", num_weeks=8), 0.9)
+    assert len(pack_explanations(results)) * 4 < len(json.dumps(results))
+
+
+def _migration_007():
+    pytest.importorskip("alembic.op")
+    path = Path(__file__).parents[1] / "alembic" / "versions" / "007_packed_explanations.py"
+    spec = importlib.util.spec_from_file_location("migration_007", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_migration_codec_is_a_frozen_copy_of_version_1():
+    migration = _migration_007()
+    for signals in _cases():
+        results = compute_all_scores(signals, 0.8)
+        blob = pack_explanations(results)
+        assert migration.pack_explanations(results) == blob
+        assert migration.unpack_explanations(blob, _score_columns(results)) == results
+
+
+def test_migration_drops_what_it_cannot_encode():
+    migration = _migration_007()
+    result = compute_all_scores(generate_weekly_signals("overloaded", num_weeks=3), 0.8)[0]
+    legacy = {**result, "top_contributors": [
+        {**result["top_contributors"][0], "delta": "↗ increasing (Δ+0.5/week)"},
+        {**result["top_contributors"][0], "delta": "rising fast"},
+        {**result["top_contributors"][0], "signal": "retired_signal"},
+    ]}
+    [unpacked] = migration.unpack_explanations(migration.pack_explanations([legacy]), _score_columns([result]))
+    assert [c["delta"] for c in unpacked["top_contributors"]] == ["↗ increasing (Δ+0.50/week)", ""]
+
+
+def test_unpack_skips_dimensions_without_scores():
+    results = compute_all_scores(generate_weekly_signals("healthy", num_weeks=8), 1.0)
+    columns = _score_columns(results[:2])
+    assert unpack_explanations(pack_explanations(results), columns) == results[:2]
+    assert unpack_explanations(b"", columns) == []
+
+
+@pytest.mark.asyncio
+async def test_list_queries_never_load_the_blob(client, db_session):
+    await client.post("/sync/run")
+    score = (await db_session.execute(select(EmployeeScore))).scalars().first()
+    with pytest.raises(InvalidRequestError):
+        score.explanations
+
+
+@pytest.mark.asyncio
+async def test_insights_match_live_scoring(client, db_session):
+    await client.post("/sync/run")
+    emp_id = (await client.get("/employees")).json()[0]["id"]
+    await db_session.execute(delete(InsightsSnapshot))
+    await db_session.commit()
+    stored = (await client.get(f"/employees/{emp_id}/insights")).json()
+
+    await db_session.execute(update(EmployeeScore).values(explanations=b""))
+    await db_session.commit()
+    live = (await client.get(f"/employees/{emp_id}/insights")).json()
+    assert stored["scores"] == live["scores"]
+    assert stored["recommendations"] == live["recommendations"]
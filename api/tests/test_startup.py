@@ -0,0 +1,88 @@
+"""Tests for the fast startup path: lazy imports, startup modes and the timing report."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import app.main as main
+from app.config import get_settings
+from app.startup import is_loaded, lazy_import, startup_report
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_importing_the_app_defers_numpy_and_yaml():
+    script = (
+        "import json, sys\n"
+        "import app.main\n"
+        "from app.startup import is_loaded, startup_report\n"
+        "print(json.dumps({'numpy': is_loaded('numpy'), 'yaml': 'yaml' in sys.modules,"
+        " 'report': startup_report.report()}))\n"
+    )
+    env = {**os.environ, "DATABASE_URL": "sqlite+aiosqlite:///:memory:", "PYTHONPATH": str(API_DIR)}
+    out = subprocess.run(
+        [sys.executable, "-c", script], cwd=API_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result["numpy"] is False and result["yaml"] is False
+    assert {f"routes.{name}" for name in main.ROUTERS} <= result["report"]["imports_ms"].keys()
+
+
+def test_lazy_import_loads_on_first_attribute_access():
+    name = "tabnanny"
+    if name in sys.modules:
+        pytest.skip(f"{name} already imported")
+    module = lazy_import(name)
+    try:
+        assert not is_loaded(name)
+        assert callable(module.check)
+        assert is_loaded(name)
+    finally:
+        sys.modules.pop(name, None)
+
+
+@pytest.fixture
+def lifespan_env(monkeypatch):
+    calls = []
+
+    async def fake_init_db():
+        calls.append("init_db")
+
+    monkeypatch.setattr(main, "init_db", fake_init_db)
+    monkeypatch.setattr(get_settings(), "ollama_warmup", False)
+    monkeypatch.setattr(startup_report, "startup", {})
+    monkeypatch.setattr(startup_report, "background", {})
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_development_startup_creates_the_schema(lifespan_env):
+    async with main.lifespan(main.app):
+        pass
+    assert lifespan_env == ["init_db"]
+    assert {"init_db", "ensure_partitions", "workers"} <= startup_report.startup.keys()
+
+
+@pytest.mark.asyncio
+async def test_production_startup_skips_create_all_and_defers_maintenance(lifespan_env, monkeypatch):
+    monkeypatch.setattr(get_settings(), "app_env", "production")
+    async with main.lifespan(main.app):
+        assert "ensure_partitions" not in startup_report.startup
+        for _ in range(50):
+            if "ensure_partitions" in startup_report.background:
+                break
+            await asyncio.sleep(0.01)
+    assert lifespan_env == []
+    assert "ensure_partitions" in startup_report.background
+
+
+@pytest.mark.asyncio
+async def test_health_reports_startup_timings(client):
+    data = (await client.get("/health")).json()
+    assert "routes.employees" in data["startup"]["imports_ms"]
+    assert data["startup"]["total_ms"] > 0
@@ -0,0 +1,106 @@
+"""Tests for SSE streaming of 1:1 agendas and review drafts."""
+
+import json
+import uuid
+
+import httpx
+import pytest
+
+from app.llm_cache import llm_cache
+from app.ollama_client import OllamaClient, ollama
+
+AGENDA = {
+    "questions": ["How is the week going?"],
+    "listening_cues": ["Energy"],
+    "follow_up_actions": ["Recap"],
+    "context_notes": ["Signals"],
+}
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _fake_stream(chunks: list[str]):
+    async def generate_stream(prompt: str, system: str = "", **options):
+        for chunk in chunks:
+            yield chunk
+    return generate_stream
+
+
+async def _first_employee(client) -> str:
+    await client.post("/sync/run")
+    return (await client.get("/employees")).json()[0]["id"]
+
+
+@pytest.mark.asyncio
+async def test_questions_stream_falls_back_to_template_immediately(client):
+    emp_id = await _first_employee(client)
+    resp = await client.get(f"/employees/{emp_id}/questions/stream")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert resp.text.startswith(": stream open")
+
+    events = _events(resp.text)
+    assert [e for e, _ in events] == ["result"]
+    assert events[0][1]["generated_by"] == "template"
+
+
+@pytest.mark.asyncio
+async def test_questions_stream_forwards_tokens_then_result(client, monkeypatch):
+    text = json.dumps(AGENDA)
+    chunks = [text[i:i + 10] for i in range(0, len(text), 10)]
+    monkeypatch.setattr(ollama, "generate_stream", _fake_stream(chunks))
+    llm_cache.clear()
+
+    emp_id = await _first_employee(client)
+    events = _events((await client.get(f"/employees/{emp_id}/questions/stream")).text)
+    tokens = [d["text"] for e, d in events if e == "token"]
+    assert tokens == chunks
+    assert events[-1][0] == "result"
+    assert events[-1][1]["generated_by"] == "ollama"
+    assert events[-1][1]["questions"] == AGENDA["questions"]
+
+    # Second view comes straight from the cache: no tokens, same result
+    again = _events((await client.get(f"/employees/{emp_id}/questions/stream")).text)
+    assert [e for e, _ in again] == ["result"]
+    assert again[0][1] == events[-1][1]
+
+
+@pytest.mark.asyncio
+async def test_review_stream_broken_output_uses_template(client, monkeypatch):
+    monkeypatch.setattr(ollama, "generate_stream", _fake_stream(['{"highlights": ["Strong']))
+    emp_id = await _first_employee(client)
+    resp = await client.post(f"/employees/{emp_id}/review-draft/stream")
+    events = _events(resp.text)
+    assert events[0] == ("token", {"text": '{"highlights": ["Strong'})
+    assert events[-1][0] == "result"
+    assert events[-1][1]["generated_by"] == "template"
+
+
+@pytest.mark.asyncio
+async def test_stream_unknown_employee_404(client):
+    resp = await client.get(f"/employees/{uuid.uuid4()}/review-draft/stream")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_ollama_generate_stream_parses_ndjson():
+    lines = [{"response": "Hel", "done": False}, {"response": "lo", "done": False}, {"response": "", "done": True}]
+
+    def handler(req):
+        if req.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": []})
+        assert json.loads(req.content)["stream"] is True
+        return httpx.Response(200, content="\n".join(json.dumps(x) for x in lines).encode())
+
+    client = OllamaClient(transport=httpx.MockTransport(handler))
+    client.base_url = "http://ollama.test"
+    assert [c async for c in client.generate_stream("hi")] == ["Hel", "lo"]
+    assert client.breaker.failures == 0
+    await client.aclose()
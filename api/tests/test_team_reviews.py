@@ -0,0 +1,90 @@
+"""Tests for batched team review drafts streamed per employee."""
+
+import asyncio
+import json
+import time
+import uuid
+
+import pytest
+
+from app.ollama_client import ollama
+from app.services.reviews import load_review_context, load_team_review_contexts
+from tests.test_streaming import _events
+
+
+async def _largest_team(client) -> dict:
+    await client.post("/sync/run")
+    teams = (await client.get("/teams")).json()
+    return max(teams, key=lambda t: t["employee_count"])
+
+
+@pytest.mark.asyncio
+async def test_team_contexts_match_individual_loads(client, db_session):
+    team = await _largest_team(client)
+    contexts = await load_team_review_contexts(db_session, uuid.UUID(team["id"]))
+    assert len(contexts) == team["employee_count"]
+    for ctx in contexts:
+        single = await load_review_context(db_session, ctx.employee_id)
+        assert ctx == single
+
+
+@pytest.mark.asyncio
+async def test_team_contexts_use_the_scores_stored_by_sync(client, db_session, monkeypatch):
+    team = await _largest_team(client)
+
+    def no_live_scoring(*args, **kwargs):
+        raise AssertionError("scores should come from employee_scores")
+
+    monkeypatch.setattr("app.services.reviews.compute_all_scores", no_live_scoring)
+    contexts = await load_team_review_contexts(db_session, uuid.UUID(team["id"]))
+    assert all(len(ctx.scores) == 4 for ctx in contexts)
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_one_review_per_member_then_done(client):
+    team = await _largest_team(client)
+    resp = await client.get(f"/teams/{team['id']}/review-drafts/stream")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(resp.text)
+    reviews = [d for e, d in events if e == "review"]
+    assert len(reviews) == team["employee_count"]
+    assert {r["generated_by"] for r in reviews} == {"template"}
+    assert events[-1][0] == "done" and events[-1][1]["drafts"] == len(reviews)
+
+    # Same draft as the single-employee endpoint
+    first = reviews[0]
+    single = (await client.post(f"/employees/{first['employee_id']}/review-draft")).json()
+    assert {k: v for k, v in first.items() if k != "employee_id"} == single
+
+
+@pytest.mark.asyncio
+async def test_drafts_are_generated_concurrently_in_completion_order(client, monkeypatch):
+    team = await _largest_team(client)
+    submitted = []
+
+    async def fake_generate(prompt, system="", priority="interactive", **options):
+        assert priority == "batch"
+        submitted.append(prompt)
+        await asyncio.sleep(0.3 - 0.05 * len(submitted))  # later submissions finish first
+        name = prompt.split("draft for ", 1)[1].split(",", 1)[0]
+        return json.dumps({"highlights": [name], "growth_areas": [], "risks": [], "suggested_goals": [], "summary": "s"})
+
+    monkeypatch.setattr(ollama, "generate", fake_generate)
+    started = time.monotonic()
+    events = _events((await client.post(f"/teams/{team['id']}/review-drafts/stream")).text)
+    elapsed = time.monotonic() - started
+
+    reviews = [d for e, d in events if e == "review"]
+    assert len(reviews) == len(submitted) >= 2
+    assert all(r["generated_by"] == "ollama" for r in reviews)
+    assert elapsed < 0.25 * len(reviews)  # well under the serial time
+    submit_order = [p.split("draft for ", 1)[1].split(",", 1)[0] for p in submitted]
+    assert [r["employee_name"] for r in reviews] == submit_order[::-1]
+
+
+@pytest.mark.asyncio
+async def test_unknown_team_404(client):
+    resp = await client.get(f"/teams/{uuid.uuid4()}/review-drafts/stream")
+    assert resp.status_code == 404
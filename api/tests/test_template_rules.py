@@ -0,0 +1,111 @@
+"""Tests for the declarative template rule tables."""
+
+import pytest
+
+from app.scoring.scorer import compute_all_scores
+from app.services.insights import _generate_recommendations, recommendations_many
+from app.services.questions import _template_questions, template_questions_many
+from app.services.reviews import _template_review, template_reviews_many
+from app.services.rules import ALWAYS, Frame, col, count, evaluate, rule
+from app.signals.compute import compute_all_trends
+from app.signals.generate_demo import ARCHETYPES, generate_weekly_signals
+
+
+def _employees():
+    out = []
+    for i, arch in enumerate(ARCHETYPES):
+        signals = list(reversed(generate_weekly_signals(arch, num_weeks=8, seed=i)))
+        scores = compute_all_scores(signals)
+        out.append((f"{arch}-{i}", signals, scores, compute_all_trends(signals)))
+    return out
+
+
+# ── Engine ──────────────────────────────────────────────────────────
+
+def test_rules_fire_per_row_in_table_order():
+    rules = (
+        rule(col("x") >= 5, ("out", "big {x}")),
+        rule((col("x") < 5) & (col("y") == 1), ("out", "small {x}"), ("note", "y set")),
+        rule(count("out") == 0, ("out", "none")),
+        rule(ALWAYS, ("note", "end")),
+    )
+    frame = Frame([{"x": 7}, {"x": 2, "y": 1}, {"x": 1}], {"y": 0})
+    assert evaluate(rules, frame) == [
+        {"out": ["big 7"], "note": ["end"]},
+        {"out": ["small 2"], "note": ["y set", "end"]},
+        {"out": ["none"], "note": ["end"]},
+    ]
+
+
+def test_missing_columns_read_as_zero_and_empty_frame():
+    rules = (rule(col("absent") == 0, ("out", "zero")),)
+    assert evaluate(rules, Frame([{}])) == [{"out": ["zero"]}]
+    assert evaluate(rules, Frame([])) == []
+
+
+def test_or_and_string_columns():
+    rules = (rule((col("trend") == "increasing") | (col("n") > 3), ("out", "hit")),)
+    frame = Frame([{"trend": "increasing", "n": 0}, {"trend": "stable", "n": 4}, {"trend": "stable", "n": 1}])
+    assert [r["out"] for r in evaluate(rules, frame)] == [["hit"], ["hit"], []]
+
+
+# ── Template tables ─────────────────────────────────────────────────
+
+def test_batch_matches_single_employee_output():
+    employees = _employees()
+
+    agendas = template_questions_many(
+        [(name, {s["score_name"]: s["score"] for s in scores}, signals[0]) for name, signals, scores, _ in employees]
+    )
+    reviews = template_reviews_many([(name, "P", signals, scores, trends) for name, signals, scores, trends in employees])
+    recs = recommendations_many([(scores, signals) for _, signals, scores, _ in employees])
+
+    for (name, signals, scores, trends), agenda, review, rec in zip(employees, agendas, reviews, recs):
+        smap = {s["score_name"]: s["score"] for s in scores}
+        assert agenda == _template_questions(name, smap, signals[0])
+        assert review == _template_review(name, "P", signals, scores, trends)
+        assert rec == _generate_recommendations(scores, signals)
+
+
+def test_questions_burnout_path_and_depth():
+    agenda = _template_questions("Ana", {"burnout_risk": 72.4}, {"after_hours_events": 6, "unique_collaborators": 8})
+    assert agenda.questions[0] == "How are you feeling about your work this week, Ana?"
+    assert agenda.context_notes == ["Burnout risk score: 72/100. After-hours activity: 6 events."]
+    assert len(agenda.questions) == 5
+    assert agenda.questions[-1] == "What's one thing I can do to better support you?"
+
+    quiet = _template_questions("Bo", {}, {"unique_collaborators": 8})
+    assert quiet.questions[1:3] == [
+        "What's been the most rewarding part of your work recently?",
+        "Are there any process improvements you'd suggest for the team?",
+    ]
+
+
+def test_review_fallbacks_and_empty_signals():
+    review = _template_review("Cy", "P", [{"missed_deadlines": 1, "learning_hours": 2}], [], {})
+    assert review.highlights == ["Maintained consistent contributions throughout the period."]
+    assert review.risks == []
+    assert review.summary.endswith("No significant concerns identified.")
+
+    reviews = template_reviews_many([("Dee", "P", [], [], {}), ("Cy", "P", [{"missed_deadlines": 0}], [], {})])
+    assert reviews[0].highlights == ["Insufficient data for review."]
+    assert reviews[1].highlights == ["Perfect on-time delivery record this period."]
+
+
+@pytest.mark.parametrize("burnout, expected", [
+    (65, "🔴 HIGH BURNOUT RISK"),
+    (45, "⚠️ MODERATE BURNOUT RISK"),
+    (10, "✅ Signals look healthy"),
+])
+def test_recommendation_burnout_tiers(burnout, expected):
+    scores = [{"score_name": "burnout_risk", "score": burnout}]
+    signals = [{"unique_collaborators": 6, "focus_blocks": 5}]
+    recs = _generate_recommendations(scores, signals)
+    assert recs[0].startswith(expected)
+    assert len(recs) == 1
+
+
+def test_recommendations_insufficient_data_in_batch():
+    recs = recommendations_many([([], []), ([{"score_name": "high_potential", "score": 80}], [{"unique_collaborators": 9}])])
+    assert recs[0] == ["Insufficient data for recommendations. Continue collecting signals."]
+    assert recs[1] == ["⭐ High growth potential detected. Consider stretch assignments or mentorship opportunities."]